@@ -1,3 +1,27 @@
 from django.contrib import admin
 
-# Register your models here.
+from accounts.admin_import import ImportAdminMixin
+
+from .models import Faculty, Department, Program
+from .importers import ProgramImporter
+
+
+@admin.register(Faculty)
+class FacultyAdmin(admin.ModelAdmin):
+    list_display = ("name",)
+    search_fields = ("name",)
+
+
+@admin.register(Department)
+class DepartmentAdmin(admin.ModelAdmin):
+    list_display = ("name", "faculty")
+    list_filter = ("faculty",)
+    search_fields = ("name", "faculty__name")
+
+
+@admin.register(Program)
+class ProgramAdmin(ImportAdminMixin, admin.ModelAdmin):
+    importer_class = ProgramImporter
+    list_display = ("name", "award_level", "department")
+    list_filter = ("award_level", "department__faculty")
+    search_fields = ("name", "department__name", "department__faculty__name")
@@ -0,0 +1,72 @@
+# academics/importers.py
+from django.core.exceptions import ValidationError
+
+from accounts.importers import BatchImporter
+
+from .models import Faculty, Department, Program
+
+AWARD_LEVELS = {key for key, _ in Program.AWARD_LEVEL}
+
+
+class ProgramImporter(BatchImporter):
+    """
+    One row per program: faculty, department, program, award_level.
+    Missing faculties and departments are created on the way.
+    """
+    required = ("faculty", "department", "program")
+
+    def clean_row(self, row):
+        award = (row.get("award_level") or "degree").lower()
+        if award not in AWARD_LEVELS:
+            raise ValidationError(f"Unknown award_level: {row['award_level']}")
+        return {
+            "faculty": row["faculty"][:150],
+            "department": row["department"][:150],
+            "program": row["program"][:160],
+            "award_level": award,
+        }
+
+    def row_key(self, data):
+        return (data["faculty"], data["department"], data["program"], data["award_level"])
+
+    def existing(self, cleaned):
+        return set(
+            Program.objects
+            .filter(
+                department__faculty__name__in={d["faculty"] for d in cleaned},
+                department__name__in={d["department"] for d in cleaned},
+                name__in={d["program"] for d in cleaned},
+            )
+            .values_list("department__faculty__name", "department__name", "name", "award_level")
+        )
+
+    def save_batch(self, rows):
+        faculty_names = {r["faculty"] for r in rows}
+        faculties = dict(Faculty.objects.filter(name__in=faculty_names).values_list("name", "id"))
+        Faculty.objects.bulk_create([Faculty(name=n) for n in faculty_names - set(faculties)])
+        faculties = dict(Faculty.objects.filter(name__in=faculty_names).values_list("name", "id"))
+
+        dept_keys = {(faculties[r["faculty"]], r["department"]) for r in rows}
+
+        def load_departments():
+            return {
+                (fid, name): did
+                for did, fid, name in Department.objects
+                .filter(faculty_id__in={k[0] for k in dept_keys}, name__in={k[1] for k in dept_keys})
+                .values_list("id", "faculty_id", "name")
+            }
+
+        departments = load_departments()
+        Department.objects.bulk_create([
+            Department(faculty_id=fid, name=name) for fid, name in dept_keys - set(departments)
+        ])
+        departments = load_departments()
+
+        Program.objects.bulk_create([
+            Program(
+                department_id=departments[(faculties[r["faculty"]], r["department"])],
+                name=r["program"],
+                award_level=r["award_level"],
+            )
+            for r in rows
+        ])
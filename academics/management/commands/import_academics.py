@@ -0,0 +1,7 @@
+from accounts.importers import ImportCommand
+from academics.importers import ProgramImporter
+
+
+class Command(ImportCommand):
+    help = "Bulk import faculties, departments and programs (faculty, department, program[, award_level]) from CSV/XLSX."
+    importer_class = ProgramImporter
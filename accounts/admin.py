@@ -5,6 +5,8 @@ from django import forms
 from django.utils.translation import gettext_lazy as _
 
 from .models import User, StudentProfile, StaffProfile, IndustrySupervisorProfile
+from .admin_import import ImportAdminMixin
+from .importers import StudentImporter, StaffImporter
 
 
 class AdminUserCreationForm(UserCreationForm):
@@ -56,13 +58,18 @@ class UserAdmin(DjangoUserAdmin):
 
 
 @admin.register(StudentProfile)
-class StudentProfileAdmin(admin.ModelAdmin):
-    list_display = ("reg_no", "user", "phone")
-    search_fields = ("reg_no", "user__email", "user__first_name", "user__last_name")
+class StudentProfileAdmin(ImportAdminMixin, admin.ModelAdmin):
+    importer_class = StudentImporter
+    import_command = "import_students"
+    list_display = ("reg_no", "user", "phone", "program", "district")
+    list_filter = ("program",)
+    search_fields = ("reg_no", "user__email", "user__first_name", "user__last_name", "district")
 
 
 @admin.register(StaffProfile)
-class StaffProfileAdmin(admin.ModelAdmin):
+class StaffProfileAdmin(ImportAdminMixin, admin.ModelAdmin):
+    importer_class = StaffImporter
+    import_command = "import_staff"
     list_display = ("staff_no", "user", "department")
     search_fields = ("staff_no", "user__email", "user__first_name", "user__last_name", "department")
 
@@ -0,0 +1,77 @@
+# accounts/admin_import.py
+from django import forms
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import render
+from django.urls import path
+
+from .importers import ImportFileError, count_rows
+
+
+class ImportFileForm(forms.Form):
+    file = forms.FileField(help_text="CSV (or .xlsx) with a header row.")
+    dry_run = forms.BooleanField(required=False, label="Validate only (nothing is saved)")
+
+
+class ImportAdminMixin:
+    """
+    Adds an "Import" button + page to a ModelAdmin; set `importer_class`, and
+    `import_command` (its management command) when rows need password hashing.
+    Imports run inline without a process pool, so files that need hashing are
+    capped at ADMIN_IMPORT_MAX_ROWS and larger ones go to the command.
+    """
+    importer_class = None
+    import_command = None
+    change_list_template = "admin/import_change_list.html"
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name=f"{opts.app_label}_{opts.model_name}_import",
+            ),
+        ] + super().get_urls()
+
+    def check_size(self, importer, upload):
+        # password hashing is slow without the command's process pool; validating isn't
+        if not importer.needs_pool or importer.dry_run:
+            return
+        rows = count_rows(upload.file, upload.name)
+        if rows > settings.ADMIN_IMPORT_MAX_ROWS:
+            how = (
+                f"python manage.py {self.import_command} <file> --credentials-out <passwords.csv>"
+                if self.import_command else "the import management command"
+            )
+            raise ImportFileError(
+                f"{rows} rows is too many to import here (the limit is {settings.ADMIN_IMPORT_MAX_ROWS}); "
+                f"run {how} on the server instead."
+            )
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        report = None
+        if request.method == "POST":
+            form = ImportFileForm(request.POST, request.FILES)
+            if form.is_valid():
+                upload = form.cleaned_data["file"]
+                importer = self.importer_class(dry_run=form.cleaned_data["dry_run"], workers=0)
+                try:
+                    self.check_size(importer, upload)
+                    report = importer.run(upload.file, upload.name)
+                except ImportFileError as e:
+                    form.add_error("file", str(e))
+        else:
+            form = ImportFileForm()
+
+        return render(request, "admin/import_file.html", {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Import {self.model._meta.verbose_name_plural}",
+            "columns": self.importer_class.__doc__,
+            "form": form,
+            "report": report,
+        })
@@ -0,0 +1,41 @@
+# accounts/aio.py
+#
+# Helpers for the async views.
+# Under ASGI (see config/gunicorn_asgi.py) the read-heavy student/supervisor
+# pages and file downloads are `async def`: they wait on the database through
+# the async ORM (downloads stream via placements/media.py), so one worker can
+# hold many requests at once during submission deadlines. Under WSGI they still work,
+# Django just runs them in a one-off event loop.
+from asgiref.sync import sync_to_async
+from django.shortcuts import render
+
+from .models import StudentProfile, StaffProfile
+
+# templates (and context processors) may still touch lazy relations through
+# the sync ORM, so rendering runs in the request's sync thread
+arender = sync_to_async(render)
+
+
+async def auser(request):
+    """The logged-in user, also stored on request.user so templates don't load it again."""
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+async def ain_groups(user, names):
+    return user.is_superuser or await user.groups.filter(name__in=names).aexists()
+
+
+async def astudent_profile(user):
+    profile = await StudentProfile.objects.filter(user=user).afirst()
+    if profile:
+        user.student_profile = profile
+    return profile
+
+
+async def astaff_profile(user):
+    profile = await StaffProfile.objects.filter(user=user).afirst()
+    if profile:
+        user.staff_profile = profile
+    return profile
@@ -2,6 +2,8 @@ from django import forms
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib.auth import get_user_model
 
+from academics.models import Program
+
 User = get_user_model()
 
 
@@ -18,7 +20,9 @@ class StudentRegistrationForm(UserCreationForm):
     last_name = forms.CharField(max_length=150)
     reg_no = forms.CharField(max_length=50)
     phone = forms.CharField(max_length=30, required=False)
+    program = forms.ModelChoiceField(queryset=Program.objects.all(), required=False)
+    district = forms.CharField(max_length=120, required=False, help_text="Home district.")
 
     class Meta:
         model = User
-        fields = ("first_name", "last_name", "email", "reg_no", "phone", "password1", "password2")
+        fields = ("first_name", "last_name", "email", "reg_no", "phone", "program", "district", "password1", "password2")
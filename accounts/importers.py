@@ -0,0 +1,364 @@
+# accounts/importers.py
+#
+# Streaming bulk importers (CSV, or XLSX when openpyxl is installed).
+# Rows are read lazily and handled `batch_size` at a time: validate the batch,
+# check it against the database with one query per key, hash passwords in a
+# process pool, then bulk_create. Bad rows are reported with their line number
+# and never stop the rest of the file.
+# The pool is for the import_* management commands; the admin import page runs
+# importers without one and only takes small files (accounts/admin_import.py).
+import csv
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils.crypto import get_random_string
+
+from academics.models import Program
+
+from .models import User, StudentProfile, StaffProfile
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ImportFileError(Exception):
+    pass
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    errors: list = field(default_factory=list)      # (line_no, message)
+    credentials: list = field(default_factory=list)  # (email, generated password)
+    elapsed: float = 0.0
+
+    @property
+    def rate(self):
+        return self.created / self.elapsed if self.elapsed else 0.0
+
+
+def iter_rows(fileobj, filename):
+    """
+    Yield (line_no, row dict) with lower-cased, stripped keys and values.
+    `fileobj` is a binary file (an open file or an uploaded file).
+    """
+    if filename.lower().endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFileError("Install openpyxl to import .xlsx files, or save the sheet as CSV.")
+
+        ws = load_workbook(fileobj, read_only=True, data_only=True).active
+        rows = ws.iter_rows(values_only=True)
+        header = [str(h or "").strip().lower() for h in next(rows, [])]
+        for line_no, values in enumerate(rows, start=2):
+            yield line_no, {k: ("" if v is None else str(v).strip()) for k, v in zip(header, values) if k}
+        return
+
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [(h or "").strip().lower() for h in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, {k: (v or "").strip() for k, v in row.items() if k}
+
+
+def count_rows(fileobj, filename):
+    """
+    Data rows in `fileobj`, which is rewound. For CSV these are lines, so a
+    quoted value spanning lines is counted more than once (never fewer).
+    """
+    if filename.lower().endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFileError("Install openpyxl to import .xlsx files, or save the sheet as CSV.")
+        count = max((load_workbook(fileobj, read_only=True).active.max_row or 1) - 1, 0)
+    else:
+        count = max(sum(1 for line in fileobj if line.strip()) - 1, 0)
+    fileobj.seek(0)
+    return count
+
+
+def batched(iterable, size):
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _hash_one(hasher, password):
+    return hasher.encode(password, hasher.salt())
+
+
+def hash_passwords(passwords, executor, hasher):
+    if executor is None:
+        return [_hash_one(hasher, p) for p in passwords]
+    return list(executor.map(_hash_one, [hasher] * len(passwords), passwords, chunksize=32))
+
+
+class BatchImporter:
+    """
+    Subclasses set `required` and implement `clean_row()` (raise ValidationError)
+    and `save_batch()`. `existing()` lets a subclass drop rows already in the database.
+    """
+    required = ()
+    unique_fields = ()  # values besides row_key() that may appear only once in a file (e.g. email)
+    needs_pool = False  # True when rows need password hashing
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, workers=None, dry_run=False):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.dry_run = dry_run
+        self.report = ImportReport()
+        self.executor = None
+
+    def clean_row(self, row):
+        return row
+
+    def row_key(self, data):
+        raise NotImplementedError
+
+    def existing(self, cleaned):
+        return set()
+
+    def generates_credentials(self, fileobj, filename):
+        """Whether importing the file would make up passwords that have to be handed out."""
+        return False
+
+    def prepare_batch(self, cleaned):
+        # slow per-row work (password hashing) happens here, outside the transaction
+        pass
+
+    def save_batch(self, cleaned):
+        raise NotImplementedError
+
+    def run(self, fileobj, filename):
+        started = time.perf_counter()
+        seen = set()
+        seen_values = {name: set() for name in self.unique_fields}
+
+        if self.needs_pool and self.workers != 0:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers or os.cpu_count())
+
+        try:
+            for batch in batched(iter_rows(fileobj, filename), self.batch_size):
+                cleaned = []
+                for line_no, row in batch:
+                    missing = [f for f in self.required if not row.get(f)]
+                    if missing:
+                        self.report.errors.append((line_no, f"Missing: {', '.join(missing)}"))
+                        continue
+                    try:
+                        data = self.clean_row(row)
+                    except ValidationError as e:
+                        self.report.errors.append((line_no, "; ".join(e.messages)))
+                        continue
+
+                    key = self.row_key(data)
+                    if key in seen:
+                        self.report.errors.append((line_no, f"Duplicate in file: {key}"))
+                        continue
+                    repeated = [name for name in self.unique_fields if data[name] in seen_values[name]]
+                    if repeated:
+                        name = repeated[0]
+                        self.report.errors.append((line_no, f"Duplicate {name} in file: {data[name]}"))
+                        continue
+                    seen.add(key)
+                    for name in self.unique_fields:
+                        seen_values[name].add(data[name])
+                    cleaned.append((line_no, data))
+
+                taken = self.existing([d for _, d in cleaned])
+                fresh = []
+                for line_no, data in cleaned:
+                    if self.row_key(data) in taken:
+                        self.report.errors.append((line_no, f"Already exists: {self.row_key(data)}"))
+                    else:
+                        fresh.append(data)
+
+                if fresh and not self.dry_run:
+                    self.prepare_batch(fresh)
+                    with transaction.atomic():
+                        self.save_batch(fresh)
+                self.report.created += len(fresh)
+        finally:
+            if self.executor:
+                self.executor.shutdown()
+            self.report.elapsed = time.perf_counter() - started
+
+        return self.report
+
+
+class _UserImporter(BatchImporter):
+    group_name = None
+    unique_fields = ("email",)
+    needs_pool = True
+
+    def clean_user_fields(self, row):
+        email = row["email"].lower()
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise ValidationError(f"Invalid email: {row['email']}")
+        return {
+            "email": email,
+            "first_name": row.get("first_name", "")[:150],
+            "last_name": row.get("last_name", "")[:150],
+            "password": row.get("password", ""),
+        }
+
+    def generates_credentials(self, fileobj, filename):
+        return any(not row.get("password") for _, row in iter_rows(fileobj, filename))
+
+    def prepare_batch(self, rows):
+        for r in rows:
+            if not r["password"]:
+                r["password"] = get_random_string(10)
+                self.report.credentials.append((r["email"], r["password"]))
+
+        hashes = hash_passwords([r["password"] for r in rows], self.executor, get_hasher())
+        for r, h in zip(rows, hashes):
+            r["password"] = h
+
+    def create_users(self, rows):
+        """bulk_create the users for `rows` (already hashed) and add them to `group_name`."""
+        users = User.objects.bulk_create([
+            User(email=r["email"], first_name=r["first_name"], last_name=r["last_name"], password=r["password"])
+            for r in rows
+        ])
+
+        if self.group_name:
+            group, _ = Group.objects.get_or_create(name=self.group_name)
+            User.groups.through.objects.bulk_create([
+                User.groups.through(user_id=u.id, group_id=group.id) for u in users
+            ])
+        return users
+
+
+class StudentImporter(_UserImporter):
+    """Columns: reg_no, email, first_name, last_name, phone (+ optional password, program, district)."""
+    required = ("reg_no", "email")
+    group_name = "Student"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.programs = {name.lower(): pid for pid, name in Program.objects.values_list("id", "name")}
+
+    def clean_row(self, row):
+        data = self.clean_user_fields(row)
+        program = row.get("program", "")
+        if program and program.lower() not in self.programs:
+            raise ValidationError(f"Unknown program: {program}")
+        data.update({
+            "reg_no": row["reg_no"].upper(),
+            "phone": row.get("phone", "")[:30],
+            "program_id": self.programs.get(program.lower()),
+            "district": row.get("district", "")[:120],
+        })
+        return data
+
+    def row_key(self, data):
+        return data["reg_no"]
+
+    def existing(self, cleaned):
+        emails = {d["email"]: d["reg_no"] for d in cleaned}
+        taken = set(StudentProfile.objects.filter(reg_no__in=[d["reg_no"] for d in cleaned]).values_list("reg_no", flat=True))
+        taken |= {emails[e] for e in User.objects.filter(email__in=list(emails)).values_list("email", flat=True)}
+        return taken
+
+    def save_batch(self, rows):
+        users = self.create_users(rows)
+        StudentProfile.objects.bulk_create([
+            StudentProfile(user=u, reg_no=r["reg_no"], phone=r["phone"], program_id=r["program_id"], district=r["district"])
+            for u, r in zip(users, rows)
+        ])
+
+
+class StaffImporter(_UserImporter):
+    """Columns: staff_no, email, first_name, last_name, department (+ optional password)."""
+    required = ("staff_no", "email")
+    group_name = "UniversitySupervisor"
+
+    def clean_row(self, row):
+        data = self.clean_user_fields(row)
+        data.update({
+            "staff_no": row["staff_no"].upper(),
+            "department": row.get("department", "")[:120],
+        })
+        return data
+
+    def row_key(self, data):
+        return data["staff_no"]
+
+    def existing(self, cleaned):
+        emails = {d["email"]: d["staff_no"] for d in cleaned}
+        taken = set(StaffProfile.objects.filter(staff_no__in=[d["staff_no"] for d in cleaned]).values_list("staff_no", flat=True))
+        taken |= {emails[e] for e in User.objects.filter(email__in=list(emails)).values_list("email", flat=True)}
+        return taken
+
+    def save_batch(self, rows):
+        users = self.create_users(rows)
+        StaffProfile.objects.bulk_create([
+            StaffProfile(user=u, staff_no=r["staff_no"], department=r["department"])
+            for u, r in zip(users, rows)
+        ])
+
+
+class ImportCommand(BaseCommand):
+    """Base for the import_* management commands; subclasses set `importer_class`."""
+    importer_class = None
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (or .xlsx) file to import.")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--workers", type=int, default=None, help="Password hashing processes (0 = no pool). Default: CPU count.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only; nothing is saved.")
+        parser.add_argument(
+            "--credentials-out",
+            help="Write generated passwords to this CSV file (required when any row has no password).",
+        )
+
+    def handle(self, *args, **options):
+        importer = self.importer_class(
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            dry_run=options["dry_run"],
+        )
+
+        try:
+            if not options["dry_run"] and not options["credentials_out"]:
+                with open(options["path"], "rb") as f:
+                    if importer.generates_credentials(f, options["path"]):
+                        raise CommandError(
+                            "Some rows have no password, so passwords will be generated and can't be "
+                            "recovered later: pass --credentials-out to save them. Nothing was imported."
+                        )
+            with open(options["path"], "rb") as f:
+                report = importer.run(f, options["path"])
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        for line_no, message in report.errors:
+            self.stderr.write(f"line {line_no}: {message}")
+
+        if report.credentials and options["credentials_out"]:
+            with open(options["credentials_out"], "w", newline="") as out:
+                writer = csv.writer(out)
+                writer.writerow(["email", "password"])
+                writer.writerows(report.credentials)
+
+        verb = "Valid" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb}: {report.created} • Errors: {len(report.errors)} • "
+            f"{report.elapsed:.1f}s ({report.rate:.0f} rows/s)"
+        ))
@@ -0,0 +1,6 @@
+from accounts.importers import ImportCommand, StaffImporter
+
+
+class Command(ImportCommand):
+    help = "Bulk import university staff (staff_no, email, first_name, last_name, department[, password]) from CSV/XLSX."
+    importer_class = StaffImporter
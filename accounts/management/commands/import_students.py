@@ -0,0 +1,6 @@
+from accounts.importers import ImportCommand, StudentImporter
+
+
+class Command(ImportCommand):
+    help = "Bulk import students (reg_no, email, first_name, last_name, phone[, password, program, district]) from CSV/XLSX."
+    importer_class = StudentImporter
@@ -48,7 +48,9 @@ class StudentProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="student_profile")
     reg_no = models.CharField(max_length=50, unique=True)
     phone = models.CharField(max_length=30, blank=True)
-    
+    program = models.ForeignKey("academics.Program", null=True, blank=True, on_delete=models.SET_NULL, related_name="students")
+    district = models.CharField(max_length=120, blank=True)  # home district, used when the university assigns a company
+
 
     def __str__(self):
         return f"{self.reg_no} - {self.user.email}"
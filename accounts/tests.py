@@ -1,3 +1,121 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import tempfile
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from .importers import StaffImporter, StudentImporter, count_rows
+from .models import StaffProfile, StudentProfile, User
+
+
+def csv_file(text):
+    return io.BytesIO(text.encode())
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class StudentImporterTests(TestCase):
+    header = "reg_no,email,first_name,last_name\n"
+
+    def run_import(self, body, **kwargs):
+        return StudentImporter(workers=0, **kwargs).run(csv_file(self.header + body), "students.csv")
+
+    def test_imports_rows_and_generates_passwords(self):
+        report = self.run_import("vu/1,a@x.com,Ann,B\nvu/2,b@x.com,Bob,C\n")
+        self.assertEqual(report.created, 2)
+        self.assertEqual(report.errors, [])
+        self.assertEqual(len(report.credentials), 2)
+        self.assertTrue(User.objects.get(email="a@x.com").groups.filter(name="Student").exists())
+        self.assertEqual(StudentProfile.objects.get(user__email="b@x.com").reg_no, "VU/2")
+
+    def test_bad_rows_are_reported_with_line_numbers(self):
+        report = self.run_import("vu/1,a@x.com\n,b@x.com\nvu/3,not-an-email\n")
+        self.assertEqual(report.created, 1)
+        self.assertEqual([line for line, _ in report.errors], [3, 4])
+
+    def test_repeated_reg_no_in_file(self):
+        report = self.run_import("vu/1,a@x.com\nVU/1,b@x.com\n")
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.errors, [(3, "Duplicate in file: VU/1")])
+
+    def test_repeated_email_in_file(self):
+        report = self.run_import("vu/1,a@x.com\nvu/2,A@x.com\nvu/3,c@x.com\n")
+        self.assertEqual(report.created, 2)
+        self.assertEqual(report.errors, [(3, "Duplicate email in file: a@x.com")])
+        self.assertFalse(StudentProfile.objects.filter(reg_no="VU/2").exists())
+
+    def test_rows_already_in_the_database(self):
+        self.run_import("vu/1,a@x.com\n")
+        report = self.run_import("vu/1,z@x.com\nvu/2,a@x.com\nvu/3,c@x.com\n")
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.errors, [(2, "Already exists: VU/1"), (3, "Already exists: VU/2")])
+
+    def test_dry_run_saves_nothing(self):
+        report = self.run_import("vu/1,a@x.com\n", dry_run=True)
+        self.assertEqual(report.created, 1)
+        self.assertFalse(User.objects.exists())
+
+    def test_small_batches(self):
+        body = "".join(f"vu/{i},s{i}@x.com\n" for i in range(7))
+        report = self.run_import(body, batch_size=3)
+        self.assertEqual(report.created, 7)
+        self.assertEqual(StudentProfile.objects.count(), 7)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class StaffImporterTests(TestCase):
+    def test_given_password_is_usable(self):
+        body = "staff_no,email,password\ns1,s1@x.com,secret-pw-1\n"
+        report = StaffImporter(workers=0).run(csv_file(body), "staff.csv")
+        self.assertEqual((report.created, report.credentials), (1, []))
+        self.assertTrue(User.objects.get(email="s1@x.com").check_password("secret-pw-1"))
+        self.assertEqual(StaffProfile.objects.get().staff_no, "S1")
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ImportCommandTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, name, text):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_refuses_to_generate_passwords_without_credentials_out(self):
+        path = self.write("st.csv", "reg_no,email,password\nvu/1,a@x.com,pw-123456\nvu/2,b@x.com,\n")
+        with self.assertRaisesMessage(CommandError, "--credentials-out"):
+            call_command("import_students", path, "--workers", "0", stdout=io.StringIO())
+        self.assertFalse(User.objects.exists())
+
+    def test_writes_generated_passwords(self):
+        path = self.write("st.csv", "reg_no,email\nvu/1,a@x.com\n")
+        out = os.path.join(self.dir.name, "creds.csv")
+        call_command("import_students", path, "--workers", "0", "--credentials-out", out, stdout=io.StringIO())
+        with open(out) as f:
+            (email, password), = list(csv.reader(f))[1:]
+        self.assertEqual(email, "a@x.com")
+        self.assertTrue(User.objects.get(email=email).check_password(password))
+
+    def test_all_passwords_given(self):
+        path = self.write("st.csv", "reg_no,email,password\nvu/1,a@x.com,pw-123456\n")
+        call_command("import_students", path, "--workers", "0", stdout=io.StringIO())
+        self.assertTrue(User.objects.filter(email="a@x.com").exists())
+
+    def test_dry_run_needs_no_credentials_out(self):
+        path = self.write("st.csv", "reg_no,email\nvu/1,a@x.com\n")
+        call_command("import_students", path, "--dry-run", stdout=io.StringIO())
+        self.assertFalse(User.objects.exists())
+
+
+class CountRowsTests(TestCase):
+    def test_counts_data_lines_and_rewinds(self):
+        f = csv_file("a,b\n1,2\n\n3,4\n")
+        self.assertEqual(count_rows(f, "x.csv"), 2)
+        self.assertEqual(f.read(3), b"a,b")
+
+    def test_empty_file(self):
+        self.assertEqual(count_rows(csv_file(""), "x.csv"), 0)
@@ -37,6 +37,8 @@ class RegisterStudentView(View):
                 user=user,
                 reg_no=form.cleaned_data["reg_no"],
                 phone=form.cleaned_data.get("phone", ""),
+                program=form.cleaned_data.get("program"),
+                district=form.cleaned_data.get("district", ""),
             )
 
             student_group, _ = Group.objects.get_or_create(name="Student")
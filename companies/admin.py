@@ -1,13 +1,17 @@
 from django.contrib import admin
+from accounts.admin_import import ImportAdminMixin
+
 from .models import Company, CompanyContact
+from .importers import CompanyImporter
 
 class CompanyContactInline(admin.TabularInline):
     model = CompanyContact
     extra = 1
 
 @admin.register(Company)
-class CompanyAdmin(admin.ModelAdmin):
-    list_display = ("name", "status", "district", "industry", "created_at")
+class CompanyAdmin(ImportAdminMixin, admin.ModelAdmin):
+    importer_class = CompanyImporter
+    list_display = ("name", "status", "district", "industry", "intern_capacity", "created_at")
     list_filter = ("status", "district", "industry")
     search_fields = ("name", "district", "industry")
     inlines = [CompanyContactInline]
@@ -0,0 +1,65 @@
+# companies/importers.py
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+from accounts.importers import BatchImporter
+
+from .models import Company, CompanyContact
+
+STATUSES = {key for key, _ in Company.STATUS}
+
+
+class CompanyImporter(BatchImporter):
+    """
+    One row per company, optionally with one contact:
+    name, industry, district, address, status, intern_capacity,
+    contact_name, contact_title, contact_phone, contact_email
+    """
+    required = ("name",)
+
+    def clean_row(self, row):
+        status = (row.get("status") or "approved").lower()
+        if status not in STATUSES:
+            raise ValidationError(f"Unknown status: {row['status']}")
+
+        capacity = row.get("intern_capacity") or "0"
+        if not capacity.isdigit():
+            raise ValidationError(f"intern_capacity must be a whole number: {capacity}")
+
+        contact_email = row.get("contact_email", "")
+        if contact_email:
+            try:
+                validate_email(contact_email)
+            except ValidationError:
+                raise ValidationError(f"Invalid contact_email: {contact_email}")
+
+        return {
+            "name": row["name"][:200],
+            "industry": row.get("industry", "")[:120],
+            "district": row.get("district", "")[:120],
+            "address": row.get("address", "")[:255],
+            "status": status,
+            "intern_capacity": int(capacity),
+            "contact": {
+                "name": row.get("contact_name", "")[:120],
+                "title": row.get("contact_title", "")[:120],
+                "phone": row.get("contact_phone", "")[:40],
+                "email": contact_email,
+            },
+        }
+
+    def row_key(self, data):
+        return data["name"]
+
+    def existing(self, cleaned):
+        return set(Company.objects.filter(name__in=[d["name"] for d in cleaned]).values_list("name", flat=True))
+
+    def save_batch(self, rows):
+        companies = Company.objects.bulk_create([
+            Company(**{k: v for k, v in r.items() if k != "contact"}) for r in rows
+        ])
+        CompanyContact.objects.bulk_create([
+            CompanyContact(company=c, **r["contact"])
+            for c, r in zip(companies, rows)
+            if r["contact"]["name"]
+        ])
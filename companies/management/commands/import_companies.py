@@ -0,0 +1,10 @@
+from accounts.importers import ImportCommand
+from companies.importers import CompanyImporter
+
+
+class Command(ImportCommand):
+    help = (
+        "Bulk import companies (name, industry, district, address, status, intern_capacity"
+        "[, contact_name, contact_title, contact_phone, contact_email]) from CSV/XLSX."
+    )
+    importer_class = CompanyImporter
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='intern_capacity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -13,6 +13,8 @@ class Company(models.Model):
     address = models.CharField(max_length=255, blank=True)
 
     status = models.CharField(max_length=30, choices=STATUS, default="pending_verification")
+    # interns per period the company takes through university assignment (0 = not offered)
+    intern_capacity = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -0,0 +1,42 @@
+# config/gunicorn_asgi.py
+#
+# ASGI deployment profile:
+#   gunicorn config.asgi:application -c config/gunicorn_asgi.py
+# A few uvicorn workers, each running one event loop. The async views
+# (dashboards, weekly logs, downloads) wait on the database and on file storage
+# without tying up a worker, so a small pool copes with deadline-day traffic.
+# The sync views still work; Django runs them in a thread per request.
+# Live notifications with the in-process LocalBroker (tracking/live.py) only
+# reach streams held by the worker that published them, so that combination
+# defaults to one worker, and more than one is refused at startup.
+import multiprocessing
+import os
+
+LOCAL_BROKER = "tracking.live.LocalBroker"
+local_live_broker = (
+    os.environ.get("LIVE_NOTIFICATIONS_ENABLED", "False") == "True"
+    and os.environ.get("LIVE_BROKER", LOCAL_BROKER) == LOCAL_BROKER
+)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.environ.get(
+    "WEB_CONCURRENCY", 1 if local_live_broker else min(4, multiprocessing.cpu_count() + 1)
+))
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    if local_live_broker and server.cfg.workers > 1:
+        server.log.error(
+            "%s workers with live notifications on %s: most notifications would be lost. "
+            "Run one worker (WEB_CONCURRENCY=1) or set LIVE_BROKER to a shared broker.",
+            server.cfg.workers, LOCAL_BROKER,
+        )
+        raise SystemExit(1)
@@ -98,6 +98,8 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "placements.context_processors.active_period",
+                "tracking.context_processors.live_notifications",
             ],
         },
     },
@@ -105,11 +107,16 @@ TEMPLATES = [
 
 
 # ==============================
-# WSGI
+# WSGI / ASGI
 # ==============================
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+# ASGI profile: gunicorn config.asgi:application -c config/gunicorn_asgi.py
+# (async views: see accounts/aio.py). Keep CONN_MAX_AGE at 0 under ASGI,
+# every request runs in its own thread and would leak a connection.
+ASGI_APPLICATION = "config.asgi.application"
+
 
 # ==============================
 # DATABASE
@@ -123,6 +130,23 @@ DATABASES = {
 }
 
 
+# ==============================
+# CACHE
+# ==============================
+
+# Shared by every worker process (active period / placement ids, autosave
+# throttling), so a write seen by one worker is seen by all. Files under
+# tmp/cache by default; across several hosts use
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache with
+# CACHE_LOCATION=redis://host:6379/0 (needs the redis package).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / "tmp" / "cache")),
+    }
+}
+
+
 # ==============================
 # PASSWORDS
 # ==============================
@@ -172,6 +196,63 @@ STATICFILES_STORAGE = (
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads are stored once per content (placements/storage.py); run
+# `manage.py gc_blobs` periodically to remove files nothing refers to.
+# (STATICFILES_STORAGE above is no longer read since Django 5.1, so the
+# staticfiles entry keeps the storage static files were actually using.)
+STORAGES = {
+    "default": {"BACKEND": "placements.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# Uploads are only served through permission-checked views (placements/media.py).
+# SENDFILE_BACKEND hands the transfer to the web server once Django has said yes:
+#   "nginx"  -> X-Accel-Redirect to SENDFILE_URL, e.g.
+#               location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+#   "apache" -> X-Sendfile with the file's absolute path (mod_xsendfile)
+# Empty: Django sends the file itself (Range requests, os.sendfile under gunicorn).
+SENDFILE_BACKEND = os.getenv("SENDFILE_BACKEND", "")
+SENDFILE_URL = os.getenv("SENDFILE_URL", "/protected-media/")
+
+# Chunked, resumable uploads (placements/uploads.py): parts are appended to a
+# temp file outside MEDIA_ROOT and only moved into storage once complete.
+CHUNKED_UPLOAD_DIR = os.getenv("CHUNKED_UPLOAD_DIR", str(BASE_DIR / "tmp" / "uploads"))
+CHUNKED_UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB per request
+CHUNKED_UPLOAD_MAX_SIZE = 25 * 1024 * 1024  # 25MB per file
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24  # unfinished/unused uploads are purged after this
+CHUNKED_UPLOAD_MAX_OPEN = int(os.getenv("CHUNKED_UPLOAD_MAX_OPEN", "10"))  # per user, until attached or purged
+
+# Student/staff imports from the admin page hash passwords inline (no process
+# pool inside a request), so they take at most this many rows; larger files
+# go through manage.py import_students / import_staff.
+ADMIN_IMPORT_MAX_ROWS = int(os.getenv("ADMIN_IMPORT_MAX_ROWS", "50"))
+
+# Log and site-visit attachments are shrunk and thumbnailed after upload
+# (tracking/attachments.py) by this many background threads per process.
+# PDFs are only rewritten when pikepdf is installed.
+ATTACHMENT_WORKERS = int(os.getenv("ATTACHMENT_WORKERS", "2"))
+
+# Generated recommendation/placement letters (placements/letters.py).
+# LETTER_WORKERS: processes for batch generation with manage.py
+# generate_letters (0 = one per CPU); the coordinator pages render inline.
+LETTER_ISSUER = os.getenv("LETTER_ISSUER", "Internship Office")
+LETTER_SIGNATORY = os.getenv("LETTER_SIGNATORY", "Internship Coordinator")
+LETTER_SIGNATORY_TITLE = os.getenv("LETTER_SIGNATORY_TITLE", "For: Internship Office")
+LETTER_WORKERS = int(os.getenv("LETTER_WORKERS", "0"))
+
+# Draft autosave of the long forms (tracking/autosave.py): the browser sends
+# edits a few seconds after typing stops; each form row is written at most
+# once per this many seconds.
+AUTOSAVE_MIN_INTERVAL = int(os.getenv("AUTOSAVE_MIN_INTERVAL", "5"))
+
+# Live notifications (tracking/live.py), streamed to browsers as server-sent
+# events. Off by default: they need the ASGI deployment
+# (config/gunicorn_asgi.py) and are never offered on requests served over
+# WSGI. The default broker only reaches streams held by the same worker
+# process.
+LIVE_NOTIFICATIONS_ENABLED = os.getenv("LIVE_NOTIFICATIONS_ENABLED", "False") == "True"
+LIVE_BROKER = os.getenv("LIVE_BROKER", "tracking.live.LocalBroker")
+
 
 # ==============================
 # AUTH
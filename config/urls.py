@@ -30,6 +30,6 @@ urlpatterns = [
 ]
 
 
+# no static() for MEDIA_URL: uploads go through the protected views (placements/media.py)
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
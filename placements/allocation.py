@@ -0,0 +1,153 @@
+# placements/allocation.py
+#
+# University-supervisor allocation engine.
+# Inputs are loaded once into plain dicts/lists and allocated in memory:
+# - nobody goes above `cap` (the lowest max load any allocation can reach), and
+# - within that limit a student goes to a supervisor already visiting the same
+#   company, then the same district, to cut site-visit travel.
+import heapq
+import math
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db.models import Count
+
+from accounts.models import StaffProfile
+
+from .models import Placement
+
+
+@dataclass
+class AllocationItem:
+    key: int            # placement id (or request id when placements don't exist yet)
+    company_id: int
+    district: str
+
+
+@dataclass
+class AllocationResult:
+    assignments: dict = field(default_factory=dict)     # key -> supervisor id
+    reasons: dict = field(default_factory=dict)         # key -> "company" | "district" | "balance"
+    loads_before: dict = field(default_factory=dict)    # supervisor id -> active interns
+    loads_after: dict = field(default_factory=dict)
+    cap: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def max_load_before(self):
+        return max(self.loads_before.values(), default=0)
+
+    @property
+    def max_load_after(self):
+        return max(self.loads_after.values(), default=0)
+
+
+def uni_supervisor_candidates():
+    return StaffProfile.objects.filter(user__groups__name="UniversitySupervisor", user__is_active=True).distinct()
+
+
+def current_supervisor_state():
+    """
+    Returns (loads, company_sups, district_sups) from ACTIVE placements:
+    supervisor id -> intern count, and which supervisors already cover a company/district.
+    """
+    loads = {sid: 0 for sid in uni_supervisor_candidates().values_list("id", flat=True)}
+    company_sups = defaultdict(set)
+    district_sups = defaultdict(set)
+
+    rows = (
+        Placement.objects
+        .filter(status="active", university_supervisor_id__in=list(loads))
+        .values_list("university_supervisor_id", "company_id", "company__district")
+        .annotate(n=Count("id"))
+    )
+    for sid, company_id, district, n in rows:
+        loads[sid] += n
+        company_sups[company_id].add(sid)
+        if district:
+            district_sups[district.strip().lower()].add(sid)
+
+    return loads, company_sups, district_sups
+
+
+def allocate(items, loads, company_sups=None, district_sups=None):
+    """
+    Assign a supervisor to every item. Pure in-memory; nothing is saved.
+    `loads` maps every candidate supervisor id to its current load.
+    """
+    started = time.perf_counter()
+    result = AllocationResult(loads_before=dict(loads))
+    if not items or not loads:
+        result.loads_after = dict(loads)
+        return result
+
+    loads = dict(loads)
+    company_sups = defaultdict(set, {k: set(v) for k, v in (company_sups or {}).items()})
+    district_sups = defaultdict(set, {k: set(v) for k, v in (district_sups or {}).items()})
+
+    # lowest max load reachable: spread everything evenly, but never below today's max
+    cap = max(max(loads.values()), math.ceil((sum(loads.values()) + len(items)) / len(loads)))
+    result.cap = cap
+
+    heap = [(load, sid) for sid, load in loads.items()]
+    heapq.heapify(heap)
+
+    def least_loaded(candidates):
+        best = None
+        for sid in candidates:
+            if loads[sid] < cap and (best is None or (loads[sid], sid) < (loads[best], best)):
+                best = sid
+        return best
+
+    def pop_global():
+        # lazy deletion: skip heap entries whose load has changed since they were pushed
+        while True:
+            load, sid = heapq.heappop(heap)
+            if load == loads[sid]:
+                return sid
+
+    # biggest company/district clusters first so they can stay together
+    groups = defaultdict(list)
+    for item in items:
+        groups[((item.district or "").strip().lower(), item.company_id)].append(item)
+    ordered = sorted(groups.items(), key=lambda kv: (-len(kv[1]), kv[0][0], kv[0][1]))
+
+    for (district, company_id), group in ordered:
+        for item in group:
+            sid = least_loaded(company_sups[company_id])
+            reason = "company"
+            if sid is None and district:
+                sid = least_loaded(district_sups[district])
+                reason = "district"
+            if sid is None:
+                sid = pop_global()
+                reason = "balance"
+
+            loads[sid] += 1
+            heapq.heappush(heap, (loads[sid], sid))
+            company_sups[company_id].add(sid)
+            if district:
+                district_sups[district].add(sid)
+
+            result.assignments[item.key] = sid
+            result.reasons[item.key] = reason
+
+    result.loads_after = loads
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    return result
+
+
+def plan_unassigned_placements():
+    """Allocation plan for every ACTIVE placement without a university supervisor."""
+    items = [
+        AllocationItem(key=pid, company_id=company_id, district=district or "")
+        for pid, company_id, district in (
+            Placement.objects
+            .filter(status="active", university_supervisor__isnull=True)
+            .values_list("id", "company_id", "company__district")
+            .order_by("id")
+        )
+    ]
+    loads, company_sups, district_sups = current_supervisor_state()
+    return allocate(items, loads, company_sups, district_sups)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PlacementsConfig(AppConfig):
     name = 'placements'
+
+    def ready(self):
+        import placements.signals  # noqa
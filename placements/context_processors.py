@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from .periods import active_placement_for, get_active_period
+
+
+def active_period(request):
+    # lazy: pages that never use them cost nothing
+    return {
+        "active_period": SimpleLazyObject(get_active_period),
+        "active_placement": SimpleLazyObject(lambda: active_placement_for(request.user)),
+    }
@@ -1,13 +1,19 @@
 from django import forms
 from .models import InternshipRequest
+from .uploads import ChunkedUploadMixin
 from companies.models import Company
 from accounts.models import StaffProfile
 
-class InternshipRequestForm(forms.ModelForm):
+class InternshipRequestForm(ChunkedUploadMixin, forms.ModelForm):
     preferred_company = forms.ModelChoiceField(
         queryset=Company.objects.filter(status="approved"),
         required=False
     )
+    university_assign = forms.BooleanField(
+        required=False,
+        label="Let the university assign me a company",
+        help_text="Leave the company fields empty; the coordinator will match you using your preferred field and district.",
+    )
 
     class Meta:
         model = InternshipRequest
@@ -23,11 +29,23 @@ class InternshipRequestForm(forms.ModelForm):
             "request_letter",
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance and self.instance.request_source == "university_assigned":
+            self.fields["university_assign"].initial = True
+
     def clean(self):
         cleaned = super().clean()
         preferred = cleaned.get("preferred_company")
         proposed_name = (cleaned.get("proposed_company_name") or "").strip()
 
+        if cleaned.get("university_assign"):
+            if preferred or proposed_name:
+                raise forms.ValidationError("Leave the company fields empty if the university should assign you a company.")
+            if not (cleaned.get("preferred_field") or "").strip():
+                raise forms.ValidationError("Enter your preferred field so the university can match you to a company.")
+            return cleaned
+
         if not preferred and not proposed_name:
             raise forms.ValidationError("Select an approved company OR propose a new company.")
 
@@ -41,7 +59,7 @@ class RecommendationLetterForm(forms.ModelForm):
         model = InternshipRequest
         fields = ["recommendation_letter"]
 
-class AcceptanceLetterUploadForm(forms.ModelForm):
+class AcceptanceLetterUploadForm(ChunkedUploadMixin, forms.ModelForm):
     class Meta:
         model = InternshipRequest
         fields = ["acceptance_letter"]
@@ -67,3 +85,35 @@ class CoordinatorAcceptanceCommentForm(forms.Form):
     )
 
 
+class BulkVerifyAcceptanceForm(forms.Form):
+    ASSIGNMENT = [
+        ("manual", "Assign one supervisor to all selected students"),
+        ("balanced", "Balance across supervisors (least loaded first)"),
+    ]
+
+    requests = forms.ModelMultipleChoiceField(
+        queryset=InternshipRequest.objects.filter(status="acceptance_uploaded"),
+        widget=forms.CheckboxSelectMultiple,
+        error_messages={"required": "Select at least one request to verify."},
+    )
+    assignment = forms.ChoiceField(choices=ASSIGNMENT, initial="balanced", widget=forms.RadioSelect)
+    university_supervisor = forms.ModelChoiceField(
+        queryset=StaffProfile.objects.all(),
+        required=False,
+        widget=forms.Select(attrs={"class": "form-select form-select-sm"}),
+        help_text="Required when assigning one supervisor to all selected students.",
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get("assignment") == "manual" and not cleaned.get("university_supervisor"):
+            self.add_error("university_supervisor", "Select the University Supervisor to assign.")
+        return cleaned
+
+
+class GenerateRecommendationsForm(forms.Form):
+    requests = forms.ModelMultipleChoiceField(
+        queryset=InternshipRequest.objects.filter(status__in=["submitted", "under_review"]),
+        widget=forms.CheckboxSelectMultiple,
+        error_messages={"required": "Select at least one request."},
+    )
@@ -0,0 +1,249 @@
+# placements/letters.py
+#
+# Generated recommendation and placement letters.
+# Letters are built in two steps so the slow part can run in parallel:
+# - *_context() reads the database once per letter into a plain dict;
+# - render_letter() turns a dict into PDF bytes with reportlab, touching
+#   nothing else, so render_many() can hand batches to a process pool.
+# Only `manage.py generate_letters` asks for the pool (workers=None); the
+# coordinator pages render inline (the default, workers=1) rather than fork
+# processes inside a web request.
+# The ORM is only imported inside functions: pool workers import this module
+# without setting Django up.
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+POOL_MIN_LETTERS = 20  # below this, starting worker processes costs more than it saves
+
+TEMPLATES = {
+    "recommendation": {
+        "subject": "RECOMMENDATION FOR INDUSTRIAL TRAINING: {student_name} ({reg_no})",
+        "body": [
+            "This is to introduce {student_name}, registration number {reg_no}, a student of "
+            "{program} at {issuer}.",
+            "As part of the programme, students are required to undertake industrial training "
+            "during {period} ({start_date} to {end_date}). We kindly request that you consider "
+            "{student_name} for an internship placement in your organisation{field_clause}.",
+            "The University will assign a supervisor who will visit the student during the "
+            "training and liaise with you on the student's progress and assessment.",
+            "We appreciate your support in preparing our students for the world of work.",
+        ],
+    },
+    "placement": {
+        "subject": "INTERNSHIP PLACEMENT: {student_name} ({reg_no})",
+        "body": [
+            "This is to confirm that {student_name}, registration number {reg_no}, a student of "
+            "{program} at {issuer}, has been placed with {company} for industrial training from "
+            "{start_date} to {end_date}.",
+            "The industry supervisor is {industry_supervisor} and the University supervisor is "
+            "{university_supervisor}. The student is expected to submit weekly logs through the "
+            "internship system for approval by the industry supervisor.",
+            "Thank you for hosting our student.",
+        ],
+    },
+}
+
+UPLOAD_NAMES = {"recommendation": "Recommendation_Letter", "placement": "Placement_Letter"}
+
+
+def _fmt_date(d):
+    return d.strftime("%d %B %Y") if d else "-"
+
+
+def _issuer():
+    return {
+        "issuer": settings.LETTER_ISSUER,
+        "signatory": settings.LETTER_SIGNATORY,
+        "signatory_title": settings.LETTER_SIGNATORY_TITLE,
+        "date": _fmt_date(timezone.localdate()),
+    }
+
+
+def _student(student):
+    return {
+        "student_name": student.user.display_name,
+        "reg_no": student.reg_no,
+        "program": student.program.name if student.program else "the University",
+    }
+
+
+# -------------------------------------------------------------------
+# CONTEXTS (database -> plain dicts)
+# -------------------------------------------------------------------
+def recommendation_context(req):
+    company = req.preferred_company
+    return {
+        "kind": "recommendation",
+        **_issuer(),
+        **_student(req.student),
+        "period": req.period.name,
+        "start_date": _fmt_date(req.period.start_date),
+        "end_date": _fmt_date(req.period.end_date),
+        "field_clause": f", in the area of {req.preferred_field}" if req.preferred_field else "",
+        "addressee": [
+            company.name if company else req.proposed_company_name,
+            company.address if company else req.proposed_company_address,
+            company.district if company else req.proposed_company_district,
+        ],
+    }
+
+
+def placement_context(placement):
+    contact = placement.industry_supervisor
+    staff = placement.university_supervisor
+    return {
+        "kind": "placement",
+        **_issuer(),
+        **_student(placement.request.student),
+        "company": placement.company.name,
+        "start_date": _fmt_date(placement.start_date),
+        "end_date": _fmt_date(placement.end_date),
+        "industry_supervisor": contact.name if contact else "to be confirmed by the company",
+        "university_supervisor": staff.user.display_name if staff else "to be assigned",
+        "addressee": [placement.company.name, placement.company.address, placement.company.district],
+    }
+
+
+# -------------------------------------------------------------------
+# RENDERING (plain dict -> PDF bytes; runs in pool workers)
+# -------------------------------------------------------------------
+def render_letter(ctx):
+    template = TEMPLATES[ctx["kind"]]
+    values = {k: escape(v) if isinstance(v, str) else v for k, v in ctx.items()}
+    styles = getSampleStyleSheet()
+    body = styles["BodyText"]
+    body.leading = 15
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4,
+        leftMargin=2.5 * cm, rightMargin=2.5 * cm, topMargin=2 * cm, bottomMargin=2 * cm,
+        title=template["subject"].format_map(ctx), author=ctx["issuer"],
+    )
+    story = [
+        Paragraph(values["issuer"], styles["Title"]),
+        Spacer(1, 0.5 * cm),
+        Paragraph(values["date"], body),
+        Spacer(1, 0.4 * cm),
+        Paragraph("The Manager,", body),
+        *[Paragraph(escape(line), body) for line in ctx["addressee"] if line],
+        Spacer(1, 0.4 * cm),
+        Paragraph("Dear Sir/Madam,", body),
+        Spacer(1, 0.2 * cm),
+        Paragraph(f"<b>{template['subject'].format_map(values)}</b>", body),
+        Spacer(1, 0.2 * cm),
+    ]
+    for paragraph in template["body"]:
+        story += [Paragraph(paragraph.format_map(values), body), Spacer(1, 0.2 * cm)]
+    story += [
+        Spacer(1, 0.6 * cm),
+        Paragraph("Yours faithfully,", body),
+        Spacer(1, 1.2 * cm),
+        Paragraph(values["signatory"], body),
+        Paragraph(values["signatory_title"], body),
+    ]
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def _render_safe(ctx):
+    try:
+        return render_letter(ctx), None
+    except Exception as e:  # one bad record shouldn't sink the batch
+        return None, f"{type(e).__name__}: {e}"
+
+
+def render_many(contexts, workers=1):
+    """
+    [(pdf bytes or None, error or None)] in the order of `contexts`. With
+    workers=None (or 0) a pool of LETTER_WORKERS processes is used.
+    """
+    workers = workers or settings.LETTER_WORKERS or os.cpu_count() or 1
+    if workers == 1 or len(contexts) < POOL_MIN_LETTERS:
+        return [_render_safe(ctx) for ctx in contexts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_safe, contexts, chunksize=max(1, len(contexts) // (workers * 4))))
+
+
+# -------------------------------------------------------------------
+# BATCHES
+# -------------------------------------------------------------------
+@dataclass
+class LetterBatch:
+    generated: int = 0
+    failed: list = field(default_factory=list)  # (reg_no, error)
+    elapsed_s: float = 0.0
+
+    @property
+    def per_second(self):
+        return self.generated / self.elapsed_s if self.elapsed_s else 0.0
+
+
+def _filename(kind, reg_no):
+    return get_valid_filename(f"{UPLOAD_NAMES[kind]}_{reg_no}.pdf")
+
+
+def _run(kind, objs, context_fn, store, workers):
+    from django.core.files.base import ContentFile
+    from django.db import transaction
+
+    from .transitions import TransitionError
+
+    started = time.monotonic()
+    batch = LetterBatch()
+    contexts = [context_fn(obj) for obj in objs]
+    for obj, ctx, (pdf, error) in zip(objs, contexts, render_many(contexts, workers)):
+        if error:
+            batch.failed.append((ctx["reg_no"], error))
+            continue
+        try:
+            with transaction.atomic():
+                store(obj, ContentFile(pdf, name=_filename(kind, ctx["reg_no"])))
+        except TransitionError as e:
+            batch.failed.append((ctx["reg_no"], str(e)))
+            continue
+        batch.generated += 1
+    batch.elapsed_s = time.monotonic() - started
+    return batch
+
+
+def issue_recommendations(requests, issued_by=None, workers=1):
+    """Generate, store and issue recommendation letters for an InternshipRequest queryset."""
+    reqs = list(requests.select_related("student__user", "student__program", "period", "preferred_company"))
+
+    def store(req, content):
+        from . import transitions
+
+        transitions.apply(req, "recommend", issued_by)
+        # created only once the request has really moved, so a failed render or a lost race leaves no company
+        req.ensure_preferred_company()
+        req.recommendation_letter.save(content.name, content, save=False)
+        req.save()
+
+    return _run("recommendation", reqs, recommendation_context, store, workers)
+
+
+def generate_placement_letters(placements, workers=1):
+    """Generate and store placement letters for a Placement queryset."""
+    objs = list(placements.select_related(
+        "request__student__user", "request__student__program", "company",
+        "industry_supervisor", "university_supervisor__user",
+    ))
+
+    def store(placement, content):
+        placement.placement_letter.save(content.name, content, save=False)
+        placement.save(update_fields=["placement_letter"])
+
+    return _run("placement", objs, placement_context, store, workers)
@@ -0,0 +1,64 @@
+import datetime
+from collections import Counter
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from placements.models import StoredBlob
+from placements.storage import ContentAddressedStorage, name_hash, referenced_names
+
+
+class Command(BaseCommand):
+    help = "Recount references to stored files (placements/storage.py) and delete the blobs nothing refers to."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be fixed and deleted.")
+        parser.add_argument(
+            "--grace-hours", type=int, default=1,
+            help="Keep unreferenced blobs touched more recently than this (uploads still being saved).",
+        )
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError("The default storage is not ContentAddressedStorage.")
+        dry_run = options["dry_run"]
+
+        counts = Counter(sha for sha in map(name_hash, referenced_names()) if sha)
+
+        fixed = 0
+        for sha256, refcount in StoredBlob.objects.values_list("sha256", "refcount").iterator():
+            actual = counts.get(sha256, 0)
+            if actual != refcount:
+                fixed += 1
+                if not dry_run:
+                    # compare-and-set: leave rows a concurrent save just changed
+                    StoredBlob.objects.filter(sha256=sha256, refcount=refcount).update(refcount=actual)
+
+        cutoff = timezone.now() - datetime.timedelta(hours=options["grace_hours"])
+        deleted = freed = 0
+        unreferenced = StoredBlob.objects.filter(refcount=0, updated_at__lt=cutoff)
+        for sha256, size in unreferenced.values_list("sha256", "size").iterator():
+            if counts.get(sha256):
+                continue  # only happens with --dry-run
+            if not dry_run and not self._collect(unreferenced, sha256):
+                continue  # referenced again since the scan
+            deleted += 1
+            freed += size
+
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(f"Refcounts corrected: {fixed}")
+        self.stdout.write(self.style.SUCCESS(f"{verb}: {deleted} blobs ({freed / (1024 * 1024):.1f}MB)"))
+
+    def _collect(self, unreferenced, sha256):
+        """Delete a blob's row and file, only if the row is still unreferenced (and locked meanwhile)."""
+        with transaction.atomic():
+            blob = unreferenced.filter(sha256=sha256)
+            if not list(blob.select_for_update().values_list("sha256", flat=True)):
+                return False
+            if not blob.delete()[0]:
+                return False
+            # inside the lock: a concurrent save waits for it, then finds no row and writes the blob again
+            default_storage.delete_blob(sha256)
+        return True
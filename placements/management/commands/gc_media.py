@@ -0,0 +1,104 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from placements.models import StoredBlob
+from placements.storage import BLOB_DIR, name_hash, referenced_names
+
+
+def scan(root, skip=()):
+    """(relative name, DirEntry) for every regular file under `root`, one directory in memory at a time."""
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            it = os.scandir(os.path.join(root, rel_dir))
+        except FileNotFoundError:
+            continue
+        with it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue  # .gitkeep and the like
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if rel not in skip:
+                        stack.append(rel)
+                elif entry.is_file(follow_symlinks=False):
+                    yield rel, entry
+
+
+class Command(BaseCommand):
+    help = "Delete (or with --dry-run, list) files under MEDIA_ROOT that no database row refers to."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report orphaned files.")
+        parser.add_argument(
+            "--grace-hours", type=int, default=1,
+            help="Keep files modified more recently than this (rows still being saved).",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        verbosity = options["verbosity"]
+        root = str(settings.MEDIA_ROOT)
+        cutoff = time.time() - options["grace_hours"] * 3600
+        started = time.monotonic()
+
+        # content-addressed names point into blobs/ and are counted there (gc_blobs);
+        # only plain names from before that storage need remembering
+        referenced = {name for name in referenced_names() if not name_hash(name)}
+        self.stdout.write(f"Referenced plain names: {len(referenced)} ({time.monotonic() - started:.1f}s)")
+
+        scanned = orphans = orphan_bytes = 0
+
+        def orphan(path, entry):
+            nonlocal orphans, orphan_bytes
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > cutoff:
+                return
+            orphans += 1
+            orphan_bytes += stat.st_size
+            if verbosity > 1:
+                self.stdout.write(f"  {path}")
+            if not dry_run:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+        skip = {BLOB_DIR}
+        upload_dir = os.path.relpath(settings.CHUNKED_UPLOAD_DIR, root)
+        if not upload_dir.startswith(".."):
+            skip.add(upload_dir.replace(os.sep, "/"))  # chunked uploads in progress
+
+        for name, entry in scan(root, skip=skip):
+            scanned += 1
+            if name not in referenced:
+                orphan(name, entry)
+
+        # blobs/ab/<sha256>, checked against StoredBlob one prefix directory at a time;
+        # loose files directly in blobs/ are temp files from interrupted saves
+        blob_root = os.path.join(root, BLOB_DIR)
+        prefixes = []
+        if os.path.isdir(blob_root):
+            with os.scandir(blob_root) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        prefixes.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        scanned += 1
+                        orphan(f"{BLOB_DIR}/{entry.name}", entry)
+
+        for prefix in prefixes:
+            known = set(StoredBlob.objects.filter(sha256__startswith=prefix).values_list("sha256", flat=True).iterator())
+            for name, entry in scan(os.path.join(blob_root, prefix)):
+                scanned += 1
+                if name not in known:
+                    orphan(f"{BLOB_DIR}/{prefix}/{name}", entry)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(f"Scanned: {scanned} files in {elapsed:.1f}s ({scanned / elapsed:.0f} files/s)")
+        self.stdout.write(self.style.SUCCESS(f"{verb}: {orphans} orphaned files ({orphan_bytes / (1024 * 1024):.1f}MB)"))
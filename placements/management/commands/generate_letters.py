@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from placements import letters
+from placements.models import InternshipPeriod, InternshipRequest, Placement
+from placements.periods import get_active_period
+
+
+class Command(BaseCommand):
+    help = "Generate recommendation letters (issuing them) or placement letters for a period, in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=["recommendation", "placement"])
+        parser.add_argument("--period", type=int, help="Period id (default: the active period).")
+        parser.add_argument("--workers", type=int, help="Worker processes (default: LETTER_WORKERS, else one per CPU).")
+        parser.add_argument(
+            "--regenerate", action="store_true",
+            help="Also replace letters that already exist (recommendations already issued, placement letters on file).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many letters would be generated.")
+
+    def handle(self, *args, **options):
+        period = (
+            InternshipPeriod.objects.filter(id=options["period"]).first() if options["period"] else get_active_period()
+        )
+        if not period:
+            raise CommandError("No such period (and no active period).")
+
+        if options["kind"] == "recommendation":
+            qs = InternshipRequest.objects.for_period(period)
+            if options["regenerate"]:
+                qs = qs.filter(status__in=["submitted", "under_review", "recommended"])
+            else:
+                qs = qs.filter(Q(recommendation_letter="") | Q(recommendation_letter__isnull=True), status__in=["submitted", "under_review"])
+        else:
+            qs = Placement.objects.for_period(period).filter(status__in=["pending_student_ack", "active"])
+            if not options["regenerate"]:
+                qs = qs.filter(Q(placement_letter="") | Q(placement_letter__isnull=True))
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"Would generate: {qs.count()} {options['kind']} letters"))
+            return
+
+        # None: the process pool (LETTER_WORKERS, else one per CPU)
+        if options["kind"] == "recommendation":
+            batch = letters.issue_recommendations(qs, workers=options["workers"])
+        else:
+            batch = letters.generate_placement_letters(qs, workers=options["workers"])
+
+        for reg_no, error in batch.failed:
+            self.stderr.write(f"{reg_no}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated: {batch.generated} {options['kind']} letters in {batch.elapsed_s:.1f}s "
+            f"({batch.per_second:.0f}/s), failed: {len(batch.failed)}"
+        ))
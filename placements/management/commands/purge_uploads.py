@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from placements.models import ChunkedUpload
+from placements.uploads import discard_upload
+
+
+class Command(BaseCommand):
+    help = "Delete chunked uploads (and their temp files) that were abandoned or never attached to a form."
+
+    def handle(self, *args, **options):
+        n = 0
+        for upload in ChunkedUpload.objects.stale().iterator():
+            discard_upload(upload)
+            n += 1
+        self.stdout.write(self.style.SUCCESS(f"Purged: {n} uploads"))
@@ -0,0 +1,193 @@
+# placements/matching.py
+#
+# Company–student matching for "university_assigned" requests.
+# Companies are indexed once (token -> companies, district -> companies), so each
+# student is only scored against companies sharing a field/program token or the
+# district, instead of every company. Matching then takes candidate pairs from the
+# highest score down and accepts a pair while the student is free and the company
+# has capacity left; with one shared score per pair this gives a stable matching.
+# Only each student's TOP_K best candidates are paired at first. A student left
+# unmatched while more candidates were cut off gets them all and the pass is
+# rerun, so no company outside a student's list could have taken them instead.
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db.models import Count
+
+from companies.models import Company
+
+from .models import InternshipRequest
+
+FIELD_WEIGHT = 50
+PROGRAM_WEIGHT = 20
+DISTRICT_WEIGHT = 30
+
+TOP_K = 20  # candidate companies kept per student
+
+STOP_WORDS = {"and", "the", "for", "with"}
+
+
+def tokens(text):
+    # 6-char prefixes so "computer"/"computing" or "engineer"/"engineering" still match
+    return {w[:6] for w in re.findall(r"[a-z0-9]+", (text or "").lower()) if len(w) > 2 and w not in STOP_WORDS}
+
+
+def norm_district(text):
+    return (text or "").strip().lower()
+
+
+@dataclass
+class StudentCandidate:
+    request_id: int
+    field_tokens: set
+    program_tokens: set
+    district: str
+
+
+@dataclass
+class CompanyCandidate:
+    company_id: int
+    industry_tokens: set
+    district: str
+    capacity: int
+
+
+@dataclass
+class MatchProposal:
+    request_id: int
+    company_id: int
+    score: float
+    breakdown: dict  # {"field": .., "program": .., "district": ..}
+
+
+@dataclass
+class MatchResult:
+    proposals: list = field(default_factory=list)
+    unmatched: list = field(default_factory=list)  # request ids
+    elapsed_ms: float = 0.0
+
+
+def score_breakdown(student, company):
+    f = FIELD_WEIGHT * len(student.field_tokens & company.industry_tokens) / len(student.field_tokens) if student.field_tokens else 0.0
+    p = PROGRAM_WEIGHT * len(student.program_tokens & company.industry_tokens) / len(student.program_tokens) if student.program_tokens else 0.0
+    d = DISTRICT_WEIGHT if student.district and student.district == company.district else 0.0
+    return {"field": round(f, 1), "program": round(p, 1), "district": round(d, 1)}
+
+
+def match(students, companies, top_k=TOP_K):
+    started = time.perf_counter()
+    result = MatchResult()
+
+    by_token = defaultdict(list)
+    by_district = defaultdict(list)
+    for idx, c in enumerate(companies):
+        if c.capacity <= 0:
+            continue
+        for t in c.industry_tokens:
+            by_token[t].append(idx)
+        if c.district:
+            by_district[c.district].append(idx)
+
+    # each student's scored companies: [(score, -company_id, company idx, breakdown)], best first
+    scored = {}
+    for s in students:
+        candidates = set(by_district.get(s.district, ()))
+        for t in s.field_tokens | s.program_tokens:
+            candidates.update(by_token.get(t, ()))
+
+        options = []
+        for idx in candidates:
+            b = score_breakdown(s, companies[idx])
+            total = b["field"] + b["program"] + b["district"]
+            if total > 0:
+                options.append((total, -companies[idx].company_id, idx, b))
+        options.sort(reverse=True)
+        scored[s.request_id] = options
+
+    full = set()  # students whose every candidate is paired
+    while True:
+        pairs = [
+            (total, -request_id, idx, b)
+            for request_id, options in scored.items()
+            for total, _, idx, b in (options if request_id in full else options[:top_k])
+        ]
+        pairs.sort(reverse=True)
+
+        remaining = [c.capacity for c in companies]
+        placed = set()
+        proposals = []
+        for total, neg_req, idx, b in pairs:
+            request_id = -neg_req
+            if request_id in placed or remaining[idx] <= 0:
+                continue
+            placed.add(request_id)
+            remaining[idx] -= 1
+            proposals.append(MatchProposal(request_id, companies[idx].company_id, round(total, 1), b))
+
+        cut_off = {
+            request_id for request_id, options in scored.items()
+            if request_id not in placed and request_id not in full and len(options) > top_k
+        }
+        if not cut_off:
+            break
+        full |= cut_off
+
+    result.proposals = proposals
+    result.unmatched = [s.request_id for s in students if s.request_id not in placed]
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    return result
+
+
+def pending_university_assigned(period):
+    return InternshipRequest.objects.filter(
+        period=period,
+        request_source="university_assigned",
+        preferred_company__isnull=True,
+        status__in=["submitted", "under_review"],
+    )
+
+
+def plan_company_matches(period):
+    students = [
+        StudentCandidate(
+            request_id=rid,
+            field_tokens=tokens(preferred_field),
+            program_tokens=tokens(program) | tokens(department),
+            district=norm_district(district),
+        )
+        for rid, preferred_field, program, department, district in (
+            pending_university_assigned(period)
+            .values_list(
+                "id", "preferred_field",
+                "student__program__name", "student__program__department__name",
+                "student__district",
+            )
+            .order_by("submitted_at", "id")
+        )
+    ]
+
+    # capacity left = intern_capacity minus requests this period already pointing at the company
+    taken = dict(
+        InternshipRequest.objects
+        .filter(period=period, preferred_company__isnull=False)
+        .exclude(status__in=["draft", "rejected"])
+        .values_list("preferred_company_id")
+        .annotate(n=Count("id"))
+    )
+    companies = [
+        CompanyCandidate(
+            company_id=cid,
+            industry_tokens=tokens(industry),
+            district=norm_district(district),
+            capacity=max(capacity - taken.get(cid, 0), 0),
+        )
+        for cid, industry, district, capacity in (
+            Company.objects
+            .filter(status="approved", intern_capacity__gt=0)
+            .values_list("id", "industry", "district", "intern_capacity")
+        )
+    ]
+
+    return match(students, companies)
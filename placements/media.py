@@ -0,0 +1,185 @@
+# placements/media.py
+#
+# Protected media: uploaded files (CVs, request/recommendation/acceptance
+# letters, placement letters, weekly-log and site-visit attachments) are never
+# served straight from MEDIA_URL. A view checks who is asking, then serve_file()
+# either hands the transfer to the web server (SENDFILE_BACKEND, see settings)
+# or sends the file itself with single-range support.
+# On the fallback path under WSGI the open file goes to wsgi.file_wrapper, which
+# gunicorn turns into os.sendfile(), so the bytes never pass through Python.
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+# -------------------------------------------------------------------
+# WHO MAY SEE WHAT
+# -------------------------------------------------------------------
+def _in_groups(user, names):
+    return user.is_superuser or user.groups.filter(name__in=names).exists()
+
+
+def can_view_placement_files(user, placement):
+    """Placement letter, weekly-log and site-visit attachments."""
+    if _in_groups(user, ["Coordinator", "Admin"]):
+        return True
+    if placement.request.student.user_id == user.id:
+        return True
+    staff = getattr(user, "staff_profile", None)
+    if staff and placement.university_supervisor_id == staff.id:
+        return True
+    industry = getattr(user, "industry_profile", None)
+    return bool(industry and industry.company_id == placement.company_id)
+
+
+def can_view_request_files(user, req):
+    """CV, request letter, recommendation and acceptance letters of an internship request."""
+    if _in_groups(user, ["Coordinator", "Admin"]):
+        return True
+    if req.student.user_id == user.id:
+        return True
+    placement = getattr(req, "placement", None)
+    staff = getattr(user, "staff_profile", None)
+    return bool(placement and staff and placement.university_supervisor_id == staff.id)
+
+
+# -------------------------------------------------------------------
+# SERVING
+# -------------------------------------------------------------------
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single "bytes=" range, or None to send the
+    whole file (no header, multiple ranges or anything we don't understand).
+    """
+    m = RANGE_RE.match(header.strip()) if header else None
+    if not m or m.groups() == ("", ""):
+        return None
+
+    first, last = m.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        suffix = int(last)
+        if suffix == 0:
+            raise RangeNotSatisfiable()
+        start, end = max(size - suffix, 0), size - 1
+
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+class FileSlice:
+    """
+    At most `length` bytes of an open file from its current position. fileno()
+    is passed through so wsgi.file_wrapper can still os.sendfile() it; the
+    server limits that to Content-Length.
+    """
+
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.f.fileno()
+
+    def close(self):
+        self.f.close()
+
+
+async def _async_chunks(part):
+    try:
+        while chunk := await sync_to_async(part.read)(CHUNK_SIZE):
+            yield chunk
+    finally:
+        await sync_to_async(part.close)()
+
+
+def _offload(field_file, content_type, disposition):
+    backend = settings.SENDFILE_BACKEND
+    response = HttpResponse(content_type=content_type)
+    response["Content-Disposition"] = disposition
+    if backend == "nginx":
+        # the path on disk, which for content-addressed names is the blob (placements/storage.py)
+        relative = os.path.relpath(field_file.path, settings.MEDIA_ROOT).replace(os.sep, "/")
+        response["X-Accel-Redirect"] = quote(settings.SENDFILE_URL.rstrip("/") + "/" + relative)
+    else:
+        response["X-Sendfile"] = field_file.path
+    return response
+
+
+def serve_file(request, field_file, filename=None, as_attachment=False):
+    """Response for a FileField the caller has already authorised."""
+    if not field_file:
+        raise Http404("No file.")
+
+    try:
+        path = field_file.path
+        stat = os.stat(path)
+    except (OSError, NotImplementedError):
+        raise Http404("File not found.")
+
+    filename = filename or os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    disposition = content_disposition_header(as_attachment, filename)
+
+    if settings.SENDFILE_BACKEND:
+        return _offload(field_file, content_type, disposition)
+
+    size = stat.st_size
+    last_modified = http_date(stat.st_mtime)
+    if_range = request.headers.get("If-Range")
+    try:
+        byte_range = parse_range(request.headers.get("Range"), size) if if_range in (None, last_modified) else None
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = max(end - start + 1, 0)
+    f = open(path, "rb")
+    f.seek(start)
+    part = FileSlice(f, length)
+
+    if isinstance(request, ASGIRequest):
+        # a sync iterator would be read into memory first under ASGI
+        response = StreamingHttpResponse(_async_chunks(part), content_type=content_type)
+    else:
+        response = FileResponse(part, content_type=content_type)
+    response["Content-Disposition"] = disposition
+    response["Content-Length"] = str(length)
+    response["Accept-Ranges"] = "bytes"
+    response["Last-Modified"] = last_modified
+    if byte_range:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+aserve_file = sync_to_async(serve_file)
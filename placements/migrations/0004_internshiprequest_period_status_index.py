@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_studentprofile_district_studentprofile_program'),
+        ('companies', '0002_company_intern_capacity'),
+        ('placements', '0003_internshiprequest_coordinator_comment_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='internshiprequest',
+            index=models.Index(fields=['period', 'status'], name='placements__period__04b3e0_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0005_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('size', models.PositiveBigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='internshiprequest',
+            name='acceptance_letter',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='requests/acceptance_letters/'),
+        ),
+        migrations.AlterField(
+            model_name='internshiprequest',
+            name='cv',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='requests/cv/'),
+        ),
+        migrations.AlterField(
+            model_name='internshiprequest',
+            name='recommendation_letter',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='requests/recommendation_letters/'),
+        ),
+        migrations.AlterField(
+            model_name='internshiprequest',
+            name='request_letter',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='requests/letters/'),
+        ),
+        migrations.AlterField(
+            model_name='placement',
+            name='placement_letter',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='placements/letters/'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:10
+
+from django.db import migrations
+
+
+def approved_to_under_review(apps, schema_editor):
+    # "approved" was never a request status; the review page wrote it on approval
+    InternshipRequest = apps.get_model("placements", "InternshipRequest")
+    InternshipRequest.objects.filter(status="approved").update(status="under_review")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0006_stored_blobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(approved_to_under_review, migrations.RunPython.noop),
+    ]
@@ -1,18 +1,52 @@
+import datetime
+import os
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 from companies.models import Company, CompanyContact
 
+class InternshipPeriodQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(is_active=True)
+
+    def closed(self, today=None):
+        # ended and no longer active: its data will not change any more
+        return self.filter(is_active=False, end_date__lt=today or timezone.localdate())
+
+
+class PeriodScopedQuerySet(models.QuerySet):
+    # lookup from the model to its InternshipPeriod; set by subclasses
+    period_lookup = "period"
+
+    def for_period(self, period):
+        """Rows belonging to `period`; `None` means every period."""
+        if period is None:
+            return self
+        return self.filter(**{self.period_lookup: period})
+
+
 class InternshipPeriod(models.Model):
     name = models.CharField(max_length=120)  # e.g. "May–Aug 2026"
     start_date = models.DateField()
     end_date = models.DateField()
     is_active = models.BooleanField(default=False)
-    
+
+    objects = InternshipPeriodQuerySet.as_manager()
+
+    @property
+    def is_closed(self):
+        return not self.is_active and self.end_date < timezone.localdate()
 
     def __str__(self):
         return self.name
 
 
+class InternshipRequestQuerySet(PeriodScopedQuerySet):
+    period_lookup = "period"
+
+
 class InternshipRequest(models.Model):
     SOURCE = [
         ("student_selected", "Student selected from list"),
@@ -51,8 +85,8 @@ class InternshipRequest(models.Model):
     notes = models.TextField(blank=True)
 
     # attachments
-    cv = models.FileField(upload_to="requests/cv/", blank=True, null=True)
-    request_letter = models.FileField(upload_to="requests/letters/", blank=True, null=True)
+    cv = models.FileField(upload_to="requests/cv/", max_length=255, blank=True, null=True)
+    request_letter = models.FileField(upload_to="requests/letters/", max_length=255, blank=True, null=True)
 
     status = models.CharField(max_length=40, choices=STATUS, default="draft")
     submitted_at = models.DateTimeField(null=True, blank=True)
@@ -61,13 +95,29 @@ class InternshipRequest(models.Model):
     reviewed_at = models.DateTimeField(null=True, blank=True)
     review_notes = models.TextField(blank=True)
 
+    objects = InternshipRequestQuerySet.as_manager()
+
     class Meta:
         unique_together = [("student", "period")]  # one request per period
-
-    def submit(self):
-        self.status = "submitted"
-        self.submitted_at = timezone.now()
-        self.save()
+        indexes = [models.Index(fields=["period", "status"])]  # per-period queues
+
+    def submit(self, user=None):
+        from .transitions import apply
+
+        apply(self, "submit", user)
+
+    def ensure_preferred_company(self):
+        """A proposed company becomes a Company row once the coordinator recommends the student to it."""
+        if not self.preferred_company and self.proposed_company_name.strip():
+            company, _ = Company.objects.get_or_create(
+                name=self.proposed_company_name.strip(),
+                defaults={
+                    "district": self.proposed_company_district,
+                    "address": self.proposed_company_address,
+                    "status": "approved",  # change to pending_verification if you want strict vetting
+                },
+            )
+            self.preferred_company = company
 
     def __str__(self):
         return f"{self.student.reg_no} - {self.period.name} ({self.status})"
@@ -75,13 +125,13 @@ class InternshipRequest(models.Model):
 
         # Coordinator issues recommendation letter
     recommendation_letter = models.FileField(
-        upload_to="requests/recommendation_letters/", null=True, blank=True
+        upload_to="requests/recommendation_letters/", max_length=255, null=True, blank=True
     )
     recommendation_issued_at = models.DateTimeField(null=True, blank=True)
 
     # Student uploads acceptance letter
     acceptance_letter = models.FileField(
-        upload_to="requests/acceptance_letters/", null=True, blank=True
+        upload_to="requests/acceptance_letters/", max_length=255, null=True, blank=True
     )
     acceptance_uploaded_at = models.DateTimeField(null=True, blank=True)
 
@@ -92,6 +142,10 @@ class InternshipRequest(models.Model):
 
 
 
+class PlacementQuerySet(PeriodScopedQuerySet):
+    period_lookup = "request__period"
+
+
 class Placement(models.Model):
     STATUS = [
         ("pending_student_ack", "Pending student acknowledgement"),
@@ -111,14 +165,65 @@ class Placement(models.Model):
     end_date = models.DateField()
 
     # attachment: placement letter generated/uploaded by coordinator
-    placement_letter = models.FileField(upload_to="placements/letters/", blank=True, null=True)
+    placement_letter = models.FileField(upload_to="placements/letters/", max_length=255, blank=True, null=True)
 
     status = models.CharField(max_length=30, choices=STATUS, default="pending_student_ack")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = PlacementQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.request.student.reg_no} @ {self.company.name}"
 
 
+class ChunkedUploadQuerySet(models.QuerySet):
+    def _cutoff(self, now=None):
+        return (now or timezone.now()) - datetime.timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRY_HOURS)
+
+    def stale(self, now=None):
+        return self.filter(updated_at__lt=self._cutoff(now))
 
+    def fresh(self, now=None):
+        return self.filter(updated_at__gte=self._cutoff(now))
+
+
+class ChunkedUpload(models.Model):
+    """A file being sent in parts (see placements/uploads.py); bytes live in CHUNKED_UPLOAD_DIR until attached."""
+    STATUS = [
+        ("uploading", "Uploading"),
+        ("complete", "Complete"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey("accounts.User", on_delete=models.CASCADE, related_name="chunked_uploads")
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    offset = models.PositiveBigIntegerField(default=0)  # bytes received so far
+
+    status = models.CharField(max_length=20, choices=STATUS, default="uploading")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ChunkedUploadQuerySet.as_manager()
+
+    @property
+    def path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.id}.part")
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
+class StoredBlob(models.Model):
+    """One stored file body, shared by every FileField value that embeds its hash (placements/storage.py)."""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]}… ({self.refcount} refs)"
 
@@ -0,0 +1,122 @@
+# placements/periods.py
+#
+# Which InternshipPeriod a page is looking at.
+# - The id of the active period and of each student's active placement is
+#   cached (and dropped by placements/signals.py whenever they change), so
+#   student pages load them by primary key instead of repeating the filtered
+#   lookups on every request. Only ids go in the cache: it is shared by every
+#   worker process (CACHES in settings), and a model instance from it would
+#   hide changes made elsewhere.
+# - Coordinator pages take ?period=<id> (or ?period=all) and default to the
+#   active period, so current-term screens never scan earlier cohorts.
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+
+from .models import InternshipPeriod, Placement
+
+ALL_PERIODS = "all"
+
+CACHE_TIMEOUT = 300  # seconds; also bounds staleness across worker processes
+ACTIVE_PERIOD_KEY = "placements:active_period"
+ACTIVE_PLACEMENT_KEY = "placements:active_placement:{}"
+NOTHING = "none"  # cached "there isn't one", so misses are cached too
+
+
+def get_active_period():
+    period_id = cache.get(ACTIVE_PERIOD_KEY)
+    if period_id == NOTHING:
+        return None
+    if period_id is not None:
+        period = InternshipPeriod.objects.filter(id=period_id).first()
+        if period is not None:
+            return period
+    period = InternshipPeriod.objects.active().first()
+    cache.set(ACTIVE_PERIOD_KEY, period.id if period else NOTHING, CACHE_TIMEOUT)
+    return period
+
+
+def _placements():
+    return Placement.objects.filter(status="active").select_related(
+        "company", "request", "request__student", "request__student__user"
+    )
+
+
+def get_active_placement(student):
+    key = ACTIVE_PLACEMENT_KEY.format(student.id)
+    placement_id = cache.get(key)
+    if placement_id == NOTHING:
+        return None
+    if placement_id is not None:
+        placement = _placements().filter(id=placement_id).first()
+        if placement is not None:
+            return placement
+    # not cached, or no longer active
+    placement = _placements().filter(request__student=student).order_by("-created_at").first()
+    cache.set(key, placement.id if placement else NOTHING, CACHE_TIMEOUT)
+    return placement
+
+
+def active_placement_for(user):
+    """Active placement of a student user (None for everyone else), memoised on the user for the request."""
+    if not hasattr(user, "_active_placement"):
+        student = getattr(user, "student_profile", None) if user.is_authenticated else None
+        user._active_placement = get_active_placement(student) if student else None
+    return user._active_placement
+
+
+async def aget_active_placement(student):
+    """get_active_placement() for async views."""
+    key = ACTIVE_PLACEMENT_KEY.format(student.id)
+    placement_id = await cache.aget(key)
+    if placement_id == NOTHING:
+        return None
+    if placement_id is not None:
+        placement = await _placements().filter(id=placement_id).afirst()
+        if placement is not None:
+            return placement
+    placement = await _placements().filter(request__student=student).order_by("-created_at").afirst()
+    await cache.aset(key, placement.id if placement else NOTHING, CACHE_TIMEOUT)
+    return placement
+
+
+async def aactive_placement_for(user, student):
+    """active_placement_for() for async views; `student` is the user's (already loaded) profile."""
+    if not hasattr(user, "_active_placement"):
+        user._active_placement = await aget_active_placement(student) if student else None
+    return user._active_placement
+
+
+def invalidate_active_period():
+    cache.delete(ACTIVE_PERIOD_KEY)
+
+
+def invalidate_active_placements(student_ids):
+    cache.delete_many([ACTIVE_PLACEMENT_KEY.format(sid) for sid in set(student_ids)])
+
+
+def selected_period(request, allow_all=True):
+    """
+    The period picked with ?period=, else the active one.
+    Returns None for "all periods" (or when nothing is active and `allow_all`);
+    with allow_all=False it falls back to the most recent period instead.
+    """
+    value = request.GET.get("period", "")
+    if value.isdigit():
+        return get_object_or_404(InternshipPeriod, id=value)
+
+    if value == ALL_PERIODS and allow_all:
+        return None
+
+    period = get_active_period()
+    if period is None and not allow_all:
+        period = InternshipPeriod.objects.order_by("-start_date").first()
+    return period
+
+
+def period_context(request, allow_all=True):
+    """`period` + `periods` for templates/placements/partials/period_picker.html."""
+    return {
+        "period": selected_period(request, allow_all=allow_all),
+        "periods": InternshipPeriod.objects.order_by("-start_date"),
+        "allow_all_periods": allow_all,
+    }
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import InternshipPeriod, InternshipRequest, Placement
+from .periods import invalidate_active_period, invalidate_active_placements
+from .storage import track_file_fields
+
+track_file_fields(InternshipRequest)
+track_file_fields(Placement)
+
+
+@receiver([post_save, post_delete], sender=InternshipPeriod)
+def drop_active_period(sender, **kwargs):
+    invalidate_active_period()
+
+
+@receiver([post_save, post_delete], sender=Placement)
+def drop_active_placement(sender, instance, **kwargs):
+    if Placement.request.is_cached(instance):
+        student_id = instance.request.student_id
+    else:
+        student_id = (
+            InternshipRequest.objects.filter(id=instance.request_id).values_list("student_id", flat=True).first()
+        )
+    if student_id:
+        invalidate_active_placements([student_id])
@@ -0,0 +1,199 @@
+# placements/storage.py
+#
+# Content-addressed media storage.
+# Every uploaded body is stored once, under its SHA-256 (MEDIA_ROOT/blobs/ab/abcd…),
+# and counted in StoredBlob.refcount. FileFields keep a readable name that
+# embeds the hash: "requests/cv/<sha256>/My_CV.pdf". The same CV uploaded
+# twice is written once.
+# Lifecycle (track_file_fields): a row's files are released when the row is
+# deleted (cascades included) or a file is replaced, after the transaction
+# commits. Releasing only decrements the count; `manage.py gc_blobs` recounts
+# every reference and removes blobs nobody points at.
+# Names from before this storage (no hash in them) behave as plain files.
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+BLOB_DIR = "blobs"
+MAX_NAME_LENGTH = 255
+CAS_NAME_RE = re.compile(r"(?:^|/)([0-9a-f]{64})/[^/]+$")
+
+
+def blob_name(sha256):
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256}"
+
+
+def name_hash(name):
+    """The SHA-256 embedded in a stored name, or None for plain (older) names."""
+    m = CAS_NAME_RE.search(name or "")
+    return m.group(1) if m else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def _cas_name(self, name, sha256):
+        head, tail = posixpath.split(name)
+        prefix = posixpath.join(head, sha256) + "/"
+        room = MAX_NAME_LENGTH - len(prefix)
+        if len(tail) > room:
+            root, ext = posixpath.splitext(tail)
+            tail = root[: room - len(ext)] + ext
+        return prefix + tail
+
+    def path(self, name):
+        sha256 = name_hash(name)
+        return super().path(blob_name(sha256) if sha256 else name)
+
+    def _save(self, name, content):
+        StoredBlob = apps.get_model("placements", "StoredBlob")
+
+        # one pass: hash while writing to a temp file next to the blobs
+        blob_root = super().path(BLOB_DIR)
+        os.makedirs(blob_root, exist_ok=True)
+        h = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=blob_root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in content.chunks():
+                    h.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+
+            sha256 = h.hexdigest()
+            final = super().path(blob_name(sha256))
+            with transaction.atomic():
+                self._count_reference(StoredBlob, sha256, size)
+                # checked after counting: gc_blobs only removes a blob while its row is
+                # still at 0 (and locked), so one collected before this is written again
+                if os.path.exists(final):
+                    os.remove(tmp_path)  # already stored: nothing to write
+                else:
+                    os.makedirs(os.path.dirname(final), exist_ok=True)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(tmp_path, self.file_permissions_mode)
+                    os.replace(tmp_path, final)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return self._cas_name(name, sha256)
+
+    def _count_reference(self, StoredBlob, sha256, size):
+        now = timezone.now()
+        if StoredBlob.objects.filter(sha256=sha256).update(refcount=F("refcount") + 1, updated_at=now):
+            return
+        try:
+            with transaction.atomic():
+                StoredBlob.objects.create(sha256=sha256, size=size, refcount=1)
+        except IntegrityError:  # created by a concurrent save
+            StoredBlob.objects.filter(sha256=sha256).update(refcount=F("refcount") + 1, updated_at=now)
+
+    def delete(self, name):
+        """Drop one reference; the blob itself goes in gc_blobs once nothing points at it."""
+        sha256 = name_hash(name)
+        if not sha256:
+            return super().delete(name)
+        StoredBlob = apps.get_model("placements", "StoredBlob")
+        StoredBlob.objects.filter(sha256=sha256, refcount__gt=0).update(
+            refcount=F("refcount") - 1, updated_at=timezone.now()
+        )
+
+    def delete_blob(self, sha256):
+        try:
+            os.remove(super().path(blob_name(sha256)))
+        except FileNotFoundError:
+            pass
+
+
+# -------------------------------------------------------------------
+# LIFECYCLE
+# -------------------------------------------------------------------
+_state = threading.local()
+
+
+@contextmanager
+def keep_files():
+    """Deletes inside this block don't release files (e.g. archiving keeps them)."""
+    previous = getattr(_state, "keep", False)
+    _state.keep = True
+    try:
+        yield
+    finally:
+        _state.keep = previous
+
+
+def _release(files):
+    files = [(storage, name) for storage, name in files if name]
+    if files and not getattr(_state, "keep", False):
+        transaction.on_commit(lambda: [storage.delete(name) for storage, name in files])
+
+
+def _file_fields(model):
+    return [f for f in model._meta.concrete_fields if isinstance(f, models.FileField)]
+
+
+def track_file_fields(model):
+    """Release `model`'s files when a row is deleted or one of its files is replaced."""
+    fields = _file_fields(model)
+    names = [f.attname for f in fields]
+    uid = f"track_files:{model._meta.label}"
+
+    def remember_replaced(sender, instance, raw=False, update_fields=None, **kwargs):
+        instance._replaced_files = []
+        if raw or instance._state.adding or instance.pk is None:
+            return
+        if update_fields is not None and not set(update_fields) & {f.name for f in fields}:
+            return
+        old = sender._base_manager.filter(pk=instance.pk).values(*names).first() or {}
+        instance._replaced_files = [
+            (f.storage, old.get(f.attname))
+            for f in fields
+            if old.get(f.attname) and old.get(f.attname) != getattr(instance, f.attname).name
+        ]
+
+    def release_replaced(sender, instance, **kwargs):
+        _release(getattr(instance, "_replaced_files", []))
+        instance._replaced_files = []
+
+    def release_deleted(sender, instance, **kwargs):
+        _release([(f.storage, getattr(instance, f.attname).name) for f in fields])
+
+    pre_save.connect(remember_replaced, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(release_replaced, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(release_deleted, sender=model, weak=False, dispatch_uid=uid)
+
+
+# -------------------------------------------------------------------
+# REFERENCES (for gc_blobs)
+# -------------------------------------------------------------------
+_reference_sources = []
+
+
+def register_references(fn):
+    """Register a generator of stored names kept outside FileFields (e.g. archive payloads)."""
+    _reference_sources.append(fn)
+    return fn
+
+
+def referenced_names():
+    """Every stored name the database points at, streamed."""
+    for model in apps.get_models():
+        for field in _file_fields(model):
+            qs = model._base_manager.exclude(**{field.attname: ""}).exclude(**{f"{field.attname}__isnull": True})
+            yield from qs.values_list(field.attname, flat=True).iterator()
+    for source in _reference_sources:
+        for name in source():
+            if name:
+                yield name
@@ -1,3 +1,436 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import io
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django import forms
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import StaffProfile, StudentProfile, User
+from companies.models import Company
+
+from . import allocation, letters, matching, media, storage, transitions, uploads
+from .models import ChunkedUpload, InternshipPeriod, InternshipRequest, Placement, StoredBlob
+
+
+def make_user(email, group=None, **kwargs):
+    user = User.objects.create_user(email=email, password="pw", first_name=email.split("@")[0], last_name="X", **kwargs)
+    if group:
+        user.groups.add(Group.objects.get_or_create(name=group)[0])
+    return user
+
+
+class PlacementsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.period = InternshipPeriod.objects.create(
+            name="P1", start_date=datetime.date(2026, 5, 1), end_date=datetime.date(2026, 8, 1), is_active=True,
+        )
+        cls.company = Company.objects.create(name="Acme", industry="Software", district="Kampala", status="approved")
+        cls.coordinator = make_user("coord@x.com", "Coordinator")
+        cls.staff = StaffProfile.objects.create(user=make_user("sup@x.com", "UniversitySupervisor"), staff_no="S1")
+
+    def setUp(self):
+        cache.clear()
+
+    def make_request(self, i=1, status="draft", **kwargs):
+        user = make_user(f"st{i}@x.com", "Student")
+        student = StudentProfile.objects.create(user=user, reg_no=f"R{i:04d}")
+        kwargs.setdefault("preferred_company", self.company)
+        return InternshipRequest.objects.create(
+            student=student, period=self.period, request_source="student_selected", status=status, **kwargs
+        )
+
+
+# -------------------------------------------------------------------
+# TRANSITIONS
+# -------------------------------------------------------------------
+class TransitionTests(PlacementsTestCase):
+    def test_apply_moves_and_stamps(self):
+        req = self.make_request(status="submitted")
+        transitions.apply(req, "start_review", self.coordinator)
+        req.refresh_from_db()
+        self.assertEqual(req.status, "under_review")
+        self.assertEqual(req.reviewed_by, self.coordinator)
+        self.assertIsNotNone(req.reviewed_at)
+
+    def test_apply_refuses_a_move_not_in_the_table(self):
+        req = self.make_request(status="draft")
+        with self.assertRaises(transitions.TransitionError):
+            transitions.apply(req, "verify_acceptance", self.coordinator)
+        self.assertEqual(InternshipRequest.objects.get(pk=req.pk).status, "draft")
+
+    def test_apply_loses_to_a_concurrent_move(self):
+        req = self.make_request(status="submitted")
+        stale = InternshipRequest.objects.get(pk=req.pk)
+        transitions.apply(req, "reject", self.coordinator)
+        with self.assertRaises(transitions.TransitionError):
+            transitions.apply(stale, "start_review", self.coordinator)
+        self.assertEqual(InternshipRequest.objects.get(pk=req.pk).status, "rejected")
+
+    def test_apply_many_returns_only_the_ids_it_moved(self):
+        waiting = self.make_request(1, status="acceptance_uploaded")
+        done = self.make_request(2, status="acceptance_verified")
+        moved = transitions.apply_many([waiting.id, done.id], "verify_acceptance", "acceptance_uploaded", self.coordinator)
+        self.assertEqual(moved, [waiting.id])
+        self.assertTrue(InternshipRequest.objects.get(pk=waiting.pk).acceptance_verified)
+
+    def test_apply_many_rejects_an_impossible_source(self):
+        with self.assertRaises(transitions.TransitionError):
+            transitions.apply_many([1], "verify_acceptance", "draft")
+
+
+class MyRequestTests(PlacementsTestCase):
+    def post(self, req, **data):
+        self.client.force_login(req.student.user)
+        return self.client.post(reverse("my_request"), {
+            "preferred_company": self.company.id, "proposed_company_name": "", "action": "save", **data,
+        })
+
+    def test_draft_is_saved(self):
+        req = self.make_request(status="draft", preferred_company=None)
+        self.post(req)
+        self.assertEqual(InternshipRequest.objects.get(pk=req.pk).preferred_company, self.company)
+
+    def test_reviewed_request_is_not_changed(self):
+        other = Company.objects.create(name="Other", status="approved")
+        req = self.make_request(status="recommended")
+        response = self.post(req, preferred_company=other.id)
+        self.assertContains(response, "can no longer be changed", status_code=403)
+        req.refresh_from_db()
+        self.assertEqual((req.status, req.preferred_company), ("recommended", self.company))
+
+
+class BulkVerifyTests(PlacementsTestCase):
+    def test_only_requests_moved_by_this_post_get_a_placement(self):
+        waiting = self.make_request(1, status="acceptance_uploaded")
+        verified_elsewhere = self.make_request(2, status="acceptance_uploaded")
+        apply_many = transitions.apply_many
+
+        def another_coordinator_first(ids, *args, **kwargs):
+            InternshipRequest.objects.filter(pk=verified_elsewhere.pk).update(status="acceptance_verified")
+            return apply_many(ids, *args, **kwargs)
+
+        self.client.force_login(self.coordinator)
+        with mock.patch.object(transitions, "apply_many", side_effect=another_coordinator_first):
+            self.client.post(reverse("coordinator_bulk_verify_acceptance"), {
+                "requests": [waiting.id, verified_elsewhere.id],
+                "assignment": "manual",
+                "university_supervisor": self.staff.id,
+            })
+        self.assertTrue(Placement.objects.filter(request=waiting, status="active", university_supervisor=self.staff).exists())
+        self.assertFalse(Placement.objects.filter(request=verified_elsewhere).exists())
+
+
+class CoordinatorReviewTests(PlacementsTestCase):
+    def test_approve_without_a_company_is_refused(self):
+        req = self.make_request(status="under_review", preferred_company=None, proposed_company_name="  ")
+        self.client.force_login(self.coordinator)
+        response = self.client.post(reverse("coordinator_review", args=[req.id]), {"action": "approve_and_create_placement"})
+        self.assertContains(response, "no company yet")
+        self.assertEqual(InternshipRequest.objects.get(pk=req.pk).status, "under_review")
+        self.assertFalse(Company.objects.filter(name="").exists())
+
+
+class NoActivePeriodTests(PlacementsTestCase):
+    def test_student_sees_a_notice(self):
+        req = self.make_request()
+        InternshipPeriod.objects.update(is_active=False)
+        self.client.force_login(req.student.user)
+        self.assertContains(self.client.get(reverse("my_request")), "no active internship period")
+
+
+# -------------------------------------------------------------------
+# MATCHING
+# -------------------------------------------------------------------
+class MatchTests(TestCase):
+    def student(self, request_id, field="software"):
+        return matching.StudentCandidate(request_id, matching.tokens(field), set(), "kampala")
+
+    def company(self, company_id, industry="software", capacity=1):
+        return matching.CompanyCandidate(company_id, matching.tokens(industry), "gulu", capacity)
+
+    def test_best_pairs_first_within_capacity(self):
+        students = [self.student(1, "software data"), self.student(2)]
+        companies = [self.company(10, "software data"), self.company(11)]
+        result = matching.match(students, companies)
+        self.assertEqual({(p.request_id, p.company_id) for p in result.proposals}, {(1, 10), (2, 11)})
+        self.assertEqual(result.unmatched, [])
+
+    def test_student_cut_off_at_top_k_still_gets_a_free_company(self):
+        # with top_k=1 both students only see company 10; student 1 takes it first
+        students = [self.student(1), self.student(2, "software data")]
+        companies = [self.company(10, "software data"), self.company(11, "software data"), self.company(12)]
+        result = matching.match(students, companies, top_k=1)
+        self.assertEqual({(p.request_id, p.company_id) for p in result.proposals}, {(1, 10), (2, 11)})
+        self.assertEqual(result.unmatched, [])
+
+
+# -------------------------------------------------------------------
+# LETTERS
+# -------------------------------------------------------------------
+class IssueRecommendationsTests(PlacementsTestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+    def issue(self, req, rendered):
+        with mock.patch.object(letters, "render_many", return_value=[rendered]):
+            return letters.issue_recommendations(InternshipRequest.objects.filter(pk=req.pk), self.coordinator)
+
+    def proposed(self):
+        return self.make_request(status="under_review", preferred_company=None, proposed_company_name="NewCo")
+
+    def test_proposed_company_is_created_with_the_letter(self):
+        req = self.proposed()
+        batch = self.issue(req, (b"%PDF-1.4", None))
+        self.assertEqual(batch.generated, 1)
+        req.refresh_from_db()
+        self.assertEqual((req.status, req.preferred_company.name), ("recommended", "NewCo"))
+        self.assertTrue(req.recommendation_letter)
+
+    def test_failed_render_leaves_no_company(self):
+        req = self.proposed()
+        batch = self.issue(req, (None, "boom"))
+        self.assertEqual(batch.failed, [(req.student.reg_no, "boom")])
+        self.assertFalse(Company.objects.filter(name="NewCo").exists())
+
+    def test_lost_race_leaves_no_company(self):
+        req = self.proposed()
+        reqs = InternshipRequest.objects.filter(pk=req.pk)
+        context = letters.recommendation_context
+
+        def rejected_meanwhile(r):
+            reqs.update(status="rejected")
+            return context(r)
+
+        with mock.patch.object(letters, "recommendation_context", side_effect=rejected_meanwhile):
+            batch = self.issue(req, (b"%PDF-1.4", None))
+        self.assertEqual(batch.generated, 0)
+        self.assertFalse(Company.objects.filter(name="NewCo").exists())
+
+
+# -------------------------------------------------------------------
+# CHUNKED UPLOADS
+# -------------------------------------------------------------------
+class UploadForm(uploads.ChunkedUploadMixin, forms.Form):
+    document = forms.FileField()
+    note = forms.CharField()
+
+
+@override_settings(CHUNKED_UPLOAD_MAX_OPEN=2)
+class ChunkedUploadTests(PlacementsTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.enterContext(override_settings(CHUNKED_UPLOAD_DIR=tmp.name))
+
+    def upload(self, body=b"hello"):
+        upload = uploads.start_upload(self.coordinator, "cv.pdf", len(body), hashlib.sha256(body).hexdigest())
+        with open(upload.path, "wb") as f:
+            f.write(body)
+        ChunkedUpload.objects.filter(pk=upload.pk).update(offset=len(body), status="complete")
+        return upload
+
+    def test_open_uploads_are_capped_per_user(self):
+        self.upload()
+        self.upload()
+        with self.assertRaises(uploads.TooManyUploads):
+            self.upload()
+        # another user is not affected
+        uploads.start_upload(self.staff.user, "cv.pdf", 5, "0" * 64)
+
+    def test_stale_uploads_do_not_count(self):
+        self.upload()
+        self.upload()
+        ChunkedUpload.objects.update(updated_at=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc))
+        self.upload()
+
+    def test_invalid_form_closes_the_file(self):
+        upload = self.upload()
+        form = UploadForm({"document_upload": str(upload.id)}, uploader=self.coordinator)
+        self.assertFalse(form.is_valid())
+        self.assertNotIn("document", form.errors)
+        self.assertTrue(form.cleaned_data["document"].closed)
+        self.assertTrue(ChunkedUpload.objects.filter(pk=upload.pk).exists())
+
+    def test_valid_form_keeps_the_file_open_until_finished(self):
+        upload = self.upload()
+        form = UploadForm({"document_upload": str(upload.id), "note": "x"}, uploader=self.coordinator)
+        self.assertTrue(form.is_valid())
+        f = form.cleaned_data["document"]
+        self.assertEqual(f.read(), b"hello")
+        form.finish_uploads()
+        self.assertTrue(f.closed)
+        self.assertFalse(ChunkedUpload.objects.filter(pk=upload.pk).exists())
+
+
+# -------------------------------------------------------------------
+# SUPERVISOR ALLOCATION
+# -------------------------------------------------------------------
+class AllocateTests(TestCase):
+    def items(self, n, company_id=1, district="kampala", start=0):
+        return [allocation.AllocationItem(start + i, company_id, district) for i in range(n)]
+
+    def test_nobody_goes_above_the_cap(self):
+        # 7 existing + 8 new over 3 supervisors: ceil(15 / 3) = 5, but never below today's 7;
+        # the company's interns stay together up to that cap
+        result = allocation.allocate(self.items(8), {1: 7, 2: 0, 3: 0}, {1: {1}})
+        self.assertEqual(result.cap, 7)
+        self.assertEqual(result.loads_after, {1: 7, 2: 7, 3: 1})
+        self.assertEqual(result.max_load_after, result.max_load_before)
+
+    def test_cap_splits_a_large_company(self):
+        result = allocation.allocate(self.items(10), {1: 0, 2: 0})
+        self.assertEqual(result.cap, 5)
+        self.assertEqual(result.loads_after, {1: 5, 2: 5})
+
+    def test_even_spread_when_loads_are_balanced(self):
+        result = allocation.allocate(self.items(9), {1: 1, 2: 1, 3: 1})
+        self.assertEqual(result.cap, 4)
+        self.assertEqual(sorted(result.loads_after.values()), [4, 4, 4])
+
+    def test_prefers_the_supervisor_already_visiting_the_company(self):
+        result = allocation.allocate(self.items(2, company_id=5), {1: 0, 2: 2}, {5: {2}})
+        self.assertEqual(result.cap, 2)
+        # supervisor 2 already visits company 5 but is at the cap, so both go to 1
+        self.assertEqual(set(result.assignments.values()), {1})
+        result = allocation.allocate(self.items(1, company_id=5), {1: 0, 2: 0}, {5: {2}})
+        self.assertEqual((result.assignments[0], result.reasons[0]), (2, "company"))
+
+    def test_district_before_balance(self):
+        result = allocation.allocate(self.items(1, company_id=9, district="gulu"), {1: 0, 2: 0}, {}, {"gulu": {2}})
+        self.assertEqual((result.assignments[0], result.reasons[0]), (2, "district"))
+
+    def test_nothing_to_do(self):
+        self.assertEqual(allocation.allocate([], {1: 3}).loads_after, {1: 3})
+        self.assertEqual(allocation.allocate(self.items(2), {}).assignments, {})
+
+
+# -------------------------------------------------------------------
+# PROTECTED FILES
+# -------------------------------------------------------------------
+class ParseRangeTests(TestCase):
+    def test_single_ranges(self):
+        self.assertEqual(media.parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(media.parse_range("bytes=900-", 1000), (900, 999))
+        self.assertEqual(media.parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(media.parse_range("bytes=990-2000", 1000), (990, 999))
+        self.assertEqual(media.parse_range("bytes=-5000", 1000), (0, 999))
+
+    def test_whole_file_for_anything_else(self):
+        for header in (None, "", "bytes=-", "bytes=0-1,5-9", "items=0-1", "bytes=9-2"):
+            self.assertIsNone(media.parse_range(header, 1000), header)
+
+    def test_unsatisfiable(self):
+        for header in ("bytes=1000-", "bytes=-0"):
+            with self.assertRaises(media.RangeNotSatisfiable):
+                media.parse_range(header, 1000)
+
+
+@override_settings(SENDFILE_BACKEND="")
+class ServeFileTests(PlacementsTestCase):
+    body = bytes(range(256)) * 4
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+        self.req = self.make_request()
+        self.req.cv.save("cv.pdf", ContentFile(self.body))
+        self.url = reverse("request_file", args=[self.req.id, "cv"])
+        self.client.force_login(self.req.student.user)
+
+    def get(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        response.body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.body, response["Accept-Ranges"]), (self.body, "bytes"))
+
+    def test_range(self):
+        response = self.get(Range="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(self.body)}")
+        self.assertEqual((response["Content-Length"], response.body), ("10", self.body[10:20]))
+
+    def test_range_past_the_end(self):
+        response = self.get(Range=f"bytes={len(self.body)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.body)}")
+
+    def test_stale_if_range_sends_the_whole_file(self):
+        response = self.get(Range="bytes=10-19", **{"If-Range": "Thu, 01 Jan 2015 00:00:00 GMT"})
+        self.assertEqual((response.status_code, response.body), (200, self.body))
+
+    def test_other_students_are_refused(self):
+        self.client.force_login(self.make_request(2).student.user)
+        self.assertEqual(self.get().status_code, 403)
+
+
+# -------------------------------------------------------------------
+# CONTENT-ADDRESSED STORAGE
+# -------------------------------------------------------------------
+class StorageTests(PlacementsTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+    def save_cv(self, req, body):
+        with self.captureOnCommitCallbacks(execute=True):
+            req.cv.save("cv.pdf", ContentFile(body))
+        return hashlib.sha256(body).hexdigest()
+
+    def refcount(self, sha256):
+        return StoredBlob.objects.get(sha256=sha256).refcount
+
+    def test_same_body_is_stored_once(self):
+        sha = self.save_cv(self.make_request(1), b"same")
+        self.save_cv(self.make_request(2), b"same")
+        self.assertEqual(self.refcount(sha), 2)
+        self.assertTrue(os.path.exists(default_storage.path(storage.blob_name(sha))))
+        self.assertEqual(storage.name_hash(InternshipRequest.objects.get(student__reg_no="R0002").cv.name), sha)
+
+    def test_replacing_and_deleting_release_references(self):
+        req = self.make_request()
+        old = self.save_cv(req, b"first")
+        new = self.save_cv(req, b"second")
+        self.assertEqual((self.refcount(old), self.refcount(new)), (0, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            req.delete()
+        self.assertEqual(self.refcount(new), 0)
+
+    def test_gc_blobs_recounts_and_collects(self):
+        kept = self.save_cv(self.make_request(1), b"kept")
+        orphan = self.save_cv(self.make_request(2), b"orphan")
+        recent = self.save_cv(self.make_request(3), b"recent")
+        InternshipRequest.objects.filter(student__reg_no__in=["R0002", "R0003"]).update(cv="")
+        StoredBlob.objects.filter(sha256=kept).update(refcount=5)
+        StoredBlob.objects.exclude(sha256=recent).update(updated_at=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc))
+
+        out = io.StringIO()
+        call_command("gc_blobs", stdout=out)
+        self.assertIn("Refcounts corrected: 3", out.getvalue())
+        self.assertEqual(self.refcount(kept), 1)
+        self.assertFalse(StoredBlob.objects.filter(sha256=orphan).exists())
+        self.assertFalse(os.path.exists(default_storage.path(storage.blob_name(orphan))))
+        # touched within the grace period: counted down but kept
+        self.assertEqual(self.refcount(recent), 0)
+        self.assertTrue(os.path.exists(default_storage.path(storage.blob_name(recent))))
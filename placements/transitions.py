@@ -0,0 +1,125 @@
+# placements/transitions.py
+#
+# InternshipRequest workflow.
+# TRANSITIONS lists every action with the statuses it may start from, where it
+# leads and which fields it stamps; ALLOWED (status -> {action: target}) is
+# precomputed from it for views and templates.
+# apply() is a single conditional UPDATE ... WHERE id = %s AND status = <the
+# status the caller saw>: if another coordinator acted first, nothing is
+# written and TransitionError is raised, with no SELECT beforehand. Run other
+# saves of the same request after apply() in the same transaction.
+# The matching WorkflowEvent is written here too (update() skips signals);
+# moves that keep the status (approve, re-issuing a letter) record none.
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+from tracking import events
+
+from .models import InternshipRequest
+
+
+class TransitionError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Transition:
+    sources: frozenset
+    target: str
+    reviewed: bool = False                       # stamps reviewed_by / reviewed_at
+    timestamp: str = ""                          # field set to now()
+    sets: dict = field(default_factory=dict)     # other fields reset by the move
+
+
+TRANSITIONS = {
+    "submit": Transition(frozenset({"draft", "rejected"}), "submitted", timestamp="submitted_at"),
+    "start_review": Transition(frozenset({"submitted"}), "under_review", reviewed=True),
+    # approving creates the placement; the request stays in the queue for its recommendation letter
+    "approve": Transition(frozenset({"submitted", "under_review"}), "under_review", reviewed=True),
+    "reject": Transition(frozenset({"submitted", "under_review"}), "rejected", reviewed=True),
+    "recommend": Transition(
+        frozenset({"submitted", "under_review", "recommended"}), "recommended",
+        reviewed=True, timestamp="recommendation_issued_at",
+    ),
+    "return_for_acceptance": Transition(frozenset({"recommended", "returned_for_acceptance"}), "returned_for_acceptance"),
+    "upload_acceptance": Transition(
+        frozenset({"recommended", "returned_for_acceptance", "acceptance_uploaded"}), "acceptance_uploaded",
+        timestamp="acceptance_uploaded_at",
+        sets={"acceptance_verified": False, "acceptance_verified_at": None},
+    ),
+    "verify_acceptance": Transition(
+        frozenset({"acceptance_uploaded"}), "acceptance_verified",
+        reviewed=True, timestamp="acceptance_verified_at", sets={"acceptance_verified": True},
+    ),
+}
+
+ALLOWED = {status: {} for status, _ in InternshipRequest.STATUS}
+for _action, _t in TRANSITIONS.items():
+    for _source in _t.sources:
+        ALLOWED[_source][_action] = _t.target
+
+
+def can(req, action):
+    return action in ALLOWED.get(req.status, {})
+
+
+def _changes(t, actor, now, extra):
+    changes = {"status": t.target, **t.sets, **extra}
+    if t.reviewed:
+        changes.update(reviewed_by=actor, reviewed_at=now)
+    if t.timestamp:
+        changes[t.timestamp] = now
+    return changes
+
+
+def apply(req, action, actor=None, **fields):
+    """
+    Move `req` from the status it was read with along `action`, also writing
+    `fields`. Updates `req` in memory; raises TransitionError if the move isn't
+    allowed or the row's status changed meanwhile.
+    """
+    expected = req.status
+    if not can(req, action):
+        raise TransitionError(f"Cannot {action.replace('_', ' ')} a request that is {req.get_status_display().lower()}.")
+
+    now = timezone.now()
+    t = TRANSITIONS[action]
+    changes = _changes(t, actor, now, fields)
+    with transaction.atomic():
+        if not InternshipRequest.objects.filter(pk=req.pk, status=expected).update(**changes):
+            raise TransitionError("This request was changed by someone else. Reload and try again.")
+        if expected != t.target:
+            events.record_many([
+                events.event(InternshipRequest, req.pk, expected, t.target, actor.pk if actor else None, req.period_id, now)
+            ])
+
+    for name, value in changes.items():
+        setattr(req, name, value)
+    return req
+
+
+def apply_many(ids, action, expected, actor=None, **fields):
+    """apply() for every request in `ids` still at `expected`; returns the ids that moved."""
+    t = TRANSITIONS[action]
+    if expected not in t.sources:
+        raise TransitionError(f"Cannot {action.replace('_', ' ')} from {expected}.")
+
+    now = timezone.now()
+    with transaction.atomic():
+        # the ids are needed for the event rows
+        rows = list(
+            InternshipRequest.objects.select_for_update()
+            .filter(id__in=ids, status=expected)
+            .values_list("id", "period_id")
+        )
+        InternshipRequest.objects.filter(id__in=[pk for pk, _ in rows], status=expected).update(
+            **_changes(t, actor, now, fields)
+        )
+        if expected != t.target:
+            events.record_many(
+                events.event(InternshipRequest, pk, expected, t.target, actor.pk if actor else None, period_id, now)
+                for pk, period_id in rows
+            )
+    return [pk for pk, _ in rows]
@@ -0,0 +1,227 @@
+# placements/uploads.py
+#
+# Chunked, resumable uploads for CVs, letters and log/site-visit attachments.
+# 1. start_upload(): the client announces filename, size and SHA-256.
+# 2. append_chunk(): each part (Content-Range: bytes a-b/size) is written at its
+#    offset into a temp file; after a dropped connection the client asks for
+#    the offset and carries on from there.
+# 3. On the last part the file is hashed and checked against the announced
+#    SHA-256. The form then gets a `<field>_upload` id instead of a file
+#    (ChunkedUploadMixin), and the bytes are copied into storage on save.
+# Nothing is held in memory beyond one COPY_BLOCK.
+import hashlib
+import os
+import re
+
+from django import forms
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db import transaction
+from django.urls import reverse, reverse_lazy
+
+from .models import ChunkedUpload
+
+COPY_BLOCK = 64 * 1024
+UPLOAD_SUFFIX = "_upload"
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class UploadError(Exception):
+    status = 400
+
+
+class UploadNotFound(UploadError):
+    status = 404
+
+
+class OffsetMismatch(UploadError):
+    status = 409  # client must resume from upload.offset
+
+
+class ChecksumMismatch(UploadError):
+    status = 422
+
+
+class TooManyUploads(UploadError):
+    status = 429
+
+
+def start_upload(user, filename, size, sha256):
+    filename = os.path.basename(str(filename or "")).strip()
+    sha256 = str(sha256 or "").lower()
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("size must be a number of bytes.")
+
+    if not filename:
+        raise UploadError("filename is required.")
+    if not SHA256_RE.match(sha256):
+        raise UploadError("sha256 must be 64 hex characters.")
+    if size <= 0 or size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError(f"File must be between 1 byte and {settings.CHUNKED_UPLOAD_MAX_SIZE // (1024 * 1024)}MB.")
+
+    with transaction.atomic():
+        # the user row serialises one user's starts, so parallel requests can't all pass the count
+        get_user_model().objects.select_for_update().get(pk=user.pk)
+        if ChunkedUpload.objects.fresh().filter(user=user).count() >= settings.CHUNKED_UPLOAD_MAX_OPEN:
+            raise TooManyUploads("Too many uploads in progress. Finish or submit them first.")
+        upload = ChunkedUpload.objects.create(user=user, filename=filename[-255:], size=size, sha256=sha256)
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(upload.path, "wb").close()
+    return upload
+
+
+def parse_content_range(header):
+    """(start, end) inclusive from "bytes start-end/size"."""
+    m = CONTENT_RANGE_RE.match((header or "").strip())
+    if not m:
+        raise UploadError('Content-Range "bytes start-end/size" is required.')
+    start, end, _ = map(int, m.groups())
+    if end < start:
+        raise UploadError("Content-Range end is before its start.")
+    return start, end
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(COPY_BLOCK):
+            h.update(block)
+    return h.hexdigest()
+
+
+def append_chunk(upload_id, user, start, end, stream):
+    """Write bytes start..end (inclusive) read from `stream`; returns the updated upload."""
+    with transaction.atomic():
+        upload = ChunkedUpload.objects.select_for_update().filter(id=upload_id, user=user).first()
+        if upload is None:
+            raise UploadNotFound("Upload not found.")
+        if upload.status == "complete":
+            return upload
+        if start != upload.offset:
+            raise OffsetMismatch(f"Expected offset {upload.offset}.")
+        if end >= upload.size:
+            raise UploadError("Chunk goes past the end of the file.")
+        if end - start + 1 > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+            raise UploadError("Chunk is too large.")
+
+        remaining = end - start + 1
+        with open(upload.path, "r+b") as f:
+            f.seek(start)
+            while remaining:
+                block = stream.read(min(COPY_BLOCK, remaining))
+                if not block:
+                    break
+                f.write(block)
+                remaining -= len(block)
+            f.truncate()
+
+        # a cut-off request still counts for what arrived
+        upload.offset = end + 1 - remaining
+        corrupt = False
+        if upload.offset == upload.size:
+            if _sha256(upload.path) == upload.sha256:
+                upload.status = "complete"
+            else:
+                corrupt = True
+                upload.offset = 0
+                open(upload.path, "wb").close()
+        upload.save(update_fields=["offset", "status", "updated_at"])
+
+    if corrupt:
+        raise ChecksumMismatch("Checksum does not match; the upload was reset.")
+    return upload
+
+
+def upload_state(upload):
+    return {
+        "id": str(upload.id),
+        "url": reverse("upload_chunk", args=[upload.id]),
+        "filename": upload.filename,
+        "size": upload.size,
+        "offset": upload.offset,
+        "chunk_size": settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+        "complete": upload.status == "complete",
+    }
+
+
+def discard_upload(upload):
+    try:
+        os.remove(upload.path)
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+# -------------------------------------------------------------------
+# FORMS
+# -------------------------------------------------------------------
+class ChunkedUploadMixin:
+    """
+    For ModelForms with FileFields: each gets a hidden `<field>_upload` input
+    that static/base/js/chunked_upload.js fills with a finished upload id.
+    Call finish_uploads() once the instance is saved.
+    """
+
+    def __init__(self, *args, uploader=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.uploader = uploader
+        self._uploads = []
+        self._required_files = []
+        self._file_fields = [name for name, field in self.fields.items() if isinstance(field, forms.FileField)]
+        for name in self._file_fields:
+            self.fields[name].widget.attrs.update({
+                "data-chunked-upload": reverse_lazy("upload_start"),
+                "data-max-size": settings.CHUNKED_UPLOAD_MAX_SIZE,
+            })
+            self.fields[name + UPLOAD_SUFFIX] = forms.UUIDField(required=False, widget=forms.HiddenInput)
+
+    def full_clean(self):
+        # a file sent in parts arrives as `<field>_upload`, not in request.FILES;
+        # required-ness of those fields is checked in clean() instead
+        for name in self._file_fields:
+            if self.is_bound and self.fields[name].required and self.has_upload(name):
+                self.fields[name].required = False
+                self._required_files.append(name)
+        super().full_clean()
+        if self._errors:
+            # the form is shown again, not saved: don't keep the temp files open until GC
+            self.close_uploads()
+
+    def clean(self):
+        cleaned = super().clean()
+        for field_name in self._file_fields:
+            upload_id = cleaned.get(field_name + UPLOAD_SUFFIX)
+            if not upload_id:
+                continue
+
+            upload = ChunkedUpload.objects.filter(id=upload_id, user=self.uploader, status="complete").first()
+            if upload is None:
+                self.add_error(field_name, "The uploaded file was not found or is incomplete. Please choose it again.")
+                continue
+            f = File(open(upload.path, "rb"), name=upload.filename)
+            cleaned[field_name] = f
+            self._uploads.append((upload, f))
+
+        for name in self._required_files:
+            if not cleaned.get(name) and name not in self.errors:
+                self.add_error(name, self.fields[name].error_messages["required"])
+        return cleaned
+
+    def has_upload(self, name):
+        return bool(self.data.get(self.add_prefix(name + UPLOAD_SUFFIX)))
+
+    def close_uploads(self):
+        """Close the files opened in clean(); the uploads stay for the next attempt."""
+        for _, f in self._uploads:
+            f.close()
+        self._uploads = []
+
+    def finish_uploads(self):
+        for upload, f in self._uploads:
+            f.close()
+            discard_upload(upload)
+        self._uploads = []
@@ -8,15 +8,23 @@ urlpatterns = [
     path("coordinator/queue/", views.coordinator_queue, name="coordinator_queue"),
     path("coordinator/review/<int:request_id>/", views.coordinator_review, name="coordinator_review"),
     path("coordinator/recommendation/<int:request_id>/", views.coordinator_issue_recommendation, name="coordinator_issue_recommendation"),
+    path("coordinator/recommendation/generate/", views.coordinator_generate_recommendations, name="coordinator_generate_recommendations"),
     path("student/acceptance/upload/", views.student_upload_acceptance, name="student_upload_acceptance"),
 
     path("coordinator/acceptance-queue/", views.coordinator_acceptance_queue, name="coordinator_acceptance_queue"),
+    path("coordinator/match-companies/", views.coordinator_match_companies, name="coordinator_match_companies"),
+    path("coordinator/allocate-supervisors/", views.coordinator_allocate_supervisors, name="coordinator_allocate_supervisors"),
+    path("coordinator/acceptance-verify/bulk/", views.coordinator_bulk_verify_acceptance, name="coordinator_bulk_verify_acceptance"),
     path("coordinator/acceptance-verify/<int:request_id>/", views.coordinator_verify_acceptance_and_assign, name="coordinator_verify_acceptance_and_assign"),
     path(
     "my-request/<int:request_id>/recommendation/download/",
     views.download_recommendation_letter,
     name="download_recommendation_letter",
 ),
+    path("uploads/", views.upload_start, name="upload_start"),
+    path("uploads/<uuid:upload_id>/", views.upload_chunk, name="upload_chunk"),
+    path("files/request/<int:request_id>/<str:field>/", views.request_file, name="request_file"),
+    path("files/placement/<int:placement_id>/letter/", views.placement_letter, name="placement_letter"),
     path("coordinator/waiting-acceptance/", views.coordinator_waiting_acceptance_queue, name="coordinator_waiting_acceptance_queue"),
     path("coordinator/request/<int:request_id>/return-for-acceptance/", views.coordinator_return_for_acceptance, name="coordinator_return_for_acceptance"),
     
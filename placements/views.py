@@ -1,8 +1,11 @@
+import json
+import os
+
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
-from .models import InternshipPeriod, InternshipRequest, Placement
+from .models import ChunkedUpload, InternshipRequest, Placement
 from .forms import InternshipRequestForm
 
 from django.contrib.auth.models import Group
@@ -10,14 +13,20 @@ from django.http import HttpResponseForbidden
 from django.db import transaction
 
 from .forms import RecommendationLetterForm, AcceptanceLetterUploadForm, VerifyAcceptanceAssignSupervisorForm
+from .forms import BulkVerifyAcceptanceForm, GenerateRecommendationsForm
+from .allocation import AllocationItem, allocate, current_supervisor_state, plan_unassigned_placements
+from .matching import pending_university_assigned, plan_company_matches
+from .periods import get_active_period, invalidate_active_placements, period_context
 from companies.models import Company
 from .models import Placement
 from accounts.models import StaffProfile
+from accounts.aio import astudent_profile, auser
+from tracking import events
+from . import letters, media, transitions, uploads
 
 from .models import InternshipRequest
-from django.http import FileResponse, Http404, HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden, JsonResponse
 
-from django.core.files.storage import default_storage
 
 
 def is_coordinator(user):
@@ -29,7 +38,7 @@ def my_request(request):
         return HttpResponseForbidden("Students only.")
 
     student = request.user.student_profile
-    period = InternshipPeriod.objects.filter(is_active=True).first()
+    period = get_active_period()
     if not period:
         return render(request, "placements/no_active_period.html")
 
@@ -39,43 +48,55 @@ def my_request(request):
         defaults={"status": "draft", "request_source": "student_selected"},
     )
 
+    # only a draft (or a rejected request being reworked) is edited; later statuses have been reviewed
+    editable = transitions.can(req, "submit")
+    context = {"req": req, "period": period, "editable": editable}
+
+    if request.method == "POST" and not editable:
+        return HttpResponseForbidden(f"This request is {req.get_status_display().lower()} and can no longer be changed.")
+
     if request.method == "POST":
-        form = InternshipRequestForm(request.POST, request.FILES, instance=req)
+        form = InternshipRequestForm(request.POST, request.FILES, instance=req, uploader=request.user)
         if form.is_valid():
             req = form.save(commit=False)
 
             # set request_source correctly
-            if req.preferred_company:
+            if form.cleaned_data.get("university_assign"):
+                req.request_source = "university_assigned"
+            elif req.preferred_company:
                 req.request_source = "student_selected"
             else:
                 req.request_source = "student_proposed"
 
             action = request.POST.get("action", "save")
 
+            # Saving keeps the status; submitting moves it on
             if action == "submit":
-                # Prevent submitting if already submitted onward
-                if req.status in ["submitted", "under_review", "recommended", "acceptance_uploaded", "acceptance_verified"]:
-                    req.save()
-                    return redirect("my_request")
-
-                # Must pick or propose a company before submitting
-                if not req.preferred_company and not (req.proposed_company_name or "").strip():
+                # Must pick or propose a company (or ask the university) before submitting
+                if (
+                    req.request_source != "university_assigned"
+                    and not req.preferred_company
+                    and not (req.proposed_company_name or "").strip()
+                ):
                     form.add_error(None, "Please select an approved company or propose a company before submitting.")
-                    return render(request, "placements/my_request.html", {"form": form, "req": req, "period": period})
-
-                req.status = "submitted"
-                req.submitted_at = timezone.now()  # make sure this field exists in model
+                    return render(request, "placements/my_request.html", {**context, "form": form})
+
+                try:
+                    with transaction.atomic():
+                        transitions.apply(req, "submit", request.user)
+                        req.save()
+                except transitions.TransitionError as e:
+                    form.add_error(None, str(e))
+                    return render(request, "placements/my_request.html", {**context, "form": form})
             else:
-                # Save draft
-                if req.status not in ["returned_for_edit"]:
-                    req.status = "draft"
+                req.save()
 
-            req.save()
+            form.finish_uploads()
             return redirect("my_request")
     else:
         form = InternshipRequestForm(instance=req)
 
-    return render(request, "placements/my_request.html", {"form": form, "req": req, "period": period})
+    return render(request, "placements/my_request.html", {**context, "form": form})
 
 @login_required
 def submit_request(request):
@@ -90,7 +111,7 @@ def submit_request(request):
         return HttpResponseForbidden("Students only.")
 
     student = request.user.student_profile
-    period = InternshipPeriod.objects.filter(is_active=True).first()
+    period = get_active_period()
     if not period:
         return redirect("my_request")
 
@@ -100,13 +121,19 @@ def submit_request(request):
         defaults={"request_source": "student_selected", "status": "draft"},
     )
 
-    # Must pick or propose a company before submitting
-    if not req.preferred_company and not (req.proposed_company_name or "").strip():
+    # Must pick or propose a company (or ask the university) before submitting
+    if (
+        req.request_source != "university_assigned"
+        and not req.preferred_company
+        and not (req.proposed_company_name or "").strip()
+    ):
         return redirect("my_request")
 
-    req.status = "submitted"
-    req.submitted_at = timezone.now()
-    req.save()
+    if transitions.can(req, "submit"):
+        try:
+            transitions.apply(req, "submit", request.user)
+        except transitions.TransitionError:
+            pass  # submitted meanwhile (e.g. a double click)
     return redirect("my_request")
 
 
@@ -115,8 +142,14 @@ def coordinator_queue(request):
     if not is_coordinator(request.user):
         return redirect("dashboard")
 
-    qs = InternshipRequest.objects.filter(status__in=["submitted", "under_review"]).order_by("-submitted_at")
-    return render(request, "placements/coordinator_queue.html", {"requests": qs})
+    ctx = period_context(request)
+    qs = (
+        InternshipRequest.objects
+        .for_period(ctx["period"])
+        .filter(status__in=["submitted", "under_review"])
+        .order_by("-submitted_at")
+    )
+    return render(request, "placements/coordinator_queue.html", {"requests": qs, **ctx})
 
 @login_required
 def coordinator_review(request, request_id):
@@ -128,51 +161,54 @@ def coordinator_review(request, request_id):
     if request.method == "POST":
         action = request.POST.get("action")
 
-        if action == "mark_under_review":
-            req.status = "under_review"
-            req.reviewed_by = request.user
-            req.reviewed_at = timezone.now()
-            req.save()
-
-        elif action == "reject":
-            req.status = "rejected"
-            req.review_notes = request.POST.get("review_notes", "")
-            req.reviewed_by = request.user
-            req.reviewed_at = timezone.now()
-            req.save()
-
-        elif action == "approve_and_create_placement":
-            # if student proposed a company, create it (pending verification OR approved based on your policy)
-            company = req.preferred_company
-            if not company:
-                company, _ = Company.objects.get_or_create(
-                    name=req.proposed_company_name.strip(),
-                    defaults={
-                        "district": req.proposed_company_district,
-                        "address": req.proposed_company_address,
-                        "status": "approved",  # you can change to pending_verification if you want strict approval
-                    },
-                )
-
-            # create placement (you can later add supervisor assignment UI)
-            Placement.objects.get_or_create(
-                request=req,
-                defaults={
-                    "company": company,
-                    "start_date": req.period.start_date,
-                    "end_date": req.period.end_date,
-                    "status": "pending_student_ack",
-                },
-            )
-
-            req.status = "approved"
-            req.reviewed_by = request.user
-            req.reviewed_at = timezone.now()
-            req.save()
+        try:
+            with transaction.atomic():
+                if action == "mark_under_review":
+                    transitions.apply(req, "start_review", request.user)
+
+                elif action == "reject":
+                    transitions.apply(req, "reject", request.user, review_notes=request.POST.get("review_notes", ""))
+
+                elif action == "approve_and_create_placement":
+                    # university-assigned requests get their company from the matching page first
+                    if not req.preferred_company and not req.proposed_company_name.strip():
+                        raise transitions.TransitionError(
+                            "This request has no company yet. Match it to a company before approving it."
+                        )
+                    transitions.apply(req, "approve", request.user)
+
+                    # if student proposed a company, create it (pending verification OR approved based on your policy)
+                    company = req.preferred_company
+                    if not company:
+                        company, _ = Company.objects.get_or_create(
+                            name=req.proposed_company_name.strip(),
+                            defaults={
+                                "district": req.proposed_company_district,
+                                "address": req.proposed_company_address,
+                                "status": "approved",  # you can change to pending_verification if you want strict approval
+                            },
+                        )
+
+                    # create placement (you can later add supervisor assignment UI)
+                    Placement.objects.get_or_create(
+                        request=req,
+                        defaults={
+                            "company": company,
+                            "start_date": req.period.start_date,
+                            "end_date": req.period.end_date,
+                            "status": "pending_student_ack",
+                        },
+                    )
+        except transitions.TransitionError as e:
+            return render(request, "placements/coordinator_review.html", {
+                "req": req, "history": events.history(req), "allowed": transitions.ALLOWED[req.status], "error": str(e),
+            })
 
         return redirect("coordinator_review", request_id=req.id)
 
-    return render(request, "placements/coordinator_review.html", {"req": req})
+    return render(request, "placements/coordinator_review.html", {
+        "req": req, "history": events.history(req), "allowed": transitions.ALLOWED[req.status],
+    })
 
 @login_required
 def coordinator_issue_recommendation(request, request_id):
@@ -182,34 +218,48 @@ def coordinator_issue_recommendation(request, request_id):
     req = get_object_or_404(InternshipRequest, id=request_id)
 
     if request.method == "POST":
-        form = RecommendationLetterForm(request.POST, request.FILES, instance=req)
-        if form.is_valid():
-            # If proposed company, ensure it exists (approved or pending based on your policy)
-            if not req.preferred_company and req.proposed_company_name.strip():
-                company, _ = Company.objects.get_or_create(
-                    name=req.proposed_company_name.strip(),
-                    defaults={
-                        "district": req.proposed_company_district,
-                        "address": req.proposed_company_address,
-                        "status": "approved",  # change to pending_verification if you want strict vetting
-                    },
-                )
-                req.preferred_company = company
-
-            form.save()
-            req.status = "recommended"
-            req.recommendation_issued_at = timezone.now()
-            req.reviewed_by = request.user
-            req.reviewed_at = timezone.now()
-            req.save()
-
-            return redirect("coordinator_queue")
+        if request.POST.get("action") == "generate":
+            batch = letters.issue_recommendations(InternshipRequest.objects.filter(id=req.id), issued_by=request.user)
+            if not batch.failed:
+                return redirect("coordinator_queue")
+            form = RecommendationLetterForm(instance=req)
+            form.add_error(None, batch.failed[0][1])
+
+        else:
+            form = RecommendationLetterForm(request.POST, request.FILES, instance=req)
+            if form.is_valid():
+                try:
+                    with transaction.atomic():
+                        transitions.apply(req, "recommend", request.user)
+                        # If proposed company, ensure it exists (approved or pending based on your policy)
+                        req.ensure_preferred_company()
+                        form.save()
+                except transitions.TransitionError as e:
+                    form.add_error(None, str(e))
+                else:
+                    return redirect("coordinator_queue")
     else:
         form = RecommendationLetterForm(instance=req)
 
     return render(request, "placements/coordinator_issue_recommendation.html", {"req": req, "form": form})
 
 
+@login_required
+def coordinator_generate_recommendations(request):
+    if not is_coordinator(request.user):
+        return HttpResponseForbidden("Coordinators only.")
+
+    if request.method != "POST":
+        return redirect("coordinator_queue")
+
+    form = GenerateRecommendationsForm(request.POST)
+    if not form.is_valid():
+        return redirect("coordinator_queue")
+
+    batch = letters.issue_recommendations(form.cleaned_data["requests"].order_by("student__reg_no"), issued_by=request.user)
+    return render(request, "placements/coordinator_generated_letters.html", {"batch": batch})
+
+
 
 @login_required
 def student_upload_acceptance(request):
@@ -217,42 +267,32 @@ def student_upload_acceptance(request):
         return HttpResponseForbidden("Students only.")
 
     student = request.user.student_profile
-    period = InternshipPeriod.objects.filter(is_active=True).first()
+    period = get_active_period()
     if not period:
         return render(request, "placements/no_active_period.html")
 
     req = get_object_or_404(InternshipRequest, student=student, period=period)
 
-    # Block if verified (recommended)
-    if req.status == "acceptance_verified":
-        return render(request, "placements/acceptance_not_allowed.html", {"req": req})
-
-    # Allow upload + re-upload
-    if req.status not in ["recommended", "returned_for_acceptance", "acceptance_uploaded"]:
+    # Upload + re-upload until the coordinator verifies it
+    if not transitions.can(req, "upload_acceptance"):
         return render(request, "placements/acceptance_not_allowed.html", {"req": req})
 
     if request.method == "POST":
-        # ✅ capture old file BEFORE form binds the new one
-        old_name = req.acceptance_letter.name if req.acceptance_letter else None
+        form = AcceptanceLetterUploadForm(request.POST, request.FILES, instance=req, uploader=request.user)
 
-        form = AcceptanceLetterUploadForm(request.POST, request.FILES, instance=req)
-
-        if not request.FILES.get("acceptance_letter"):
+        if not request.FILES.get("acceptance_letter") and not form.has_upload("acceptance_letter"):
             form.add_error("acceptance_letter", "Please attach the acceptance letter before submitting.")
             return render(request, "placements/student_upload_acceptance.html", {"req": req, "form": form})
 
         if form.is_valid():
-            # ✅ save new file first (do NOT delete req.acceptance_letter here)
-            req = form.save(commit=False)
-            req.status = "acceptance_uploaded"
-            req.acceptance_uploaded_at = timezone.now()
-            req.acceptance_verified = False
-            req.acceptance_verified_at = None
-            req.save()
-
-            # ✅ now delete the old file safely (optional)
-            if old_name and old_name != req.acceptance_letter.name and default_storage.exists(old_name):
-                default_storage.delete(old_name)
+            try:
+                with transaction.atomic():
+                    req = form.save(commit=False)
+                    transitions.apply(req, "upload_acceptance", request.user)
+                    req.save()  # the replaced letter is released on commit (placements/storage.py)
+            except transitions.TransitionError:
+                return render(request, "placements/acceptance_not_allowed.html", {"req": req})
+            form.finish_uploads()
 
             return redirect("my_request")
     else:
@@ -269,7 +309,7 @@ def coordinator_verify_acceptance_and_assign(request, request_id):
 
     req = get_object_or_404(InternshipRequest, id=request_id)
 
-    if req.status != "acceptance_uploaded":
+    if not transitions.can(req, "verify_acceptance"):
         return render(request, "placements/verify_not_allowed.html", {"req": req})
 
     if request.method == "POST":
@@ -283,12 +323,10 @@ def coordinator_verify_acceptance_and_assign(request, request_id):
                 return HttpResponseForbidden("No company attached to this request.")
 
             # mark verified
-            req.acceptance_verified = True
-            req.acceptance_verified_at = timezone.now()
-            req.status = "acceptance_verified"
-            req.reviewed_by = request.user
-            req.reviewed_at = timezone.now()
-            req.save()
+            try:
+                transitions.apply(req, "verify_acceptance", request.user)
+            except transitions.TransitionError:
+                return render(request, "placements/verify_not_allowed.html", {"req": req})
 
             # create placement now
             placement, _ = Placement.objects.get_or_create(
@@ -320,28 +358,215 @@ def coordinator_acceptance_queue(request):
     if not is_coordinator(request.user):
         return HttpResponseForbidden("Coordinators only.")
 
-    qs = InternshipRequest.objects.filter(status="acceptance_uploaded").order_by("-acceptance_uploaded_at")
-    return render(request, "placements/coordinator_acceptance_queue.html", {"requests": qs})
+    ctx = period_context(request)
+    qs = (
+        InternshipRequest.objects
+        .for_period(ctx["period"])
+        .filter(status="acceptance_uploaded")
+        .order_by("-acceptance_uploaded_at")
+    )
+    return render(request, "placements/coordinator_acceptance_queue.html", {
+        "requests": qs,
+        "bulk_form": BulkVerifyAcceptanceForm(),
+        **ctx,
+    })
 
 
 @login_required
-def download_recommendation_letter(request, request_id):
-    if not hasattr(request.user, "student_profile"):
+def coordinator_bulk_verify_acceptance(request):
+    if not is_coordinator(request.user):
+        return HttpResponseForbidden("Coordinators only.")
+
+    if request.method != "POST":
+        return redirect("coordinator_acceptance_queue")
+
+    form = BulkVerifyAcceptanceForm(request.POST)
+    if not form.is_valid():
+        qs = InternshipRequest.objects.filter(status="acceptance_uploaded").order_by("-acceptance_uploaded_at")
+        return render(request, "placements/coordinator_acceptance_queue.html", {"requests": qs, "bulk_form": form})
+
+    # requests without a company can't be activated; leave them in the queue
+    reqs = [
+        r for r in form.cleaned_data["requests"].select_related("period", "preferred_company")
+        if r.preferred_company_id
+    ]
+    if not reqs:
+        return redirect("coordinator_acceptance_queue")
+
+    auto = form.cleaned_data["assignment"] != "manual"
+    if auto:
+        loads, company_sups, district_sups = current_supervisor_state()
+        if not loads:
+            form.add_error(None, "No active University Supervisors are available to balance across.")
+            qs = InternshipRequest.objects.filter(status="acceptance_uploaded").order_by("-acceptance_uploaded_at")
+            return render(request, "placements/coordinator_acceptance_queue.html", {"requests": qs, "bulk_form": form})
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        # mark verified; only the requests this moved go on (one verified elsewhere meanwhile is left alone)
+        moved = set(transitions.apply_many([r.id for r in reqs], "verify_acceptance", "acceptance_uploaded", request.user))
+        reqs = [r for r in reqs if r.id in moved]
+
+        if auto:
+            plan = allocate(
+                [AllocationItem(r.id, r.preferred_company_id, r.preferred_company.district) for r in reqs],
+                loads, company_sups, district_sups,
+            )
+            staff_by_id = StaffProfile.objects.in_bulk(set(plan.assignments.values()))
+            supervisors = [staff_by_id[plan.assignments[r.id]] for r in reqs]
+        else:
+            supervisors = [form.cleaned_data["university_supervisor"]] * len(reqs)
+
+        existing = {p.request_id: p for p in Placement.objects.filter(request__in=reqs)}
+        to_create, to_update = [], []
+        # bulk writes skip the save signals that record workflow events (tracking/events.py)
+        history = []
+
+        for req, supervisor in zip(reqs, supervisors):
+            placement = existing.get(req.id)
+            if placement:
+                # if existed, update supervisor + activate
+                if placement.status != "active":
+                    history.append(events.event(Placement, placement.id, placement.status, "active", request.user.id, req.period_id, now))
+                placement.company_id = req.preferred_company_id
+                placement.university_supervisor = supervisor
+                placement.status = "active"
+                to_update.append(placement)
+            else:
+                to_create.append(Placement(
+                    request=req,
+                    company_id=req.preferred_company_id,
+                    university_supervisor=supervisor,
+                    start_date=req.period.start_date,
+                    end_date=req.period.end_date,
+                    status="active",
+                ))
+
+        Placement.objects.bulk_create(to_create)
+        Placement.objects.bulk_update(to_update, ["company", "university_supervisor", "status"])
+
+        history += [events.event(Placement, p.id, "", "active", request.user.id, p.request.period_id, now) for p in to_create]
+        events.record_many(history)
+
+    # bulk writes skip post_save, so drop the students' cached active placement here
+    invalidate_active_placements(r.student_id for r in reqs)
+    return redirect("coordinator_acceptance_queue")
+
+
+@login_required
+async def download_recommendation_letter(request, request_id):
+    student = await astudent_profile(await auser(request))
+    if not student:
         return HttpResponseForbidden("Students only.")
 
+    try:
+        req = await InternshipRequest.objects.aget(id=request_id, student=student)
+    except InternshipRequest.DoesNotExist:
+        raise Http404("No InternshipRequest matches the given query.")
+
+    if not req.recommendation_letter:
+        raise Http404("No recommendation letter found.")
+
+    return await media.aserve_file(request, req.recommendation_letter, "Recommendation_Letter.pdf", as_attachment=True)
+
+
+# -------------------------------------------------------------------
+# CHUNKED UPLOADS (JSON endpoints used by static/base/js/chunked_upload.js)
+# -------------------------------------------------------------------
+def _upload_error(e, upload_id=None):
+    body = {"error": str(e)}
+    upload = ChunkedUpload.objects.filter(id=upload_id).first() if upload_id else None
+    if upload:
+        body.update(uploads.upload_state(upload))
+    return JsonResponse(body, status=e.status)
+
+
+@login_required
+def upload_start(request):
+    if request.method != "POST":
+        return HttpResponseForbidden("POST only.")
+
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON."}, status=400)
+
+    try:
+        upload = uploads.start_upload(request.user, data.get("filename"), data.get("size"), data.get("sha256"))
+    except uploads.UploadError as e:
+        return _upload_error(e)
+    return JsonResponse(uploads.upload_state(upload), status=201)
+
+
+@login_required
+def upload_chunk(request, upload_id):
+    if request.method == "GET":
+        upload = get_object_or_404(ChunkedUpload, id=upload_id, user=request.user)
+        return JsonResponse(uploads.upload_state(upload))
+
+    if request.method not in ("PUT", "POST"):
+        return HttpResponseForbidden("PUT only.")
+
+    try:
+        start, end = uploads.parse_content_range(request.headers.get("Content-Range"))
+        upload = uploads.append_chunk(upload_id, request.user, start, end, request)
+    except uploads.UploadError as e:
+        return _upload_error(e, upload_id)
+    return JsonResponse(uploads.upload_state(upload))
+
+
+# -------------------------------------------------------------------
+# PROTECTED FILES (permission check here, transfer in placements/media.py)
+# -------------------------------------------------------------------
+REQUEST_FILES = {
+    "cv": "CV",
+    "request_letter": "Request_Letter",
+    "recommendation_letter": "Recommendation_Letter",
+    "acceptance_letter": "Acceptance_Letter",
+}
+
+
+def _download_name(label, reg_no, field_file):
+    ext = os.path.splitext(field_file.name)[1]
+    return f"{label}_{reg_no}{ext}".replace("/", "-")
+
+
+@login_required
+def request_file(request, request_id, field):
+    if field not in REQUEST_FILES:
+        raise Http404("Unknown file.")
+
     req = get_object_or_404(
-        InternshipRequest,
+        InternshipRequest.objects.select_related("student", "placement"),
         id=request_id,
-        student=request.user.student_profile,
+    )
+    if not media.can_view_request_files(request.user, req):
+        return HttpResponseForbidden("You cannot view this file.")
+
+    field_file = getattr(req, field)
+    return media.serve_file(
+        request,
+        field_file,
+        _download_name(REQUEST_FILES[field], req.student.reg_no, field_file),
+        as_attachment=request.GET.get("download") == "1",
     )
 
-    if not req.recommendation_letter:
-        raise Http404("No recommendation letter found.")
 
-    return FileResponse(
-        req.recommendation_letter.open("rb"),
-        as_attachment=True,
-        filename="Recommendation_Letter.pdf",
+@login_required
+def placement_letter(request, placement_id):
+    placement = get_object_or_404(
+        Placement.objects.select_related("request__student"),
+        id=placement_id,
+    )
+    if not media.can_view_placement_files(request.user, placement):
+        return HttpResponseForbidden("You cannot view this file.")
+
+    return media.serve_file(
+        request,
+        placement.placement_letter,
+        _download_name("Placement_Letter", placement.request.student.reg_no, placement.placement_letter),
+        as_attachment=request.GET.get("download") == "1",
     )
 
 from .models import InternshipRequest
@@ -355,7 +580,7 @@ def coordinator_return_for_acceptance(request, request_id):
     req = get_object_or_404(InternshipRequest, id=request_id)
 
     # Only do this after recommendation has been issued (or already returned)
-    if req.status not in ["recommended", "returned_for_acceptance"]:
+    if not transitions.can(req, "return_for_acceptance"):
         return redirect("coordinator_acceptance_queue")
 
     # If student already uploaded acceptance, no need to return
@@ -365,10 +590,14 @@ def coordinator_return_for_acceptance(request, request_id):
     if request.method == "POST":
         form = CoordinatorAcceptanceCommentForm(request.POST)
         if form.is_valid():
-            req.coordinator_comment = form.cleaned_data["coordinator_comment"]
-            req.coordinator_commented_at = timezone.now()
-            req.status = "returned_for_acceptance"
-            req.save()
+            try:
+                transitions.apply(
+                    req, "return_for_acceptance", request.user,
+                    coordinator_comment=form.cleaned_data["coordinator_comment"],
+                    coordinator_commented_at=timezone.now(),
+                )
+            except transitions.TransitionError:
+                return redirect("coordinator_acceptance_queue")
             return redirect("coordinator_waiting_acceptance_queue")
     else:
         form = CoordinatorAcceptanceCommentForm(initial={"coordinator_comment": req.coordinator_comment})
@@ -381,10 +610,140 @@ def coordinator_waiting_acceptance_queue(request):
     if not is_coordinator(request.user):
         return HttpResponseForbidden("Coordinators only.")
 
-    qs = InternshipRequest.objects.filter(
+    ctx = period_context(request)
+    qs = InternshipRequest.objects.for_period(ctx["period"]).filter(
         status__in=["recommended", "returned_for_acceptance"],
         acceptance_letter__isnull=True,
     ).order_by("-recommendation_issued_at")
 
-    return render(request, "placements/coordinator_waiting_acceptance_queue.html", {"requests": qs})
+    return render(request, "placements/coordinator_waiting_acceptance_queue.html", {"requests": qs, **ctx})
+
 
+# -------------------------------------------------------------------
+# COORDINATOR: AUTOMATIC UNIVERSITY SUPERVISOR ALLOCATION
+# -------------------------------------------------------------------
+ALLOCATION_SESSION_KEY = "supervisor_allocation_plan"
+
+
+@login_required
+def coordinator_allocate_supervisors(request):
+    if not is_coordinator(request.user):
+        return HttpResponseForbidden("Coordinators only.")
+
+    if request.method == "POST":
+        # commit exactly what was previewed (stored in the session by the GET below)
+        plan = request.session.pop(ALLOCATION_SESSION_KEY, None) or {}
+        plan = {int(pid): sid for pid, sid in plan.items()}
+
+        with transaction.atomic():
+            # only placements that are still active + unassigned; anything assigned meanwhile is kept
+            placements = list(
+                Placement.objects
+                .select_for_update()
+                .filter(id__in=list(plan), status="active", university_supervisor__isnull=True)
+            )
+            for p in placements:
+                p.university_supervisor_id = plan[p.id]
+            Placement.objects.bulk_update(placements, ["university_supervisor"], batch_size=500)
+
+        invalidate_active_placements(
+            Placement.objects.filter(id__in=[p.id for p in placements]).values_list("request__student_id", flat=True)
+        )
+        return redirect("coordinator_dashboard")
+
+    result = plan_unassigned_placements()
+    request.session[ALLOCATION_SESSION_KEY] = {str(pid): sid for pid, sid in result.assignments.items()}
+
+    placements = (
+        Placement.objects
+        .filter(id__in=list(result.assignments))
+        .select_related("company", "request__student", "request__student__user")
+        .order_by("company__district", "company__name", "request__student__reg_no")
+    )
+    staff_by_id = StaffProfile.objects.select_related("user").in_bulk(list(result.loads_after))
+
+    rows = [
+        {
+            "placement": p,
+            "supervisor": staff_by_id.get(result.assignments[p.id]),
+            "reason": result.reasons[p.id],
+        }
+        for p in placements
+    ]
+    workload = sorted(
+        (
+            {
+                "supervisor": staff_by_id.get(sid),
+                "before": result.loads_before.get(sid, 0),
+                "after": load,
+            }
+            for sid, load in result.loads_after.items()
+        ),
+        key=lambda w: (-w["after"], w["supervisor"].staff_no if w["supervisor"] else ""),
+    )
+
+    return render(request, "placements/coordinator_allocate_supervisors.html", {
+        "rows": rows,
+        "workload": workload,
+        "result": result,
+    })
+
+
+# -------------------------------------------------------------------
+# COORDINATOR: COMPANY MATCHING FOR UNIVERSITY-ASSIGNED REQUESTS
+# -------------------------------------------------------------------
+MATCHING_SESSION_KEY = "company_matching_plan"
+
+
+@login_required
+def coordinator_match_companies(request):
+    if not is_coordinator(request.user):
+        return HttpResponseForbidden("Coordinators only.")
+
+    period = get_active_period()
+    if not period:
+        return render(request, "placements/no_active_period.html")
+
+    if request.method == "POST":
+        # apply exactly what was previewed; requests given a company meanwhile are left alone
+        plan = request.session.pop(MATCHING_SESSION_KEY, None) or {}
+        plan = {int(rid): cid for rid, cid in plan.items()}
+
+        with transaction.atomic():
+            reqs = list(pending_university_assigned(period).select_for_update().filter(id__in=list(plan)))
+            for r in reqs:
+                r.preferred_company_id = plan[r.id]
+            InternshipRequest.objects.bulk_update(reqs, ["preferred_company"], batch_size=500)
+
+        return redirect("coordinator_queue")
+
+    result = plan_company_matches(period)
+    request.session[MATCHING_SESSION_KEY] = {str(p.request_id): p.company_id for p in result.proposals}
+
+    req_by_id = (
+        InternshipRequest.objects
+        .select_related("student", "student__user", "student__program")
+        .in_bulk([p.request_id for p in result.proposals] + result.unmatched)
+    )
+    company_by_id = Company.objects.in_bulk({p.company_id for p in result.proposals})
+
+    rows = sorted(
+        (
+            {
+                "req": req_by_id[p.request_id],
+                "company": company_by_id[p.company_id],
+                "score": p.score,
+                "breakdown": p.breakdown,
+            }
+            for p in result.proposals
+        ),
+        key=lambda r: r["req"].student.reg_no,
+    )
+    unmatched = sorted((req_by_id[rid] for rid in result.unmatched), key=lambda r: r.student.reg_no)
+
+    return render(request, "placements/coordinator_match_companies.html", {
+        "period": period,
+        "rows": rows,
+        "unmatched": unmatched,
+        "result": result,
+    })
@@ -0,0 +1,151 @@
+// static/base/js/autosave.js
+//
+// Saves drafts of <form data-autosave="..."> while the user types (see
+// tracking/autosave.py), so a lost session doesn't lose the work.
+// - Changed fields are collected and sent as one JSON diff DELAY ms after
+//   typing stops (at most MAX_WAIT ms after the first unsaved edit), and at
+//   once when the page is hidden or left.
+// - A field is only forgotten once the server acknowledges it; "deferred"
+//   answers are retried later with whatever changed meanwhile.
+// - The hidden "version" input follows each save, so the normal Save/Submit
+//   still passes the optimistic-locking check. A conflict stops autosaving.
+(function () {
+  if (!window.fetch) return;
+
+  const DELAY = 3000;
+  const MAX_WAIT = 15000;
+  const SKIP = /^(csrfmiddlewaretoken|version|action)$|_upload$/;
+
+  function csrfToken() {
+    const m = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+    return m ? decodeURIComponent(m[1]) : '';
+  }
+
+  function fieldValue(form, name) {
+    const el = form.elements.namedItem(name);
+    if (!el) return null;
+    if (el instanceof RadioNodeList) return el.value;
+    if (el.type === 'checkbox') return el.checked ? el.value : null;
+    return el.value;
+  }
+
+  function setup(form) {
+    const url = form.dataset.autosave;
+    const version = form.querySelector('input[name="version"]');
+    if (!url || !version) return;
+
+    const dirty = new Map();  // name -> edit count, to tell edits made while a save was in flight
+    let edits = 0;
+    let timer = null;
+    let firstEdit = 0;
+    let inflight = null;
+    let stopped = false;
+    let failures = 0;
+
+    const status = document.createElement('div');
+    status.className = 'autosave-status small text-muted mb-2';
+    form.insertAdjacentElement('afterbegin', status);
+
+    function show(text, error) {
+      status.textContent = text;
+      status.classList.toggle('text-danger', !!error);
+      status.classList.toggle('text-muted', !error);
+    }
+
+    function schedule(ms) {
+      clearTimeout(timer);
+      timer = setTimeout(function () { save(false); }, ms);
+    }
+
+    function onEdit(e) {
+      const el = e.target;
+      if (stopped || !el.name || SKIP.test(el.name) || el.type === 'file' || el.type === 'hidden') return;
+      dirty.set(el.name, ++edits);
+      const now = Date.now();
+      if (!firstEdit) firstEdit = now;
+      schedule(Math.max(0, Math.min(DELAY, firstEdit + MAX_WAIT - now)));
+    }
+
+    async function save(flush) {
+      if (stopped || !dirty.size) return;
+      if (inflight) {
+        schedule(DELAY);
+        return;
+      }
+      clearTimeout(timer);
+
+      const sent = new Map(dirty);
+      const fields = {};
+      sent.forEach(function (_, name) { fields[name] = fieldValue(form, name); });
+
+      inflight = fetch(url, {
+        method: 'POST',
+        credentials: 'same-origin',
+        keepalive: flush,
+        headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrfToken() },
+        body: JSON.stringify({ version: Number(version.value), fields: fields, flush: flush }),
+      }).then(function (response) {
+        return response.json().then(function (data) { return { response: response, data: data }; });
+      });
+
+      try {
+        const r = await inflight;
+        failures = 0;
+        if (r.response.status === 202) {
+          schedule(1000 * r.data.retry_in);
+          return;
+        }
+        if (!r.response.ok) {
+          stopped = r.response.status === 403 || r.response.status === 409;
+          show(r.data.error || 'Draft could not be saved.', true);
+          if (!stopped) schedule(MAX_WAIT);
+          return;
+        }
+
+        // acknowledged (or rejected) fields are dropped unless edited again meanwhile
+        r.data.saved.concat(Object.keys(r.data.errors)).forEach(function (name) {
+          if (dirty.get(name) === sent.get(name)) dirty.delete(name);
+        });
+        version.value = r.data.version;
+        firstEdit = dirty.size ? Date.now() : 0;
+        const bad = Object.keys(r.data.errors);
+        if (bad.length) {
+          show('Draft saved at ' + r.data.saved_at + ', except: ' + bad.map(function (name) {
+            return name + ' (' + r.data.errors[name].join(' ') + ')';
+          }).join('; '), true);
+        } else {
+          show('Draft saved at ' + r.data.saved_at + '.');
+        }
+        if (dirty.size) schedule(DELAY);
+      } catch (err) {
+        // offline or the server is restarting: keep the fields and try again later
+        failures++;
+        show('Draft not saved yet (connection problem); retrying…', true);
+        schedule(Math.min(60000, DELAY * Math.pow(2, failures)));
+      } finally {
+        inflight = null;
+      }
+    }
+
+    form.addEventListener('input', onEdit);
+    form.addEventListener('change', onEdit);
+
+    form.addEventListener('submit', async function (e) {
+      // the form posts everything; let a save in flight finish first so the version is current
+      clearTimeout(timer);
+      stopped = true;
+      if (inflight) {
+        e.preventDefault();
+        try { await inflight; } catch (err) { /* the form post will report any problem */ }
+        form.requestSubmit(e.submitter);
+      }
+    });
+
+    document.addEventListener('visibilitychange', function () {
+      if (document.visibilityState === 'hidden') save(true);
+    });
+    window.addEventListener('pagehide', function () { save(true); });
+  }
+
+  document.querySelectorAll('form[data-autosave]').forEach(setup);
+})();
@@ -0,0 +1,122 @@
+// static/base/js/chunked_upload.js
+//
+// Sends files picked in <input type="file" data-chunked-upload="..."> to the
+// server in parts (see placements/uploads.py) instead of one big multipart POST.
+// - The upload id and offset are kept in localStorage: after a dropped
+//   connection, picking the same file again resumes where it stopped.
+// - When done, the hidden "<field>_upload" input gets the upload id and the
+//   file input is cleared, so the form itself posts no file bytes.
+// Browsers without crypto.subtle (plain http) keep the normal upload.
+(function () {
+  if (!(window.crypto && window.crypto.subtle && window.fetch)) return;
+
+  const RETRIES = 5;
+
+  function csrfToken() {
+    const m = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+    return m ? decodeURIComponent(m[1]) : '';
+  }
+
+  async function sha256(file) {
+    const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+    return Array.from(new Uint8Array(digest), function (b) {
+      return b.toString(16).padStart(2, '0');
+    }).join('');
+  }
+
+  function sleep(ms) {
+    return new Promise(function (resolve) { setTimeout(resolve, ms); });
+  }
+
+  async function request(url, options) {
+    // network errors are retried with backoff; HTTP errors are returned
+    for (let attempt = 0; ; attempt++) {
+      try {
+        const response = await fetch(url, Object.assign({ credentials: 'same-origin' }, options));
+        return { response: response, data: await response.json() };
+      } catch (err) {
+        if (attempt >= RETRIES) throw err;
+        await sleep(1000 * Math.pow(2, attempt));
+      }
+    }
+  }
+
+  async function resumeOrStart(input, file, key) {
+    const saved = JSON.parse(localStorage.getItem(key) || 'null');
+    if (saved) {
+      const r = await request(saved.url, { method: 'GET' });
+      if (r.response.ok) return r.data;
+      localStorage.removeItem(key);
+    }
+
+    const r = await request(input.dataset.chunkedUpload, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrfToken() },
+      body: JSON.stringify({ filename: file.name, size: file.size, sha256: await sha256(file) }),
+    });
+    if (!r.response.ok) throw new Error(r.data.error || 'Upload could not start.');
+    localStorage.setItem(key, JSON.stringify({ url: r.data.url }));
+    return r.data;
+  }
+
+  async function send(input, file, progress) {
+    const key = ['chunked-upload', input.name, file.name, file.size, file.lastModified].join(':');
+    let upload = await resumeOrStart(input, file, key);
+
+    while (!upload.complete) {
+      const end = Math.min(upload.offset + upload.chunk_size, file.size);
+      const r = await request(upload.url, {
+        method: 'PUT',
+        headers: {
+          'Content-Range': 'bytes ' + upload.offset + '-' + (end - 1) + '/' + file.size,
+          'X-CSRFToken': csrfToken(),
+        },
+        body: file.slice(upload.offset, end),
+      });
+      // 409: the server has a different offset, carry on from there
+      if (!r.response.ok && r.response.status !== 409) {
+        if (r.response.status !== 422) localStorage.removeItem(key);
+        throw new Error(r.data.error || 'Upload failed.');
+      }
+      upload = r.data;
+      progress(Math.floor((100 * upload.offset) / file.size));
+    }
+
+    localStorage.removeItem(key);
+    return upload.id;
+  }
+
+  document.addEventListener('change', async function (e) {
+    const input = e.target;
+    if (!input.matches || !input.matches('input[type="file"][data-chunked-upload]')) return;
+
+    const file = input.files && input.files[0];
+    const form = input.form;
+    const hidden = form && form.querySelector('input[name="' + input.name + '_upload"]');
+    if (!file || !hidden || file.size > Number(input.dataset.maxSize)) return;
+
+    let status = input.parentNode.querySelector('.chunked-upload-status');
+    if (!status) {
+      status = document.createElement('div');
+      status.className = 'chunked-upload-status small text-muted mt-1';
+      input.insertAdjacentElement('afterend', status);
+    }
+
+    const buttons = form.querySelectorAll('[type="submit"]:not([disabled])');
+    buttons.forEach(function (b) { b.disabled = true; });
+    hidden.value = '';
+
+    try {
+      status.textContent = 'Uploading ' + file.name + '…';
+      hidden.value = await send(input, file, function (pct) {
+        status.textContent = 'Uploading ' + file.name + '… ' + pct + '%';
+      });
+      input.value = '';
+      status.textContent = '✓ ' + file.name + ' uploaded.';
+    } catch (err) {
+      status.textContent = 'Upload failed: ' + err.message + ' Choose the file again to resume.';
+    } finally {
+      buttons.forEach(function (b) { b.disabled = false; });
+    }
+  });
+})();
@@ -0,0 +1,49 @@
+// static/base/js/live.js
+//
+// Shows live notifications (tracking/live.py) as Bootstrap toasts, from the
+// server-sent event stream at <body data-live-url="...">. EventSource
+// reconnects on its own and sends Last-Event-ID, so nothing sent while the
+// connection was down is missed. A message about the page being viewed
+// offers a reload instead of the page polling for changes.
+(function () {
+  const url = document.body.dataset.liveUrl;
+  if (!url || !window.EventSource || !window.bootstrap) return;
+
+  let container = null;
+
+  function toast(message) {
+    if (!container) {
+      container = document.createElement('div');
+      container.className = 'toast-container position-fixed bottom-0 end-0 p-3';
+      document.body.appendChild(container);
+    }
+
+    const here = message.url === window.location.pathname;
+    const el = document.createElement('div');
+    el.className = 'toast';
+    el.setAttribute('role', 'status');
+    el.innerHTML =
+      '<div class="toast-body d-flex align-items-start gap-2">' +
+      '<i class="bi bi-bell text-danger"></i>' +
+      '<div class="flex-grow-1"><div class="small"></div>' +
+      '<a class="small fw-semibold"></a></div>' +
+      '<button type="button" class="btn-close" data-bs-dismiss="toast" aria-label="Close"></button>' +
+      '</div>';
+    el.querySelector('.small').textContent = message.text;
+    const link = el.querySelector('a');
+    link.href = message.url;
+    link.textContent = here ? 'Reload this page' : 'Open';
+
+    container.appendChild(el);
+    el.addEventListener('hidden.bs.toast', function () { el.remove(); });
+    new bootstrap.Toast(el, { autohide: !here, delay: 10000 }).show();
+  }
+
+  const source = new EventSource(url);
+  source.onmessage = function (e) {
+    try {
+      toast(JSON.parse(e.data));
+    } catch (err) { /* ignore a malformed message */ }
+  };
+  window.addEventListener('pagehide', function () { source.close(); });
+})();
@@ -0,0 +1,229 @@
+# tracking/archive.py
+#
+# Archival of closed internship periods.
+# Completed/terminated placements of a closed period are folded into one
+# ArchivedPlacement row each (weekly logs, entries, site visits and evaluations
+# go into its JSON payload) and then deleted from the live tables, so the hot
+# tables only hold current cohorts. History pages read both sides through
+# placement_history(), so callers don't care where a placement lives.
+from dataclasses import dataclass
+
+from django.db import models, transaction
+from django.db.models import Prefetch
+
+from placements.models import Placement
+from placements.storage import keep_files
+
+from .models import WeeklyLog, ArchivedPlacement, PeriodSnapshot
+from .snapshots import take_snapshot
+
+ARCHIVABLE_STATUSES = ["completed", "terminated"]
+DEFAULT_BATCH_SIZE = 200
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def _fields(obj, skip=("id",)):
+    out = {}
+    for f in obj._meta.concrete_fields:
+        if f.name in skip:
+            continue
+        value = f.value_from_object(obj)
+        if isinstance(f, models.FileField):
+            value = value.name or ""  # the file itself stays in storage
+        out[f.attname] = value
+    return out
+
+
+def _related(p, name):
+    try:
+        return getattr(p, name)
+    except models.ObjectDoesNotExist:
+        return None
+
+
+def _score(evaluation):
+    if evaluation is None or evaluation.status != "submitted":
+        return None
+    return float(evaluation.score_out_of_100)
+
+
+def archive_record(p):
+    """Build (unsaved) the ArchivedPlacement for a fully prefetched placement."""
+    ind = _related(p, "industry_evaluation")
+    ac = _related(p, "academic_evaluation")
+    st = _related(p, "student_evaluation")
+    ind100, ac100 = _score(ind), _score(ac)
+    logs = list(p.weekly_logs.all())
+    sup = p.university_supervisor
+
+    return ArchivedPlacement(
+        period_id=p.request.period_id,
+        original_id=p.id,
+        request_id=p.request_id,
+        student_id=p.request.student_id,
+        reg_no=p.request.student.reg_no,
+        student_name=p.request.student.user.display_name,
+        company_id=p.company_id,
+        company_name=p.company.name,
+        university_supervisor_name=sup.user.display_name if sup else "",
+        start_date=p.start_date,
+        end_date=p.end_date,
+        status=p.status,
+        industry_100=ind100,
+        academic_100=ac100,
+        average_100=(ind100 + ac100) / 2 if ind100 is not None and ac100 is not None else None,
+        logs_total=len(logs),
+        logs_approved=sum(1 for log in logs if log.status == "approved_by_company"),
+        payload={
+            "placement": _fields(p),
+            "weekly_logs": [
+                {**_fields(log, skip=("id", "placement")), "entries": [_fields(e, skip=("id", "weekly_log")) for e in log.entries.all()]}
+                for log in sorted(logs, key=lambda log: log.week_no)
+            ],
+            "site_visits": [_fields(v, skip=("id", "placement")) for v in p.site_visits.all()],
+            "industry_evaluation": _fields(ind, skip=("id", "placement")) if ind else None,
+            "academic_evaluation": _fields(ac, skip=("id", "placement")) if ac else None,
+            "student_evaluation": _fields(st, skip=("id", "placement")) if st else None,
+        },
+    )
+
+
+def archivable_placements(period):
+    return Placement.objects.for_period(period).filter(status__in=ARCHIVABLE_STATUSES)
+
+
+def archive_period(period, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Move `period`'s closed placements into ArchivedPlacement, batch by batch.
+    The period snapshot is taken first (if missing) so cohort reports survive.
+    Returns the number of placements archived (or that would be, with dry_run).
+    """
+    if not period.is_closed:
+        raise ArchiveError(f"{period} is not closed yet.")
+
+    if dry_run:
+        return archivable_placements(period).count()
+
+    if not PeriodSnapshot.objects.filter(period=period).exists():
+        take_snapshot(period)
+
+    archived = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                archivable_placements(period)
+                .select_related(
+                    "company", "request", "request__student", "request__student__user",
+                    "university_supervisor__user",
+                    "industry_evaluation", "academic_evaluation", "student_evaluation",
+                )
+                .prefetch_related(
+                    Prefetch("weekly_logs", queryset=WeeklyLog.objects.prefetch_related("entries")),
+                    "site_visits",
+                )
+                .order_by("id")[:batch_size]
+            )
+            if not batch:
+                break
+
+            ArchivedPlacement.objects.bulk_create([archive_record(p) for p in batch])
+            # cascades to weekly logs, entries, site visits and evaluations;
+            # their files stay referenced from the payload
+            with keep_files():
+                Placement.objects.filter(id__in=[p.id for p in batch]).delete()
+            archived += len(batch)
+
+    return archived
+
+
+# -------------------------------------------------------------------
+# READ PATH: live + archived placements as one history
+# -------------------------------------------------------------------
+@dataclass
+class HistoryRecord:
+    archived: bool
+    id: int                 # Placement.id (live) or ArchivedPlacement.id
+    period_name: str
+    reg_no: str
+    student_name: str
+    company_name: str
+    start_date: object
+    end_date: object
+    status: str
+    industry_100: float = None
+    academic_100: float = None
+    average_100: float = None
+    logs_total: int = 0
+    logs_approved: int = 0
+
+
+def _live_records(placements):
+    placements = (
+        placements
+        .select_related(
+            "company", "request__period", "request__student__user",
+            "industry_evaluation", "academic_evaluation",
+        )
+        .annotate(
+            n_logs=models.Count("weekly_logs"),
+            n_approved=models.Count("weekly_logs", filter=models.Q(weekly_logs__status="approved_by_company")),
+        )
+    )
+    for p in placements:
+        ind100, ac100 = _score(_related(p, "industry_evaluation")), _score(_related(p, "academic_evaluation"))
+        yield HistoryRecord(
+            archived=False,
+            id=p.id,
+            period_name=p.request.period.name,
+            reg_no=p.request.student.reg_no,
+            student_name=p.request.student.user.display_name,
+            company_name=p.company.name,
+            start_date=p.start_date,
+            end_date=p.end_date,
+            status=p.status,
+            industry_100=ind100,
+            academic_100=ac100,
+            average_100=(ind100 + ac100) / 2 if ind100 is not None and ac100 is not None else None,
+            logs_total=p.n_logs,
+            logs_approved=p.n_approved,
+        )
+
+
+def _archived_records(archives):
+    for a in archives.select_related("period"):
+        yield HistoryRecord(
+            archived=True,
+            id=a.id,
+            period_name=a.period.name,
+            reg_no=a.reg_no,
+            student_name=a.student_name,
+            company_name=a.company_name,
+            start_date=a.start_date,
+            end_date=a.end_date,
+            status=a.status,
+            industry_100=a.industry_100,
+            academic_100=a.academic_100,
+            average_100=a.average_100,
+            logs_total=a.logs_total,
+            logs_approved=a.logs_approved,
+        )
+
+
+def placement_history(student=None, reg_no=None):
+    """Every placement of a student (by profile or reg no), live or archived, newest first."""
+    live = Placement.objects.all()
+    archives = ArchivedPlacement.objects.all()
+    if student is not None:
+        live = live.filter(request__student=student)
+        archives = archives.filter(student=student)
+    elif reg_no:
+        live = live.filter(request__student__reg_no__iexact=reg_no)
+        archives = archives.filter(reg_no__iexact=reg_no)
+    else:
+        return []
+
+    records = list(_live_records(live)) + list(_archived_records(archives))
+    return sorted(records, key=lambda r: r.start_date, reverse=True)
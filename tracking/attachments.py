@@ -0,0 +1,152 @@
+# tracking/attachments.py
+#
+# Post-upload processing of weekly-log and site-visit attachments.
+# After a new attachment is committed, a small thread pool:
+# - downscales photos to ATTACHMENT_MAX_SIDE and recompresses them (JPEG, or
+#   optimised PNG when there is transparency), keeping the result only if it
+#   is clearly smaller;
+# - rewrites PDFs with object streams and linearisation when pikepdf is
+#   installed (PDFs are left alone otherwise);
+# - stores a THUMBNAIL_SIZE JPEG preview of images for the log list pages.
+# The request never waits for any of it.
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+ATTACHMENT_MAX_SIDE = 2000
+JPEG_QUALITY = 82
+THUMBNAIL_SIZE = (240, 240)
+THUMBNAIL_QUALITY = 70
+MIN_SAVING = 0.9  # keep a recompressed file only if it is under 90% of the original
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.ATTACHMENT_WORKERS, thread_name_prefix="attachments")
+    return _executor
+
+
+def process_later(instance):
+    """Queue `instance` (a WeeklyLog or SiteVisit) once the current transaction commits."""
+    label, pk = instance._meta.label, instance.pk
+    transaction.on_commit(lambda: executor().submit(_run, label, pk))
+
+
+def _run(label, pk):
+    try:
+        process_attachment(apps.get_model(label), pk)
+    except Exception:
+        logger.exception("Processing attachment of %s %s failed", label, pk)
+    finally:
+        close_old_connections()
+
+
+# -------------------------------------------------------------------
+# IMAGES / PDFS
+# -------------------------------------------------------------------
+def _open_image(data):
+    try:
+        im = Image.open(io.BytesIO(data))
+        im.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return None
+    if getattr(im, "is_animated", False):
+        return None
+    return ImageOps.exif_transpose(im)
+
+
+def _has_alpha(im):
+    return im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+
+
+def compress_image(im):
+    """(bytes, extension) of a downscaled, recompressed copy of `im`."""
+    im = im.copy()
+    im.thumbnail((ATTACHMENT_MAX_SIDE, ATTACHMENT_MAX_SIDE))  # only ever shrinks
+    out = io.BytesIO()
+    if _has_alpha(im):
+        im.save(out, "PNG", optimize=True)
+        return out.getvalue(), ".png"
+    im.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return out.getvalue(), ".jpg"
+
+
+def thumbnail(im):
+    im = im.copy()
+    im.thumbnail(THUMBNAIL_SIZE)
+    if _has_alpha(im):
+        background = Image.new("RGB", im.size, "white")
+        background.paste(im.convert("RGBA"), mask=im.convert("RGBA").getchannel("A"))
+        im = background
+    out = io.BytesIO()
+    im.convert("RGB").save(out, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+    return out.getvalue()
+
+
+def compress_pdf(data):
+    """Linearised PDF with compressed object streams, or None without pikepdf / on a broken file."""
+    try:
+        import pikepdf
+    except ImportError:
+        return None
+
+    try:
+        with pikepdf.open(io.BytesIO(data)) as pdf:
+            out = io.BytesIO()
+            pdf.save(
+                out,
+                linearize=True,
+                compress_streams=True,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate,
+            )
+    except pikepdf.PdfError:
+        return None
+    return out.getvalue()
+
+
+def process_attachment(model, pk):
+    obj = model.objects.filter(pk=pk).first()
+    if obj is None or not obj.attachment:
+        return
+
+    with obj.attachment.open("rb") as f:
+        data = f.read()
+    original = obj.attachment.name
+    root = os.path.splitext(os.path.basename(original))[0]
+    changed = []
+
+    im = _open_image(data)
+    if im is not None:
+        smaller, ext = compress_image(im)
+        if len(smaller) < len(data) * MIN_SAVING:
+            obj.attachment.save(root + ext, ContentFile(smaller), save=False)
+            changed.append("attachment")
+        obj.attachment_thumbnail.save(root + "_thumb.jpg", ContentFile(thumbnail(im)), save=False)
+        changed.append("attachment_thumbnail")
+    elif data[:5] == b"%PDF-":
+        smaller = compress_pdf(data)
+        if smaller and len(smaller) <= len(data):
+            obj.attachment.save(root + ".pdf", ContentFile(smaller), save=False)
+            changed.append("attachment")
+
+    if not changed:
+        return
+    with transaction.atomic():
+        # only if the attachment wasn't replaced while we were working
+        if model.objects.filter(pk=pk, attachment=original).exists():
+            obj.save(update_fields=changed)
+            return
+    for name in changed:
+        getattr(obj, name).storage.delete(getattr(obj, name).name)
@@ -0,0 +1,126 @@
+# tracking/autosave.py
+#
+# Draft autosave for the long forms: weekly logs and the industry, academic and
+# student evaluations.
+# static/base/js/autosave.js posts {"version": n, "fields": {name: value}} with
+# every field changed since the last save the server acknowledged, a few
+# seconds after typing stops (and at once, with "flush", when the page is
+# left). Fields stay in the browser until acknowledged, so a burst of edits
+# coalesces into one write.
+# - Each form row is written at most once per AUTOSAVE_MIN_INTERVAL seconds
+#   (a cache.add() marker); requests inside that window are answered as
+#   deferred without touching the database, and the browser sends the fields
+#   again, merged with newer edits, next time.
+# - Each field is cleaned by the page's own form field; the valid ones are
+#   written with concurrency.save_changes(): only the columns that changed, and
+#   only if the row is still at the version the page holds.
+import json
+import re
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import concurrency
+
+THROTTLE_KEY = "tracking:autosave:{}:{}"
+
+
+class AutosaveError(Exception):
+    pass
+
+
+def parse(body):
+    """(version, {field: value}, flush) from a request body."""
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise AutosaveError("Invalid JSON.")
+    if not isinstance(data, dict) or not isinstance(data.get("fields"), dict):
+        raise AutosaveError("Expected {\"version\": ..., \"fields\": {...}}.")
+    version = data.get("version")
+    if not isinstance(version, int):
+        raise AutosaveError("Missing version.")
+    return version, data["fields"], bool(data.get("flush"))
+
+
+def may_write(instance, flush=False):
+    """False while `instance` was autosaved less than AUTOSAVE_MIN_INTERVAL seconds ago."""
+    key = THROTTLE_KEY.format(instance._meta.label_lower, instance.pk)
+    if flush:
+        cache.set(key, 1, settings.AUTOSAVE_MIN_INTERVAL)
+        return True
+    return cache.add(key, 1, settings.AUTOSAVE_MIN_INTERVAL)
+
+
+def split_rows(fields, prefix):
+    """
+    Separate formset fields ("<prefix>-<i>-<name>") from the rest:
+    ({name: value}, {i: {name: value}}).
+    """
+    pattern = re.compile(rf"^{re.escape(prefix)}-(\d+)-(\w+)$")
+    plain, rows = {}, {}
+    for name, value in fields.items():
+        m = pattern.match(name)
+        if m:
+            rows.setdefault(int(m.group(1)), {})[m.group(2)] = value
+        else:
+            plain[name] = value
+    return plain, rows
+
+
+def clean_fields(form, fields, skip=()):
+    """
+    Clean `fields` one by one with `form`'s fields (and clean_<name>() methods,
+    and the model fields' validators):
+    ({name: value}, {name: [errors]}). File fields and `skip` aren't autosaved.
+    """
+    data = {name: value for name, value in fields.items() if value is not None}
+    values, errors = {}, {}
+    for name in fields:
+        field = form.fields.get(name)
+        if name not in form._meta.fields or name in skip or isinstance(field, forms.FileField):
+            errors[name] = ["This field is only saved with the form."]
+            continue
+        try:
+            value = field.clean(field.widget.value_from_datadict(data, {}, name))
+            if hasattr(form, f"clean_{name}"):
+                form.cleaned_data = {name: value}
+                value = getattr(form, f"clean_{name}")()
+            # model validators (e.g. rating ranges) only run in the ModelForm's full_clean()
+            form.instance._meta.get_field(name).run_validators(value)
+        except ValidationError as e:
+            errors[name] = e.messages
+        else:
+            values[name] = value
+    return values, errors
+
+
+def save(instance, version, values, rows=(), derive=None):
+    """
+    Write `values` to `instance`, and each (row, values) in `rows` (e.g. a log's
+    day entries) under `instance`'s version; `derive()`, called once the rows
+    are updated in memory, returns more values for `instance`. Nothing is
+    written when nothing changed. Raises concurrency.StaleEdit.
+    """
+    changed = []
+    concurrency.assign(instance, changed, **values)
+    row_changes = []
+    for row, row_values in rows:
+        row_changed = []
+        concurrency.assign(row, row_changed, **row_values)
+        if row_changed:
+            row_changes.append((row, row_changed))
+    if derive:
+        concurrency.assign(instance, changed, **derive())
+    if not changed and not row_changes:
+        if instance.version != version:
+            raise concurrency.StaleEdit(concurrency.STALE_MESSAGE)
+        return
+
+    with transaction.atomic():
+        concurrency.save_changes(instance, version, changed)
+        for row, fields in row_changes:
+            row.save(update_fields=fields)
@@ -0,0 +1,148 @@
+# tracking/cohort.py
+#
+# Cohort-wide consolidated results for one InternshipPeriod.
+# Score data is read once (a single values_list query, iterated in chunks) and
+# every row is dropped into its program / department / faculty / company /
+# supervisor bucket on the way through; the distribution of each bucket is then
+# computed from its own sorted list.
+import math
+import time
+from dataclasses import dataclass, field
+
+from placements.models import Placement
+
+from .models import IndustryEvaluation, AcademicEvaluation, score_out_of_100
+
+PASS_MARK = 50
+
+DIMENSIONS = [
+    ("program", "Program"),
+    ("department", "Department"),
+    ("faculty", "Faculty"),
+    ("company", "Company"),
+    ("supervisor", "University Supervisor"),
+]
+
+UNSET = "— Not set —"
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list (pct in 0..100)."""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    if lo == hi:
+        return sorted_values[lo]
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def mean(values):
+    return sum(values) / len(values) if values else None
+
+
+@dataclass
+class ScoreGroup:
+    label: str
+    students: int = 0
+    industry: list = field(default_factory=list)
+    academic: list = field(default_factory=list)
+    average: list = field(default_factory=list)   # only students with both scores
+
+    def add(self, ind100, ac100, avg100):
+        self.students += 1
+        if ind100 is not None:
+            self.industry.append(ind100)
+        if ac100 is not None:
+            self.academic.append(ac100)
+        if avg100 is not None:
+            self.average.append(avg100)
+
+    def summary(self):
+        avg = sorted(self.average)
+        return {
+            "label": self.label,
+            "students": self.students,
+            "evaluated": len(avg),
+            "industry_mean": mean(self.industry),
+            "academic_mean": mean(self.academic),
+            "mean": mean(avg),
+            "median": percentile(avg, 50),
+            "p25": percentile(avg, 25),
+            "p75": percentile(avg, 75),
+            "p90": percentile(avg, 90),
+            "min": avg[0] if avg else None,
+            "max": avg[-1] if avg else None,
+            "below_pass": sum(1 for v in avg if v < PASS_MARK),
+        }
+
+
+@dataclass
+class CohortReport:
+    overall: dict = field(default_factory=dict)
+    dimensions: list = field(default_factory=list)   # [(key, title, [summary, ...]), ...]
+    elapsed_ms: float = 0.0
+
+
+def cohort_results(period):
+    started = time.perf_counter()
+
+    ind_fields = [f"industry_evaluation__{f}" for f in IndustryEvaluation.SCORE_FIELDS]
+    ac_fields = [f"academic_evaluation__{f}" for f in AcademicEvaluation.SCORE_FIELDS]
+    n_ind, n_ac = len(ind_fields), len(ac_fields)
+
+    qs = (
+        Placement.objects
+        .filter(request__period=period)
+        .exclude(status="terminated")
+        .values_list(
+            "request__student__program__name",
+            "request__student__program__department__name",
+            "request__student__program__department__faculty__name",
+            "company__name",
+            "university_supervisor__user__first_name",
+            "university_supervisor__user__last_name",
+            "university_supervisor__user__email",
+            "industry_evaluation__status",
+            "academic_evaluation__status",
+            *ind_fields,
+            *ac_fields,
+        )
+    )
+
+    overall = ScoreGroup("All students")
+    groups = {key: {} for key, _ in DIMENSIONS}
+
+    for row in qs.iterator(chunk_size=2000):
+        program, department, faculty, company, sup_first, sup_last, sup_email, ind_status, ac_status = row[:9]
+        ind100 = score_out_of_100(row[9:9 + n_ind], IndustryEvaluation.marks_available()) if ind_status == "submitted" else None
+        ac100 = score_out_of_100(row[9 + n_ind:9 + n_ind + n_ac], AcademicEvaluation.marks_available()) if ac_status == "submitted" else None
+        avg100 = (ind100 + ac100) / 2 if ind100 is not None and ac100 is not None else None
+
+        supervisor = f"{sup_first or ''} {sup_last or ''}".strip() or sup_email
+        labels = {
+            "program": program,
+            "department": department,
+            "faculty": faculty,
+            "company": company,
+            "supervisor": supervisor,
+        }
+
+        overall.add(ind100, ac100, avg100)
+        for key, label in labels.items():
+            label = label or UNSET
+            bucket = groups[key].get(label)
+            if bucket is None:
+                bucket = groups[key][label] = ScoreGroup(label)
+            bucket.add(ind100, ac100, avg100)
+
+    report = CohortReport(overall=overall.summary())
+    for key, title in DIMENSIONS:
+        summaries = sorted(
+            (g.summary() for g in groups[key].values()),
+            key=lambda s: (s["mean"] is None, -(s["mean"] or 0), s["label"]),
+        )
+        report.dimensions.append((key, title, summaries))
+
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return report
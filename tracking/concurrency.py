@@ -0,0 +1,90 @@
+# tracking/concurrency.py
+#
+# Optimistic locking for rows edited through long forms (weekly logs, industry
+# and academic evaluations).
+# Each of those models has a `version` column. The edit page carries the
+# version it was rendered with (VersionedFormMixin), and save_changes():
+# - moves the version on with one UPDATE ... WHERE id = %s AND version = <the
+#   form's>; no row means someone else saved in between, so StaleEdit is raised
+#   and nothing is written;
+# - then saves only the columns that changed with save(update_fields=...), so
+#   the file and status signals still run but a wide row isn't rewritten whole.
+# Writes that don't come from an edit form (submit, approve, return) use
+# save_bumped() so pages opened before them go stale too.
+from django import forms
+from django.db import transaction
+from django.db.models import F
+
+from placements.uploads import UPLOAD_SUFFIX
+
+STALE_MESSAGE = (
+    "This was changed elsewhere (in another tab or by someone else) after you opened it, "
+    "so your changes were not saved. Copy anything you need, then reload the page."
+)
+
+
+class StaleEdit(Exception):
+    pass
+
+
+def _auto_now_fields(model):
+    return [f.name for f in model._meta.concrete_fields if getattr(f, "auto_now", False)]
+
+
+def assign(instance, changed, **values):
+    """Set `values` on `instance`, adding the names that really changed to `changed`."""
+    for name, value in values.items():
+        field = instance._meta.get_field(name)
+        new = value.pk if field.is_relation and value is not None else value
+        if field.value_from_object(instance) != new:
+            setattr(instance, name, value)
+            changed.append(name)
+
+
+def save_changes(instance, version, fields):
+    """
+    Save `fields` of `instance` if its row is still at `version` (as read by the
+    form); raises StaleEdit otherwise. Run other writes of the same edit inside
+    the caller's transaction, after this.
+    """
+    model = type(instance)
+    with transaction.atomic():
+        if version is None or not model._base_manager.filter(pk=instance.pk, version=version).update(
+            version=F("version") + 1
+        ):
+            raise StaleEdit(STALE_MESSAGE)
+        instance.version = version + 1
+        if fields:
+            instance.save(update_fields={*fields, *_auto_now_fields(model)})
+
+
+def save_bumped(instance, fields):
+    """save(update_fields=fields), also moving the version on."""
+    instance.version = F("version") + 1
+    instance.save(update_fields={*fields, "version", *_auto_now_fields(type(instance))})
+    instance.refresh_from_db(fields=["version"])
+
+
+class VersionedFormMixin:
+    """
+    For ModelForms of versioned models: adds a hidden `version` input holding
+    the instance's version when the page was rendered.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["version"] = forms.IntegerField(
+            required=False, widget=forms.HiddenInput, initial=self.instance.version,
+        )
+
+    @property
+    def version(self):
+        return self.cleaned_data.get("version")
+
+    def changed_fields(self):
+        """Model fields the user changed (a file sent in parts counts as changed)."""
+        names = [name for name in self.changed_data if name in self._meta.fields]
+        for name in getattr(self, "_file_fields", []):
+            if self.cleaned_data.get(name + UPLOAD_SUFFIX) and name not in names:
+                names.append(name)
+        return names
@@ -0,0 +1,11 @@
+from django.urls import reverse
+
+from . import live
+
+
+def live_notifications(request):
+    # base.html only starts the notification stream where live.enabled() allows it
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated and live.enabled(request):
+        return {"live_url": reverse("live_notifications")}
+    return {"live_url": ""}
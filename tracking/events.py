@@ -0,0 +1,133 @@
+# tracking/events.py
+#
+# Append-only workflow history.
+# Every status change of an internship request, placement or weekly log adds
+# one WorkflowEvent (entity, id, from -> to, actor, period, time):
+# - row saves are caught by track_status() (pre_save/post_save, the same way
+#   placements.storage.track_file_fields follows file changes);
+# - bulk .update()/bulk_create paths bypass signals and call record_many(),
+#   which inserts in batches.
+# history() and the dashboard metrics read only the indexed event table.
+# Recorded events also drive the live notifications (tracking/live.py).
+import datetime
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, OuterRef, Subquery
+from django.db.models.signals import post_save, pre_save
+from django.utils import timezone
+
+from .models import WorkflowEvent
+
+BATCH_SIZE = 500
+
+
+def event(model, entity_id, from_status, to_status, actor_id=None, period_id=None, at=None):
+    """An unsaved WorkflowEvent, for record_many()."""
+    return WorkflowEvent(
+        entity=model._meta.label_lower,
+        entity_id=entity_id,
+        from_status=from_status or "",
+        to_status=to_status,
+        actor_id=actor_id,
+        period_id=period_id,
+        at=at or timezone.now(),
+    )
+
+
+def record_many(events, notify=True):
+    """Insert `events`; unless `notify` is off, also tell the people concerned (tracking/live.py)."""
+    from . import live
+
+    created = WorkflowEvent.objects.bulk_create(list(events), batch_size=BATCH_SIZE)
+    if notify:
+        live.publish_events(created)
+    return created
+
+
+def history(obj):
+    return WorkflowEvent.objects.for_entity(obj).select_related("actor")
+
+
+# -------------------------------------------------------------------
+# ROW SAVES
+# -------------------------------------------------------------------
+def track_status(model, period=None, related=(), actor=None, field="status"):
+    """
+    Record `model`'s status changes made through save().
+    `period` is the lookup of the period id (e.g. "request__period_id") and
+    `related` more lookups `actor` needs; they are read with the previous status
+    in one values() query, so no related row is loaded. `actor(instance, row)`
+    returns the acting user id (or None), `row` holding the lookups' values.
+    Saves whose update_fields leave out `field` aren't looked at.
+    """
+    uid = f"track_status:{model._meta.label}"
+    lookups = [name for name in (period, *related) if name]
+
+    def remember_status(sender, instance, raw=False, update_fields=None, **kwargs):
+        instance._status_before = None
+        if raw or (update_fields is not None and field not in update_fields):
+            return
+        if instance._state.adding or instance.pk is None:
+            instance._status_before = ("", None)  # the lookups are read after the insert, if needed
+        else:
+            row = sender._base_manager.filter(pk=instance.pk).values(field, *lookups).first()
+            if row is not None:
+                instance._status_before = (row.pop(field), row)
+
+    def record_status(sender, instance, **kwargs):
+        remembered = getattr(instance, "_status_before", None)
+        instance._status_before = None
+        if remembered is None:
+            return
+        before, row = remembered
+        after = getattr(instance, field)
+        if before == after:
+            return
+        if row is None:
+            row = (sender._base_manager.filter(pk=instance.pk).values(*lookups).first() if lookups else None) or {}
+        record_many([event(
+            sender, instance.pk, before, after,
+            actor_id=actor(instance, row) if actor else None,
+            period_id=row.get(period) if period else None,
+        )])
+
+    pre_save.connect(remember_status, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(record_status, sender=model, weak=False, dispatch_uid=uid)
+
+
+# -------------------------------------------------------------------
+# METRICS
+# -------------------------------------------------------------------
+def _events(model, period=None):
+    qs = WorkflowEvent.objects.filter(entity=model._meta.label_lower)
+    return qs.filter(period=period) if period else qs
+
+
+def durations(model, from_status, to_status, period=None):
+    """
+    Each move into `to_status`, annotated with `duration`: the time since the
+    entity last entered `from_status` before it.
+    """
+    entered = (
+        WorkflowEvent.objects
+        .filter(entity=OuterRef("entity"), entity_id=OuterRef("entity_id"), to_status=from_status, at__lte=OuterRef("at"))
+        .order_by("-at")
+        .values("at")[:1]
+    )
+    return (
+        _events(model, period)
+        .filter(to_status=to_status)
+        .annotate(started=Subquery(entered))
+        .filter(started__isnull=False)
+        .annotate(duration=ExpressionWrapper(F("at") - F("started"), output_field=DurationField()))
+    )
+
+
+def average_duration(model, from_status, to_status, period=None):
+    """{"avg": timedelta or None, "n": count} for from_status -> to_status."""
+    return durations(model, from_status, to_status, period).aggregate(avg=Avg("duration"), n=Count("id"))
+
+
+def throughput(model, to_status, days=7, period=None):
+    """How many entities moved into `to_status` over the last `days` days."""
+    since = timezone.now() - datetime.timedelta(days=days)
+    return _events(model, period).filter(to_status=to_status, at__gte=since).values("entity_id").distinct().count()
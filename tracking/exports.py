@@ -0,0 +1,203 @@
+# tracking/exports.py
+#
+# Registrar-ready CSV exports. Every export is a generator over
+# `.values_list(...).iterator(chunk_size=...)`, written row by row into a
+# StreamingHttpResponse, so memory stays flat whether it is 100 or 100k rows.
+# Under ASGI the rows are handed over as an async iterator instead, a batch per
+# thread hop (a sync iterator would be read into memory first, as in
+# placements/media.py).
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Q
+from django.http import StreamingHttpResponse
+
+from placements.models import Placement
+
+from .models import WeeklyLogEntry, IndustryEvaluation, AcademicEvaluation, score_out_of_100
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    # csv.writer target that hands each encoded row straight back
+    def write(self, value):
+        return value
+
+
+async def _async_lines(lines):
+    # the queryset's cursor stays on the request's database thread (thread_sensitive)
+    next_batch = sync_to_async(lambda: "".join(islice(lines, CHUNK_SIZE)))
+    try:
+        while batch := await next_batch():
+            yield batch
+    finally:
+        await sync_to_async(lines.close)()
+
+
+def stream_csv(request, filename, header, rows):
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield "﻿"  # BOM so Excel opens UTF-8 names correctly
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    content = _async_lines(lines()) if isinstance(request, ASGIRequest) else lines()
+    response = StreamingHttpResponse(content, content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _score_100(values, status, model):
+    if status != "submitted":
+        return ""
+    return round(score_out_of_100(values, model.marks_available()), 1)
+
+
+def _placements(period=None):
+    qs = Placement.objects.all()
+    if period:
+        qs = qs.filter(request__period=period)
+    return qs.order_by("request__student__reg_no", "id")
+
+
+# -------------------------------------------------------------------
+# RESULTS: one row per placement (industry + academic + average + log counts)
+# -------------------------------------------------------------------
+RESULTS_HEADER = [
+    "Reg No", "Student", "Email", "Program", "Period", "Company", "District",
+    "University Supervisor", "Placement Status",
+    "Industry Status", "Industry /100", "Academic Status", "Academic /100", "Average /100",
+    "Logs Submitted", "Logs Approved",
+]
+
+
+def results_rows(period=None):
+    ind_fields = [f"industry_evaluation__{f}" for f in IndustryEvaluation.SCORE_FIELDS]
+    ac_fields = [f"academic_evaluation__{f}" for f in AcademicEvaluation.SCORE_FIELDS]
+    n_ind, n_ac = len(ind_fields), len(ac_fields)
+
+    qs = (
+        _placements(period)
+        .annotate(
+            logs_submitted=Count("weekly_logs", filter=Q(weekly_logs__status__in=["submitted", "approved_by_company"])),
+            logs_approved=Count("weekly_logs", filter=Q(weekly_logs__status="approved_by_company")),
+        )
+        .values_list(
+            "request__student__reg_no",
+            "request__student__user__first_name",
+            "request__student__user__last_name",
+            "request__student__user__email",
+            "request__student__program__name",
+            "request__period__name",
+            "company__name",
+            "company__district",
+            "university_supervisor__user__first_name",
+            "university_supervisor__user__last_name",
+            "status",
+            "industry_evaluation__status",
+            "academic_evaluation__status",
+            "logs_submitted",
+            "logs_approved",
+            *ind_fields,
+            *ac_fields,
+        )
+    )
+
+    for row in qs.iterator(chunk_size=CHUNK_SIZE):
+        (reg_no, first, last, email, program, period_name, company, district,
+         sup_first, sup_last, status, ind_status, ac_status, logs_submitted, logs_approved) = row[:15]
+        ind100 = _score_100(row[15:15 + n_ind], ind_status, IndustryEvaluation)
+        ac100 = _score_100(row[15 + n_ind:15 + n_ind + n_ac], ac_status, AcademicEvaluation)
+        avg100 = round((ind100 + ac100) / 2, 1) if ind100 != "" and ac100 != "" else ""
+
+        yield [
+            reg_no, f"{first} {last}".strip(), email, program or "", period_name, company, district,
+            f"{sup_first or ''} {sup_last or ''}".strip(), status,
+            ind_status or "", ind100, ac_status or "", ac100, avg100,
+            logs_submitted, logs_approved,
+        ]
+
+
+# -------------------------------------------------------------------
+# LOGS: one row per daily entry of every weekly log
+# -------------------------------------------------------------------
+LOGS_HEADER = [
+    "Reg No", "Company", "Week", "From", "To", "Log Status", "Submitted At",
+    "Day", "Work Assignment", "Activities / Steps", "Weekly Activities", "Challenges", "Lessons",
+    "Company Action At", "Return Reason",
+]
+
+
+def log_rows(period=None):
+    qs = WeeklyLogEntry.objects.all()
+    if period:
+        qs = qs.filter(weekly_log__placement__request__period=period)
+
+    qs = (
+        qs.order_by("weekly_log__placement__request__student__reg_no", "weekly_log__week_no", "id")
+        .values_list(
+            "weekly_log__placement__request__student__reg_no",
+            "weekly_log__placement__company__name",
+            "weekly_log__week_no",
+            "weekly_log__from_date",
+            "weekly_log__to_date",
+            "weekly_log__status",
+            "weekly_log__submitted_at",
+            "day",
+            "work_assignment",
+            "activities_steps",
+            "weekly_log__activities",
+            "weekly_log__challenges",
+            "weekly_log__lessons",
+            "weekly_log__company_action_at",
+            "weekly_log__return_reason",
+        )
+    )
+    days = dict(WeeklyLogEntry.DAYS)
+
+    for row in qs.iterator(chunk_size=CHUNK_SIZE):
+        row = list(row)
+        row[7] = days.get(row[7], row[7])
+        yield ["" if v is None else v for v in row]
+
+
+# -------------------------------------------------------------------
+# EVALUATIONS: every rating/comment/answer per placement
+# -------------------------------------------------------------------
+def _answer_fields():
+    ind = [f for f in IndustryEvaluation.SCORE_FIELDS] + [f"{f}_comment" for f in IndustryEvaluation.SCORE_FIELDS]
+    ind += ["recommend_employment", "recommend_comment", "other_comments", "status", "submitted_at"]
+    ac = [f for f in AcademicEvaluation.SCORE_FIELDS] + [f"{f}_comment" for f in AcademicEvaluation.SCORE_FIELDS]
+    ac += ["recommendation", "status", "submitted_at"]
+    st = [f"q{i}" for i in range(1, 11)] + ["status", "submitted_at"]
+    return (
+        [("industry_evaluation", f) for f in ind]
+        + [("academic_evaluation", f) for f in ac]
+        + [("student_evaluation", f) for f in st]
+    )
+
+
+def evaluations_header():
+    prefix = {"industry_evaluation": "Industry", "academic_evaluation": "Academic", "student_evaluation": "Student"}
+    return ["Reg No", "Company"] + [f"{prefix[rel]}: {f.replace('_', ' ')}" for rel, f in _answer_fields()]
+
+
+def evaluation_rows(period=None):
+    fields = [f"{rel}__{f}" for rel, f in _answer_fields()]
+    qs = (
+        _placements(period)
+        .filter(
+            Q(industry_evaluation__isnull=False)
+            | Q(academic_evaluation__isnull=False)
+            | Q(student_evaluation__isnull=False)
+        )
+        .values_list("request__student__reg_no", "company__name", *fields)
+    )
+    for row in qs.iterator(chunk_size=CHUNK_SIZE):
+        yield ["" if v is None else v for v in row]
+
@@ -4,6 +4,8 @@ from .models import IndustryEvaluation
 from .models import WeeklyLog, WeeklyLogEntry, SiteVisit
 from .models import AcademicEvaluation
 from .models import StudentEvaluation
+from placements.uploads import ChunkedUploadMixin
+from .concurrency import VersionedFormMixin
 
 from django.core.exceptions import ValidationError
 
@@ -11,7 +13,7 @@ from django.core.exceptions import ValidationError
 MAX_ATTACHMENT_SIZE = 5 * 1024 * 1024  # 5MB
 
 
-class WeeklyLogForm(forms.ModelForm):
+class WeeklyLogForm(VersionedFormMixin, ChunkedUploadMixin, forms.ModelForm):
     week_no = forms.IntegerField(
         min_value=1,
         max_value=60,
@@ -57,6 +59,12 @@ class WeeklyLogForm(forms.ModelForm):
 
         return f
 
+    def changed_fields(self):
+        names = super().changed_fields()
+        if "attachment" in names:
+            names.append("attachment_thumbnail")  # cleared for the new file (tracking/signals.py)
+        return names
+
 
 class WeeklyLogEntryForm(forms.ModelForm):
     class Meta:
@@ -87,7 +95,7 @@ WeeklyLogEntryFormSet = inlineformset_factory(
 )
 
 
-class SiteVisitForm(forms.ModelForm):
+class SiteVisitForm(ChunkedUploadMixin, forms.ModelForm):
     class Meta:
         model = SiteVisit
         fields = ["visit_date", "findings", "recommendations", "attachment"]
@@ -103,7 +111,7 @@ from .models import IndustryEvaluation
 
 RATING_CHOICES = [(1, "1"), (2, "2"), (3, "3"), (4, "4"), (5, "5")]
 
-class IndustryEvaluationForm(forms.ModelForm):
+class IndustryEvaluationForm(VersionedFormMixin, forms.ModelForm):
     class Meta:
         model = IndustryEvaluation
         fields = [
@@ -201,7 +209,7 @@ class IndustryEvaluationForm(forms.ModelForm):
 
 SCORE_CHOICES = [(1, "1"), (2, "2"), (3, "3"), (4, "4"), (5, "5")]
 
-class AcademicEvaluationForm(forms.ModelForm):
+class AcademicEvaluationForm(VersionedFormMixin, forms.ModelForm):
     class Meta:
         model = AcademicEvaluation
         fields = [
@@ -241,7 +249,7 @@ class AcademicEvaluationForm(forms.ModelForm):
 
 
 
-class StudentEvaluationForm(forms.ModelForm):
+class StudentEvaluationForm(VersionedFormMixin, forms.ModelForm):
     class Meta:
         model = StudentEvaluation
         fields = [
@@ -0,0 +1,278 @@
+# tracking/live.py
+#
+# Live notifications over server-sent events.
+# Workflow events (tracking/events.py) become short messages for the people
+# who have to act on them or want to know:
+#   weekly log submitted           -> the company's industry supervisors
+#   weekly log approved / returned -> the student
+#   request status changed         -> the student; coordinators when it needs review
+#   results report submitted       -> coordinators
+# They are published after commit through a broker and streamed to each user
+# by the async /tracking/live/ view, so list pages no longer need refreshing
+# to notice new work. Messages are only built while someone is listening.
+# Off unless LIVE_NOTIFICATIONS_ENABLED is set, and only offered on requests
+# served over ASGI: under WSGI each open stream would hold a worker for good.
+# LocalBroker is an in-process stand-in: it reaches the streams held by the
+# same worker process only. With several workers, point LIVE_BROKER at a
+# shared implementation (e.g. Redis pub/sub) with the same methods.
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from accounts.models import IndustrySupervisorProfile
+from placements.models import InternshipRequest
+
+from .models import SupervisorResultsReport, WeeklyLog
+
+QUEUE_SIZE = 100          # per open stream; a client that far behind catches up on reconnect
+HISTORY = 20              # recent messages per user, replayed after Last-Event-ID
+HEARTBEAT_SECONDS = 25    # comment lines keep proxies from closing an idle stream
+STREAM_SECONDS = 30 * 60  # streams end now and then; EventSource reconnects by itself
+RETRY_MS = 5000
+
+
+def enabled(request):
+    """Whether `request` may open a notification stream."""
+    return settings.LIVE_NOTIFICATIONS_ENABLED and isinstance(request, ASGIRequest)
+
+
+# -------------------------------------------------------------------
+# BROKER
+# -------------------------------------------------------------------
+class Subscription:
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def deliver(self, message):
+        # called from whichever thread published
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+
+class LocalBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)                     # user id -> {Subscription}
+        self._recent = defaultdict(lambda: deque(maxlen=HISTORY))  # users seen by this process
+        self._last_id = 0
+
+    def listening(self):
+        return bool(self._recent)
+
+    def _next_id(self):
+        # increasing across restarts too, so a stale Last-Event-ID can't hide new messages
+        self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+        return self._last_id
+
+    def publish(self, user_ids, message):
+        with self._lock:
+            message = {**message, "id": self._next_id()}
+            targets = []
+            for user_id in set(user_ids):
+                if user_id in self._recent:
+                    self._recent[user_id].append(message)
+                    targets.extend(self._subscribers.get(user_id, ()))
+        for sub in targets:
+            sub.deliver(message)
+
+    def subscribe(self, user_id, last_id=None):
+        """A Subscription for `user_id`, primed with the messages after `last_id`. Call from the event loop."""
+        sub = Subscription(user_id)
+        with self._lock:
+            self._subscribers[user_id].add(sub)
+            backlog = list(self._recent[user_id])
+        if last_id is not None:
+            for message in backlog:
+                if message["id"] > last_id:
+                    sub._put(message)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.user_id]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.LIVE_BROKER)()
+        return _broker
+
+
+# -------------------------------------------------------------------
+# MESSAGES (WorkflowEvents -> [(user ids, message)])
+# -------------------------------------------------------------------
+def _others(user_ids, e):
+    # nobody is told about their own action
+    return [u for u in user_ids if u != e.actor_id]
+
+
+def _coordinators():
+    return list(
+        get_user_model().objects.filter(groups__name="Coordinator", is_active=True).values_list("id", flat=True)
+    )
+
+
+def _log_messages(events):
+    logs = {
+        row["id"]: row
+        for row in WeeklyLog.objects.filter(id__in={e.entity_id for e in events}).values(
+            "id", "week_no", "placement__company_id", "placement__company__name",
+            "placement__request__student__user_id", "placement__request__student__reg_no",
+        )
+    }
+    company_users = defaultdict(list)
+    for company_id, user_id in IndustrySupervisorProfile.objects.filter(
+        company_id__in={log["placement__company_id"] for log in logs.values()}
+    ).values_list("company_id", "user_id"):
+        company_users[company_id].append(user_id)
+
+    for e in events:
+        log = logs.get(e.entity_id)
+        if not log:
+            continue
+        week, company = log["week_no"], log["placement__company__name"]
+        if e.to_status == "submitted":
+            yield _others(company_users[log["placement__company_id"]], e), {
+                "kind": "log_submitted",
+                "text": f"{log['placement__request__student__reg_no']} submitted the weekly log for week {week}.",
+                "url": reverse("company_pending_logs"),
+            }
+        elif e.to_status == "approved_by_company":
+            yield _others([log["placement__request__student__user_id"]], e), {
+                "kind": "log_approved",
+                "text": f"Your weekly log for week {week} was approved by {company}.",
+                "url": reverse("student_logs"),
+            }
+        elif e.to_status == "returned_for_edit":
+            yield _others([log["placement__request__student__user_id"]], e), {
+                "kind": "log_returned",
+                "text": f"Your weekly log for week {week} was returned for edit by {company}.",
+                "url": reverse("student_log_edit", args=[log["id"]]),
+            }
+
+
+REVIEW_QUEUES = {"submitted": "coordinator_queue", "acceptance_uploaded": "coordinator_acceptance_queue"}
+
+
+def _request_messages(events):
+    requests = {
+        row["id"]: row
+        for row in InternshipRequest.objects.filter(id__in={e.entity_id for e in events}).values(
+            "id", "student__user_id", "student__reg_no",
+        )
+    }
+    labels = dict(InternshipRequest.STATUS)
+    coordinators = None
+    for e in events:
+        req = requests.get(e.entity_id)
+        if not req or not e.from_status:
+            continue
+        yield _others([req["student__user_id"]], e), {
+            "kind": "request_status",
+            "text": f"Your internship request is now: {labels.get(e.to_status, e.to_status)}.",
+            "url": reverse("my_request"),
+        }
+        if e.to_status in REVIEW_QUEUES:
+            if coordinators is None:
+                coordinators = _coordinators()
+            yield _others(coordinators, e), {
+                "kind": "request_to_review",
+                "text": f"{req['student__reg_no']}: request {labels[e.to_status].lower()}.",
+                "url": reverse(REVIEW_QUEUES[e.to_status]),
+            }
+
+
+def _report_messages(events):
+    events = [e for e in events if e.to_status == "submitted"]
+    if not events:
+        return
+    reports = SupervisorResultsReport.objects.select_related("supervisor_user").in_bulk({e.entity_id for e in events})
+    coordinators = _coordinators()
+    for e in events:
+        report = reports.get(e.entity_id)
+        if not report:
+            continue
+        yield _others(coordinators, e), {
+            "kind": "report_submitted",
+            "text": f"{report.supervisor_user.display_name} submitted a results report.",
+            "url": reverse("coordinator_results_report_detail", args=[report.id]),
+        }
+
+
+BUILDERS = {
+    WeeklyLog._meta.label_lower: _log_messages,
+    InternshipRequest._meta.label_lower: _request_messages,
+    SupervisorResultsReport._meta.label_lower: _report_messages,
+}
+
+
+def _publish(events):
+    by_entity = defaultdict(list)
+    for e in events:
+        by_entity[e.entity].append(e)
+    for entity, batch in by_entity.items():
+        if entity not in BUILDERS:
+            continue
+        for user_ids, message in BUILDERS[entity](batch):
+            if user_ids:
+                broker().publish(user_ids, message)
+
+
+def publish_events(events):
+    """Notify the people concerned by saved WorkflowEvents, once the transaction commits."""
+    if events and broker().listening():
+        transaction.on_commit(lambda: _publish(events), robust=True)
+
+
+# -------------------------------------------------------------------
+# STREAM
+# -------------------------------------------------------------------
+def _format(message):
+    return f"id: {message['id']}\ndata: {json.dumps(message)}\n\n"
+
+
+async def stream(user_id, last_event_id=None):
+    """text/event-stream chunks for `user_id` until the client goes away (or STREAM_SECONDS pass)."""
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+    sub = broker().subscribe(user_id, last_id)
+    deadline = sub.loop.time() + STREAM_SECONDS
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while sub.loop.time() < deadline:
+            try:
+                message = await asyncio.wait_for(sub.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield _format(message)
+    finally:
+        broker().unsubscribe(sub)
@@ -0,0 +1,218 @@
+# tracking/logbook.py
+#
+# Compiled logbook: every approved weekly log of a placement (with its daily
+# entries) in one paginated PDF.
+# - Each approved week is rendered once with reportlab and kept as a
+#   LogbookWeek, keyed by a fingerprint of exactly what was rendered. Editing
+#   or re-approving a week changes the fingerprint; only that week is redrawn.
+# - compile_logbook() renders a fresh cover (contents with page numbers; a
+#   second pass when the contents run past one page), appends the cached
+#   weeks with pypdf, bookmarks each week and stamps "Page i of N" over the
+#   whole document.
+import hashlib
+import io
+import json
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.db.models import Prefetch
+from django.utils import timezone
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from xml.sax.saxutils import escape
+
+from .models import LogbookWeek, WeeklyLog, WeeklyLogEntry
+
+LAYOUT_VERSION = 1  # bump when render_week() output changes, so cached weeks are redrawn
+SPOOL_MAX = 8 * 1024 * 1024  # compiled logbooks bigger than this go to a temp file
+
+_styles = getSampleStyleSheet()
+
+
+def _p(text, style="BodyText"):
+    return Paragraph(escape(text or "").replace("\n", "<br/>"), _styles[style])
+
+
+def _date(d):
+    return d.strftime("%d %b %Y") if d else "-"
+
+
+# -------------------------------------------------------------------
+# ONE WEEK
+# -------------------------------------------------------------------
+def week_context(log):
+    """Everything render_week() draws, as plain data (its hash is the cache key)."""
+    approver = log.company_action_by
+    return {
+        "layout": LAYOUT_VERSION,
+        "week_no": log.week_no,
+        "from_date": _date(log.from_date),
+        "to_date": _date(log.to_date),
+        "activities": log.activities,
+        "challenges": log.challenges,
+        "lessons": log.lessons,
+        "entries": [
+            [e.get_day_display(), e.work_assignment, e.activities_steps]
+            for e in log.entries.all()
+        ],
+        "approved_by": approver.display_name if approver else "",
+        "approved_at": _date(log.company_action_at),
+    }
+
+
+def fingerprint(ctx):
+    return hashlib.sha256(json.dumps(ctx, sort_keys=True).encode()).hexdigest()
+
+
+def render_week(ctx):
+    """(PDF bytes, page count) for one week."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4,
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2.2 * cm,
+    )
+    story = [
+        _p(f"Week {ctx['week_no']}: {ctx['from_date']} – {ctx['to_date']}", "Heading2"),
+        _p(f"Approved by {ctx['approved_by'] or 'industry supervisor'} on {ctx['approved_at']}", "Italic"),
+        Spacer(1, 0.3 * cm),
+    ]
+    if ctx["entries"]:
+        table = Table(
+            [[_p("Day", "Heading6"), _p("Work assignment", "Heading6"), _p("Activities / steps", "Heading6")]]
+            + [[_p(day), _p(work), _p(steps)] for day, work, steps in ctx["entries"]],
+            colWidths=[2.4 * cm, 6.3 * cm, 8.3 * cm],
+            repeatRows=1,
+        )
+        table.setStyle(TableStyle([
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]))
+        story += [table, Spacer(1, 0.4 * cm)]
+
+    for title, key in (("Summary of activities", "activities"), ("Challenges", "challenges"), ("Lessons learnt", "lessons")):
+        if ctx[key]:
+            story += [_p(title, "Heading4"), _p(ctx[key]), Spacer(1, 0.2 * cm)]
+
+    doc.build(story)
+    return buffer.getvalue(), doc.page
+
+
+def cached_week(log):
+    """The LogbookWeek for an approved log, rendering it only if its content changed."""
+    ctx = week_context(log)
+    key = fingerprint(ctx)
+    cached = getattr(log, "logbook_week", None)
+    if cached and cached.fingerprint == key:
+        return cached
+
+    pdf, pages = render_week(ctx)
+    cached = cached or LogbookWeek(weekly_log=log)
+    cached.fingerprint = key
+    cached.page_count = pages
+    cached.pdf.save(f"week_{log.week_no}.pdf", ContentFile(pdf), save=False)
+    cached.save()
+    log.logbook_week = cached
+    return cached
+
+
+# -------------------------------------------------------------------
+# WHOLE LOGBOOK
+# -------------------------------------------------------------------
+def approved_logs(placement):
+    return (
+        WeeklyLog.objects
+        .filter(placement=placement, status="approved_by_company")
+        .select_related("company_action_by", "logbook_week")
+        .prefetch_related(Prefetch("entries", queryset=WeeklyLogEntry.objects.order_by("id")))
+        .order_by("week_no")
+    )
+
+
+def _cover(placement, weeks, first_page):
+    """(PDF bytes, page count) of the cover and contents; weeks start at `first_page`."""
+    student = placement.request.student
+    staff = placement.university_supervisor
+    contact = placement.industry_supervisor
+    page = first_page
+    rows = [["Week", "Dates", "Page"]]
+    for log, cached in weeks:
+        rows.append([str(log.week_no), f"{_date(log.from_date)} – {_date(log.to_date)}", str(page)])
+        page += cached.page_count
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2.5 * cm)
+    table = Table(rows, colWidths=[2 * cm, 10 * cm, 2 * cm])
+    table.setStyle(TableStyle([
+        ("LINEBELOW", (0, 0), (-1, 0), 0.8, colors.black),
+        ("ALIGN", (2, 0), (2, -1), "RIGHT"),
+    ]))
+    doc.build([
+        _p("Internship Logbook", "Title"),
+        _p(f"{student.user.display_name} ({student.reg_no})", "Heading2"),
+        _p(f"Company: {placement.company.name}"),
+        _p(f"Placement: {_date(placement.start_date)} – {_date(placement.end_date)}"),
+        _p(f"Industry supervisor: {contact.name if contact else '-'}"),
+        _p(f"University supervisor: {staff.user.display_name if staff else '-'}"),
+        _p(f"Compiled: {timezone.localtime().strftime('%d %b %Y %H:%M')}"),
+        Spacer(1, 0.8 * cm),
+        _p("Contents", "Heading3"),
+        table if weeks else _p("No approved weekly logs yet."),
+    ])
+    return buffer.getvalue(), doc.page
+
+
+def render_cover(placement, weeks):
+    """
+    The cover PDF. A long contents list runs over several pages, so the cover
+    is built once to count its pages and again if the week numbers moved.
+    """
+    pages = 1
+    while True:
+        pdf, built = _cover(placement, weeks, pages + 1)
+        if built == pages:
+            return pdf
+        pages = built
+
+
+def _page_numbers(total, footer):
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, _ = A4
+    for i in range(1, total + 1):
+        c.setFont("Helvetica", 8)
+        c.drawString(2 * cm, 1.2 * cm, footer)
+        c.drawRightString(width - 2 * cm, 1.2 * cm, f"Page {i} of {total}")
+        c.showPage()
+    c.save()
+    buffer.seek(0)
+    return PdfReader(buffer)
+
+
+def compile_logbook(placement):
+    """
+    An open temp file with the compiled PDF, positioned at 0. Only weeks that
+    are new or changed since the last compile are rendered.
+    """
+    weeks = [(log, cached_week(log)) for log in approved_logs(placement).iterator(chunk_size=100)]
+
+    writer = PdfWriter()
+    writer.append(PdfReader(io.BytesIO(render_cover(placement, weeks))), outline_item="Cover")
+    for log, cached in weeks:
+        with cached.pdf.open("rb") as f:
+            writer.append(PdfReader(io.BytesIO(f.read())), outline_item=f"Week {log.week_no}")
+
+    student = placement.request.student
+    stamps = _page_numbers(len(writer.pages), f"{student.reg_no} — {placement.company.name}")
+    for page, stamp in zip(writer.pages, stamps.pages):
+        page.merge_page(stamp)
+
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX)
+    writer.write(out)
+    out.seek(0)
+    return out
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from placements.models import InternshipPeriod
+from tracking.archive import DEFAULT_BATCH_SIZE, ArchiveError, archive_period
+
+
+class Command(BaseCommand):
+    help = "Move completed/terminated placements of closed periods (with their logs and evaluations) into the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period", type=int, action="append", dest="periods", help="Archive only this period id (repeatable).")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many placements would be archived.")
+
+    def handle(self, *args, **options):
+        periods = InternshipPeriod.objects.closed()
+        if options["periods"]:
+            periods = InternshipPeriod.objects.filter(id__in=options["periods"])
+
+        total = 0
+        for period in periods.order_by("start_date"):
+            try:
+                n = archive_period(period, batch_size=options["batch_size"], dry_run=options["dry_run"])
+            except ArchiveError as e:
+                raise CommandError(str(e))
+            total += n
+            self.stdout.write(f"{period}: {n}")
+
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb}: {total} placements"))
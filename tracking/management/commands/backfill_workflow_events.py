@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+
+from placements.models import InternshipRequest, Placement
+from tracking.events import BATCH_SIZE, event, record_many
+from tracking.models import WeeklyLog, WorkflowEvent
+
+REQUEST_STEPS = [
+    ("submitted", "submitted_at"),
+    ("recommended", "recommendation_issued_at"),
+    ("acceptance_uploaded", "acceptance_uploaded_at"),
+    ("acceptance_verified", "acceptance_verified_at"),
+]
+
+
+def _request_events(req):
+    steps = [(status, getattr(req, attr)) for status, attr in REQUEST_STEPS if getattr(req, attr)]
+    if req.status not in [s for s, _ in steps] and req.reviewed_at and req.status != "draft":
+        steps.append((req.status, req.reviewed_at))  # e.g. rejected / under review
+    before = ""
+    for status, at in sorted(steps, key=lambda s: s[1]):
+        actor = req.student.user_id if status in ("submitted", "acceptance_uploaded") else req.reviewed_by_id
+        yield event(InternshipRequest, req.id, before, status, actor, req.period_id, at)
+        before = status
+
+
+def _log_events(log):
+    period_id = log.placement.request.period_id
+    if log.submitted_at:
+        yield event(WeeklyLog, log.id, "", "submitted", log.placement.request.student.user_id, period_id, log.submitted_at)
+    if log.company_action_at and log.status in ("approved_by_company", "returned_for_edit"):
+        before = "submitted" if log.submitted_at else ""
+        yield event(WeeklyLog, log.id, before, log.status, log.company_action_by_id, period_id, log.company_action_at)
+
+
+def _placement_events(p):
+    yield event(Placement, p.id, "", p.status, None, p.request.period_id, p.created_at)
+
+
+class Command(BaseCommand):
+    help = "Seed the workflow event table from the timestamps of rows that have no recorded history yet."
+
+    def handle(self, *args, **options):
+        sources = [
+            (InternshipRequest, InternshipRequest.objects.select_related("student"), _request_events),
+            (WeeklyLog, WeeklyLog.objects.select_related("placement__request__student"), _log_events),
+            (Placement, Placement.objects.select_related("request"), _placement_events),
+        ]
+        for model, qs, events_for in sources:
+            seen = set(
+                WorkflowEvent.objects.filter(entity=model._meta.label_lower)
+                .values_list("entity_id", flat=True).distinct().iterator()
+            )
+            batch, total = [], 0
+            for obj in qs.order_by("id").iterator(chunk_size=BATCH_SIZE):
+                if obj.id in seen:
+                    continue
+                batch.extend(events_for(obj))
+                if len(batch) >= BATCH_SIZE:
+                    total += len(record_many(batch, notify=False))
+                    batch = []
+            total += len(record_many(batch, notify=False))
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {total} events")
+        self.stdout.write(self.style.SUCCESS("Done."))
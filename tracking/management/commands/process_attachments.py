@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from tracking.attachments import process_attachment
+from tracking.models import SiteVisit, WeeklyLog
+
+
+class Command(BaseCommand):
+    help = "Compress and thumbnail log/site-visit attachments uploaded before this was automatic."
+
+    def handle(self, *args, **options):
+        for model in (WeeklyLog, SiteVisit):
+            pks = list(
+                model.objects.exclude(attachment="").exclude(attachment__isnull=True)
+                .filter(attachment_thumbnail="").values_list("pk", flat=True)
+            )
+            for pk in pks:
+                process_attachment(model, pk)
+            self.stdout.write(self.style.SUCCESS(f"{model._meta.verbose_name_plural}: {len(pks)} processed"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from placements.models import InternshipPeriod
+from tracking.snapshots import can_snapshot, take_snapshot
+
+
+class Command(BaseCommand):
+    help = "Freeze counts and score distributions of closed internship periods into PeriodSnapshot tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period", type=int, action="append", dest="periods",
+                            help="Snapshot this period id (repeatable), even if it is not closed yet.")
+        parser.add_argument("--force", action="store_true", help="Rebuild snapshots that already exist.")
+
+    def handle(self, *args, **options):
+        if options["periods"]:
+            periods = InternshipPeriod.objects.filter(id__in=options["periods"])
+            missing = set(options["periods"]) - set(periods.values_list("id", flat=True))
+            if missing:
+                raise CommandError(f"Unknown period id(s): {', '.join(map(str, sorted(missing)))}")
+        else:
+            periods = InternshipPeriod.objects.closed()
+
+        if not options["force"]:
+            periods = periods.filter(snapshot__isnull=True)
+
+        taken = 0
+        for period in periods.order_by("start_date"):
+            if not can_snapshot(period):
+                self.stderr.write(f"{period}: archived, keeping its existing snapshot")
+                continue
+            snapshot = take_snapshot(period)
+            taken += 1
+            self.stdout.write(f"{period}: {snapshot.placements_total} placements, {snapshot.groups.count()} groups")
+
+        self.stdout.write(self.style.SUCCESS(f"Snapshots taken: {taken}"))
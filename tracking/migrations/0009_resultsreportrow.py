@@ -0,0 +1,81 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+ROW_FIELDS = ("reg_no", "name", "company", "industry_100", "academic_100", "average_100")
+
+
+def copy_json_rows(apps, schema_editor):
+    SupervisorResultsReport = apps.get_model("tracking", "SupervisorResultsReport")
+    ResultsReportRow = apps.get_model("tracking", "ResultsReportRow")
+    Placement = apps.get_model("placements", "Placement")
+
+    existing = set(Placement.objects.values_list("id", flat=True))
+    batch = []
+    for report_id, rows in SupervisorResultsReport.objects.values_list("id", "rows").iterator():
+        seen = set()
+        for r in rows or []:
+            placement_id = r.get("placement_id")
+            if placement_id not in existing or placement_id in seen:
+                placement_id = None
+            seen.add(placement_id)
+            batch.append(ResultsReportRow(
+                report_id=report_id,
+                placement_id=placement_id,
+                **{f: r.get(f) if f.endswith("_100") else str(r.get(f) or "") for f in ROW_FIELDS},
+            ))
+        if len(batch) >= 1000:
+            ResultsReportRow.objects.bulk_create(batch)
+            batch = []
+    ResultsReportRow.objects.bulk_create(batch)
+
+
+def copy_rows_back(apps, schema_editor):
+    # runs after the reversed RemoveField has brought `rows` back (as an empty list)
+    SupervisorResultsReport = apps.get_model("tracking", "SupervisorResultsReport")
+    ResultsReportRow = apps.get_model("tracking", "ResultsReportRow")
+
+    rows = {}
+    for values in ResultsReportRow.objects.order_by("report_id", "reg_no", "id").values("report_id", "placement_id", *ROW_FIELDS).iterator():
+        rows.setdefault(values.pop("report_id"), []).append(values)
+
+    reports = list(SupervisorResultsReport.objects.filter(id__in=rows))
+    for report in reports:
+        report.rows = rows[report.id]
+    SupervisorResultsReport.objects.bulk_update(reports, ["rows"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0003_internshiprequest_coordinator_comment_and_more'),
+        ('tracking', '0008_studentevaluation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultsReportRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reg_no', models.CharField(db_index=True, max_length=50)),
+                ('name', models.CharField(blank=True, max_length=200)),
+                ('company', models.CharField(blank=True, max_length=200)),
+                ('industry_100', models.FloatField(blank=True, null=True)),
+                ('academic_100', models.FloatField(blank=True, null=True)),
+                ('average_100', models.FloatField(blank=True, db_index=True, null=True)),
+                ('placement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='results_rows', to='placements.placement')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='result_rows', to='tracking.supervisorresultsreport')),
+            ],
+            options={
+                'ordering': ['reg_no'],
+                'constraints': [models.UniqueConstraint(fields=('report', 'placement'), name='uniq_results_row_per_placement')],
+            },
+        ),
+        migrations.RunPython(copy_json_rows, copy_rows_back),
+        migrations.RemoveField(
+            model_name='supervisorresultsreport',
+            name='rows',
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0004_internshiprequest_period_status_index'),
+        ('tracking', '0009_resultsreportrow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('requests_total', models.PositiveIntegerField(default=0)),
+                ('requests_rejected', models.PositiveIntegerField(default=0)),
+                ('placements_total', models.PositiveIntegerField(default=0)),
+                ('placements_completed', models.PositiveIntegerField(default=0)),
+                ('placements_terminated', models.PositiveIntegerField(default=0)),
+                ('companies_used', models.PositiveIntegerField(default=0)),
+                ('logs_total', models.PositiveIntegerField(default=0)),
+                ('logs_approved', models.PositiveIntegerField(default=0)),
+                ('industry_evaluations', models.PositiveIntegerField(default=0)),
+                ('academic_evaluations', models.PositiveIntegerField(default=0)),
+                ('student_evaluations', models.PositiveIntegerField(default=0)),
+                ('period', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='placements.internshipperiod')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PeriodSnapshotGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=20)),
+                ('label', models.CharField(max_length=255)),
+                ('students', models.PositiveIntegerField(default=0)),
+                ('evaluated', models.PositiveIntegerField(default=0)),
+                ('below_pass', models.PositiveIntegerField(default=0)),
+                ('industry_mean', models.FloatField(blank=True, null=True)),
+                ('academic_mean', models.FloatField(blank=True, null=True)),
+                ('mean', models.FloatField(blank=True, null=True)),
+                ('median', models.FloatField(blank=True, null=True)),
+                ('p25', models.FloatField(blank=True, null=True)),
+                ('p75', models.FloatField(blank=True, null=True)),
+                ('p90', models.FloatField(blank=True, null=True)),
+                ('min_score', models.FloatField(blank=True, null=True)),
+                ('max_score', models.FloatField(blank=True, null=True)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='groups', to='tracking.periodsnapshot')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['snapshot', 'dimension'], name='tracking_pe_snapsho_75b114_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:33
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_studentprofile_district_studentprofile_program'),
+        ('companies', '0002_company_intern_capacity'),
+        ('placements', '0004_internshiprequest_period_status_index'),
+        ('tracking', '0010_periodsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPlacement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.PositiveIntegerField(unique=True)),
+                ('reg_no', models.CharField(max_length=50)),
+                ('student_name', models.CharField(blank=True, max_length=255)),
+                ('company_name', models.CharField(blank=True, max_length=200)),
+                ('university_supervisor_name', models.CharField(blank=True, max_length=255)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('status', models.CharField(max_length=30)),
+                ('industry_100', models.FloatField(blank=True, null=True)),
+                ('academic_100', models.FloatField(blank=True, null=True)),
+                ('average_100', models.FloatField(blank=True, null=True)),
+                ('logs_total', models.PositiveIntegerField(default=0)),
+                ('logs_approved', models.PositiveIntegerField(default=0)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='companies.company')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_placements', to='placements.internshipperiod')),
+                ('request', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='placements.internshiprequest')),
+                ('student', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_placements', to='accounts.studentprofile')),
+            ],
+            options={
+                'ordering': ['-start_date', 'reg_no'],
+                'indexes': [models.Index(fields=['period', 'reg_no'], name='tracking_ar_period__5adc25_idx'), models.Index(fields=['reg_no'], name='tracking_ar_reg_no_fb15b8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0011_archivedplacement'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sitevisit',
+            name='attachment',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='tracking/site_visits/'),
+        ),
+        migrations.AlterField(
+            model_name='weeklylog',
+            name='attachment',
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to='tracking/weekly_logs/'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0012_stored_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitevisit',
+            name='attachment_thumbnail',
+            field=models.FileField(blank=True, max_length=255, upload_to='tracking/thumbnails/'),
+        ),
+        migrations.AddField(
+            model_name='weeklylog',
+            name='attachment_thumbnail',
+            field=models.FileField(blank=True, max_length=255, upload_to='tracking/thumbnails/'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0013_attachment_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogbookWeek',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('pdf', models.FileField(max_length=255, upload_to='tracking/logbooks/')),
+                ('page_count', models.PositiveIntegerField()),
+                ('rendered_at', models.DateTimeField(auto_now=True)),
+                ('weekly_log', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='logbook_week', to='tracking.weeklylog')),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0006_stored_blobs'),
+        ('tracking', '0014_logbook_weeks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=60)),
+                ('entity_id', models.PositiveBigIntegerField()),
+                ('from_status', models.CharField(blank=True, max_length=40)),
+                ('to_status', models.CharField(max_length=40)),
+                ('at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('period', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='placements.internshipperiod')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['entity', 'entity_id', 'at'], name='tracking_wo_entity_df93c1_idx'), models.Index(fields=['entity', 'to_status', 'at'], name='tracking_wo_entity_deb391_idx'), models.Index(fields=['period', 'entity', 'to_status'], name='tracking_wo_period__3b51f4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0015_workflow_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicevaluation',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='industryevaluation',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='weeklylog',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0016_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentevaluation',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,10 +1,60 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.utils import timezone
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
 
-from placements.models import Placement
+from placements.models import Placement, PeriodScopedQuerySet
+
+from .concurrency import save_bumped
+
+MAX_RATING = 5  # every scored item of an evaluation is rated 1-5
+
+
+def score_out_of_100(values, max_marks) -> float:
+    """Sum of the ratings in `values` (unset counts as 0) as a score out of 100."""
+    return sum(int(v or 0) for v in values) / max_marks * 100 if max_marks else 0.0
+
+
+class WeeklyLogQuerySet(PeriodScopedQuerySet):
+    period_lookup = "placement__request__period"
+
+    # Bulk counterparts of WeeklyLog.approve / return_for_edit: one UPDATE for the whole set.
+    # Both return the ids of the logs that moved.
+    def approve(self, user):
+        return self._transition(
+            status="approved_by_company",
+            company_action_by=user,
+            company_action_at=timezone.now(),
+            return_reason="",
+        )
+
+    def return_for_edit(self, user, reason: str):
+        return self._transition(
+            status="returned_for_edit",
+            company_action_by=user,
+            company_action_at=timezone.now(),
+            return_reason=reason or "Please revise and resubmit.",
+        )
+
+    def _transition(self, **changes):
+        # update() skips save signals, so the workflow events are written here (tracking/events.py)
+        from .events import event, record_many
+
+        with transaction.atomic():
+            rows = list(self.select_for_update(of=("self",)).values_list("id", "status", "placement__request__period_id"))
+            # moving the version on makes pages opened before this stale (tracking/concurrency.py)
+            self.filter(id__in=[r[0] for r in rows]).update(**changes, version=F("version") + 1)
+            actor = changes["company_action_by"]
+            record_many(
+                event(self.model, pk, before, changes["status"], actor.pk if actor else None, period_id, changes["company_action_at"])
+                for pk, before, period_id in rows
+                if before != changes["status"]
+            )
+        return [pk for pk, _, _ in rows]
+
 
 class WeeklyLog(models.Model):
     STATUS = [
@@ -24,7 +74,8 @@ class WeeklyLog(models.Model):
     challenges = models.TextField(blank=True)
     lessons = models.TextField(blank=True)
 
-    attachment = models.FileField(upload_to="tracking/weekly_logs/", null=True, blank=True)
+    attachment = models.FileField(upload_to="tracking/weekly_logs/", max_length=255, null=True, blank=True)
+    attachment_thumbnail = models.FileField(upload_to="tracking/thumbnails/", max_length=255, blank=True)  # see tracking/attachments.py
 
     status = models.CharField(max_length=20, choices=STATUS, default="draft")
 
@@ -40,29 +91,34 @@ class WeeklyLog(models.Model):
     return_reason = models.TextField(blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    version = models.PositiveIntegerField(default=0, editable=False)  # optimistic locking, see tracking/concurrency.py
+
+    objects = WeeklyLogQuerySet.as_manager()
 
     class Meta:
         unique_together = [("placement", "week_no")]
         ordering = ["-from_date"]
 
+    ACTION_FIELDS = ["status", "company_action_by", "company_action_at", "return_reason"]
+
     def submit(self):
         self.status = "submitted"
         self.submitted_at = timezone.now()
-        self.save()
+        save_bumped(self, ["status", "submitted_at"])
 
     def approve(self, user):
         self.status = "approved_by_company"
         self.company_action_by = user
         self.company_action_at = timezone.now()
         self.return_reason = ""
-        self.save()
+        save_bumped(self, self.ACTION_FIELDS)
 
     def return_for_edit(self, user, reason: str):
         self.status = "returned_for_edit"
         self.company_action_by = user
         self.company_action_at = timezone.now()
         self.return_reason = reason or "Please revise and resubmit."
-        self.save()
+        save_bumped(self, self.ACTION_FIELDS)
 
     def __str__(self):
         return f"{self.placement} - Week {self.week_no} ({self.status})"
@@ -96,6 +152,18 @@ class WeeklyLogEntry(models.Model):
 
 
 
+class LogbookWeek(models.Model):
+    """An approved week rendered for the compiled logbook (see tracking/logbook.py); reused while `fingerprint` matches."""
+    weekly_log = models.OneToOneField(WeeklyLog, on_delete=models.CASCADE, related_name="logbook_week")
+    fingerprint = models.CharField(max_length=64)  # sha256 of what was rendered
+    pdf = models.FileField(upload_to="tracking/logbooks/", max_length=255)
+    page_count = models.PositiveIntegerField()
+    rendered_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Logbook page(s) for {self.weekly_log}"
+
+
 class SiteVisit(models.Model):
     placement = models.ForeignKey("placements.Placement", on_delete=models.CASCADE, related_name="site_visits")
     supervisor = models.ForeignKey("accounts.StaffProfile", on_delete=models.PROTECT)
@@ -103,7 +171,8 @@ class SiteVisit(models.Model):
     visit_date = models.DateField()
     findings = models.TextField()
     recommendations = models.TextField(blank=True)
-    attachment = models.FileField(upload_to="tracking/site_visits/", null=True, blank=True)
+    attachment = models.FileField(upload_to="tracking/site_visits/", max_length=255, null=True, blank=True)
+    attachment_thumbnail = models.FileField(upload_to="tracking/thumbnails/", max_length=255, blank=True)  # see tracking/attachments.py
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -190,6 +259,7 @@ class IndustryEvaluation(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=0, editable=False)  # optimistic locking, see tracking/concurrency.py
 
     class Meta:
         ordering = ["-updated_at"]
@@ -199,7 +269,7 @@ class IndustryEvaluation(models.Model):
         self.submitted_at = timezone.now()
         if user:
             self.supervisor_user = user
-        self.save()
+        save_bumped(self, ["status", "submitted_at", "supervisor_user"])
 
     def __str__(self):
         return f"Evaluation: {self.placement} ({self.status})"
@@ -221,23 +291,21 @@ class IndustryEvaluation(models.Model):
         "work_productivity",
     ]
 
+    @classmethod
+    def marks_available(cls) -> int:
+        return len(cls.SCORE_FIELDS) * MAX_RATING  # 65
+
     @property
     def total_marks(self) -> int:
-        total = 0
-        for f in self.SCORE_FIELDS:
-            v = getattr(self, f, 0) or 0
-            total += int(v)
-        return total
+        return sum(int(getattr(self, f, 0) or 0) for f in self.SCORE_FIELDS)
 
     @property
     def max_marks(self) -> int:
-        return len(self.SCORE_FIELDS) * 5  # 65
+        return self.marks_available()
 
     @property
     def score_out_of_100(self) -> float:
-        if self.max_marks == 0:
-            return 0.0
-        return (self.total_marks / self.max_marks) * 100
+        return score_out_of_100([getattr(self, f) for f in self.SCORE_FIELDS], self.max_marks)
 
     @property
     def score_out_of_10(self) -> float:
@@ -280,6 +348,7 @@ class AcademicEvaluation(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=0, editable=False)  # optimistic locking, see tracking/concurrency.py
 
     SCORE_FIELDS = [
         "understanding_of_internship",
@@ -289,17 +358,21 @@ class AcademicEvaluation(models.Model):
         "general_presentation",
     ]
 
+    @classmethod
+    def marks_available(cls) -> int:
+        return len(cls.SCORE_FIELDS) * MAX_RATING  # 25
+
     @property
     def total_marks(self) -> int:
         return sum(int(getattr(self, f, 0) or 0) for f in self.SCORE_FIELDS)
 
     @property
     def max_marks(self) -> int:
-        return len(self.SCORE_FIELDS) * 5  # 25
+        return self.marks_available()
 
     @property
     def score_out_of_100(self) -> float:
-        return (self.total_marks / self.max_marks) * 100 if self.max_marks else 0.0
+        return score_out_of_100([getattr(self, f) for f in self.SCORE_FIELDS], self.max_marks)
 
     @property
     def score_out_of_10(self) -> float:
@@ -310,7 +383,7 @@ class AcademicEvaluation(models.Model):
         self.submitted_at = timezone.now()
         if user:
             self.supervisor_user = user
-        self.save()
+        save_bumped(self, ["status", "submitted_at", "supervisor_user"])
 
 
 class SupervisorResultsReport(models.Model):
@@ -320,7 +393,6 @@ class SupervisorResultsReport(models.Model):
     )
 
     supervisor_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    rows = models.JSONField(default=list, blank=True)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="draft")
     submitted_at = models.DateTimeField(null=True, blank=True)
@@ -333,6 +405,43 @@ class SupervisorResultsReport(models.Model):
         self.submitted_at = timezone.now()
         self.save(update_fields=["status", "submitted_at", "updated_at"])
 
+    @property
+    def rows(self):
+        # same list-of-dicts shape the report templates/PDF always used
+        return list(self.result_rows.order_by("reg_no", "id").values(*ResultsReportRow.ROW_FIELDS))
+
+    def replace_rows(self, rows):
+        """Replace this report's rows with `rows` (dicts in the ROW_FIELDS shape) in one bulk insert."""
+        self.result_rows.all().delete()
+        ResultsReportRow.objects.bulk_create([
+            ResultsReportRow(report=self, **{f: r.get(f) for f in ResultsReportRow.ROW_FIELDS})
+            for r in rows
+        ])
+
+
+class ResultsReportRow(models.Model):
+    ROW_FIELDS = ("placement_id", "reg_no", "name", "company", "industry_100", "academic_100", "average_100")
+
+    report = models.ForeignKey(SupervisorResultsReport, on_delete=models.CASCADE, related_name="result_rows")
+    placement = models.ForeignKey(Placement, on_delete=models.SET_NULL, null=True, blank=True, related_name="results_rows")
+
+    reg_no = models.CharField(max_length=50, db_index=True)
+    name = models.CharField(max_length=200, blank=True)
+    company = models.CharField(max_length=200, blank=True)
+
+    industry_100 = models.FloatField(null=True, blank=True)
+    academic_100 = models.FloatField(null=True, blank=True)
+    average_100 = models.FloatField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        ordering = ["reg_no"]
+        constraints = [
+            models.UniqueConstraint(fields=["report", "placement"], name="uniq_results_row_per_placement"),
+        ]
+
+    def __str__(self):
+        return f"{self.reg_no} — {self.average_100}"
+
 
 
 class StudentEvaluation(models.Model):
@@ -372,11 +481,139 @@ class StudentEvaluation(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=0, editable=False)  # optimistic locking, see tracking/concurrency.py
 
     def submit(self):
         self.status = "submitted"
         self.submitted_at = timezone.now()
-        self.save(update_fields=["status", "submitted_at", "updated_at"])
+        save_bumped(self, ["status", "submitted_at"])
 
     def __str__(self):
         return f"StudentEvaluation({self.placement_id}, {self.student_user})"
+
+
+# -------------------------------------------------------------------
+# END-OF-PERIOD SNAPSHOTS (see tracking/snapshots.py)
+# -------------------------------------------------------------------
+class PeriodSnapshot(models.Model):
+    period = models.OneToOneField("placements.InternshipPeriod", on_delete=models.CASCADE, related_name="snapshot")
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    requests_total = models.PositiveIntegerField(default=0)
+    requests_rejected = models.PositiveIntegerField(default=0)
+    placements_total = models.PositiveIntegerField(default=0)
+    placements_completed = models.PositiveIntegerField(default=0)
+    placements_terminated = models.PositiveIntegerField(default=0)
+    companies_used = models.PositiveIntegerField(default=0)
+
+    logs_total = models.PositiveIntegerField(default=0)
+    logs_approved = models.PositiveIntegerField(default=0)
+
+    industry_evaluations = models.PositiveIntegerField(default=0)
+    academic_evaluations = models.PositiveIntegerField(default=0)
+    student_evaluations = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Snapshot: {self.period} ({self.taken_at:%Y-%m-%d})"
+
+
+class PeriodSnapshotGroup(models.Model):
+    # one score distribution: the whole cohort ("overall") or one program/company/...
+    snapshot = models.ForeignKey(PeriodSnapshot, on_delete=models.CASCADE, related_name="groups")
+    dimension = models.CharField(max_length=20)
+    label = models.CharField(max_length=255)
+
+    students = models.PositiveIntegerField(default=0)
+    evaluated = models.PositiveIntegerField(default=0)
+    below_pass = models.PositiveIntegerField(default=0)
+
+    industry_mean = models.FloatField(null=True, blank=True)
+    academic_mean = models.FloatField(null=True, blank=True)
+    mean = models.FloatField(null=True, blank=True)
+    median = models.FloatField(null=True, blank=True)
+    p25 = models.FloatField(null=True, blank=True)
+    p75 = models.FloatField(null=True, blank=True)
+    p90 = models.FloatField(null=True, blank=True)
+    min_score = models.FloatField(null=True, blank=True)
+    max_score = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["snapshot", "dimension"])]
+
+    def __str__(self):
+        return f"{self.dimension}: {self.label}"
+
+
+# -------------------------------------------------------------------
+# ARCHIVE: closed placements moved out of the live tables (see tracking/archive.py)
+# -------------------------------------------------------------------
+class ArchivedPlacement(models.Model):
+    period = models.ForeignKey("placements.InternshipPeriod", on_delete=models.PROTECT, related_name="archived_placements")
+    original_id = models.PositiveIntegerField(unique=True)  # Placement.id before archiving
+    request = models.ForeignKey("placements.InternshipRequest", on_delete=models.SET_NULL, null=True, blank=True)
+
+    student = models.ForeignKey("accounts.StudentProfile", on_delete=models.SET_NULL, null=True, blank=True, related_name="archived_placements")
+    reg_no = models.CharField(max_length=50)
+    student_name = models.CharField(max_length=255, blank=True)
+
+    company = models.ForeignKey("companies.Company", on_delete=models.SET_NULL, null=True, blank=True)
+    company_name = models.CharField(max_length=200, blank=True)
+    university_supervisor_name = models.CharField(max_length=255, blank=True)
+
+    start_date = models.DateField()
+    end_date = models.DateField()
+    status = models.CharField(max_length=30)
+
+    industry_100 = models.FloatField(null=True, blank=True)
+    academic_100 = models.FloatField(null=True, blank=True)
+    average_100 = models.FloatField(null=True, blank=True)
+    logs_total = models.PositiveIntegerField(default=0)
+    logs_approved = models.PositiveIntegerField(default=0)
+
+    # weekly logs (+ entries), site visits and the three evaluations, as they were
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-start_date", "reg_no"]
+        indexes = [models.Index(fields=["period", "reg_no"]), models.Index(fields=["reg_no"])]
+
+    def __str__(self):
+        return f"{self.reg_no} @ {self.company_name} (archived)"
+
+
+# -------------------------------------------------------------------
+# WORKFLOW EVENTS: append-only status history (see tracking/events.py)
+# -------------------------------------------------------------------
+class WorkflowEventQuerySet(models.QuerySet):
+    def for_entity(self, obj):
+        return self.filter(entity=obj._meta.label_lower, entity_id=obj.pk).order_by("at", "id")
+
+
+class WorkflowEvent(models.Model):
+    entity = models.CharField(max_length=60)  # model label, e.g. "tracking.weeklylog"
+    entity_id = models.PositiveBigIntegerField()
+    from_status = models.CharField(max_length=40, blank=True)  # "" when the row was created
+    to_status = models.CharField(max_length=40)
+    actor = models.ForeignKey("accounts.User", null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    period = models.ForeignKey("placements.InternshipPeriod", null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    at = models.DateTimeField(default=timezone.now)
+
+    objects = WorkflowEventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["entity", "entity_id", "at"]),     # per-entity history
+            models.Index(fields=["entity", "to_status", "at"]),     # throughput / durations
+            models.Index(fields=["period", "entity", "to_status"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Workflow events are append-only.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.entity}#{self.entity_id}: {self.from_status or '-'} -> {self.to_status}"
@@ -0,0 +1,40 @@
+import threading
+
+from django.core.mail import send_mass_mail
+
+
+def notify_students_of_log_action(logs, action, reason=""):
+    """
+    Email every student whose weekly log was approved/returned in one batch.
+    `logs` is an iterable of (week_no, student_email, company_name) tuples.
+    """
+    messages = []
+    for week_no, email, company_name in logs:
+        if not email:
+            continue
+
+        if action == "approve":
+            subject = f"Weekly log approved (Week {week_no})"
+            message = (
+                f"Hello {email},\n\n"
+                f"Your weekly internship log for Week {week_no} has been approved by {company_name}.\n\n"
+                f"Thank you."
+            )
+        else:
+            subject = f"Weekly log returned for edit (Week {week_no})"
+            message = (
+                f"Hello {email},\n\n"
+                f"Your weekly internship log for Week {week_no} was returned by {company_name}.\n"
+                f"Reason: {reason or 'Please revise and resubmit.'}\n\n"
+                f"Please log in, correct the log and resubmit.\n"
+                f"Thank you."
+            )
+
+        messages.append((subject, message, None, [email]))
+
+    if messages:
+        # SMTP round-trips shouldn't hold the request (or its worker) open
+        threading.Thread(
+            target=send_mass_mail, args=(messages,), kwargs={"fail_silently": True}, daemon=True,
+        ).start()
+    return len(messages)
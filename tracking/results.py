@@ -0,0 +1,122 @@
+# tracking/results.py
+#
+# University supervisor results report, kept up to date incrementally.
+# Each supervisor has (at most) one DRAFT SupervisorResultsReport. It is built in
+# full once, when it is first needed; after that, every submitted Industry or
+# Academic evaluation upserts just its own placement's ResultsReportRow.
+# Which students the draft covers changes outside those paths (supervisors
+# allocated or reassigned, placements completed or terminated, often through
+# bulk updates that send no signals), so each time the draft is fetched its
+# rows are reconciled against the supervisor's current placements: two id
+# queries, and rows built only for the students who are missing.
+# Submitting the report is then only a status flip.
+from django.db import transaction
+
+from placements.models import Placement
+
+from .models import IndustryEvaluation, AcademicEvaluation, SupervisorResultsReport, ResultsReportRow
+
+
+CLOSED_STATUSES = ["completed", "terminated"]
+
+
+def supervisor_placements(staff):
+    return (
+        Placement.objects
+        .filter(university_supervisor=staff)
+        .exclude(status__in=CLOSED_STATUSES)
+        .select_related("company", "request", "request__student", "request__student__user")
+        .order_by("request__student__reg_no")
+    )
+
+
+def build_row(placement, ind, ac):
+    ind100 = float(ind.score_out_of_100) if ind else None
+    ac100 = float(ac.score_out_of_100) if ac else None
+    avg100 = (ind100 + ac100) / 2.0 if (ind100 is not None and ac100 is not None) else None
+
+    return {
+        "placement_id": placement.id,
+        "reg_no": placement.request.student.reg_no,
+        "name": placement.request.student.user.display_name,
+        "company": placement.company.name,
+        "industry_100": ind100,
+        "academic_100": ac100,
+        "average_100": avg100,
+    }
+
+
+def _rows_for(user, placements):
+    ind_map = {
+        e.placement_id: e
+        for e in IndustryEvaluation.objects.filter(placement__in=placements, status="submitted")
+    }
+    ac_map = {
+        e.placement_id: e
+        for e in AcademicEvaluation.objects.filter(placement__in=placements, status="submitted", supervisor_user=user)
+    }
+    return [build_row(p, ind_map.get(p.id), ac_map.get(p.id)) for p in placements]
+
+
+def build_rows(user):
+    """Every row for `user`'s current students, computed from scratch."""
+    staff = getattr(user, "staff_profile", None)
+    if not staff:
+        return []
+    return _rows_for(user, supervisor_placements(staff))
+
+
+def reconcile_rows(report, user):
+    """Add rows for students `user` supervises but `report` lacks; drop rows of students they no longer do."""
+    staff = getattr(user, "staff_profile", None)
+    current = set(supervisor_placements(staff).values_list("id", flat=True)) if staff else set()
+    held = set(report.result_rows.values_list("placement_id", flat=True))
+
+    if held - current:
+        report.result_rows.exclude(placement_id__in=current).delete()  # also rows whose placement was deleted
+    missing = current - held
+    if missing:
+        placements = supervisor_placements(staff).filter(id__in=missing)
+        ResultsReportRow.objects.bulk_create(
+            [ResultsReportRow(report=report, **row) for row in _rows_for(user, placements)]
+        )
+
+
+def draft_report(user):
+    """The supervisor's open draft, created (and filled once) if there isn't one, with its rows reconciled."""
+    with transaction.atomic():
+        report = (
+            SupervisorResultsReport.objects
+            .select_for_update()
+            .filter(supervisor_user=user, status="draft")
+            .order_by("-created_at")
+            .first()
+        )
+        if report is None:
+            report = SupervisorResultsReport.objects.create(supervisor_user=user, status="draft")
+            report.replace_rows(build_rows(user))
+        else:
+            reconcile_rows(report, user)
+    return report
+
+
+def refresh_placement_row(placement):
+    """Upsert one placement's row in its university supervisor's draft report."""
+    staff = placement.university_supervisor
+    if staff is None or placement.status in CLOSED_STATUSES:
+        ResultsReportRow.objects.filter(placement=placement, report__status="draft").delete()
+        return None
+
+    user = staff.user
+    report = draft_report(user)
+
+    placement = Placement.objects.select_related("company", "request__student__user").get(pk=placement.pk)
+    ind = IndustryEvaluation.objects.filter(placement=placement, status="submitted").first()
+    ac = AcademicEvaluation.objects.filter(placement=placement, status="submitted", supervisor_user=user).first()
+    row = build_row(placement, ind, ac)
+    row.pop("placement_id")
+
+    # a reassigned student leaves the previous supervisor's draft
+    ResultsReportRow.objects.filter(placement=placement, report__status="draft").exclude(report=report).delete()
+    obj, _ = ResultsReportRow.objects.update_or_create(report=report, placement=placement, defaults=row)
+    return obj
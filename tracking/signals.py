@@ -0,0 +1,76 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from placements.models import InternshipRequest, Placement
+from placements.storage import register_references, track_file_fields
+
+from . import attachments
+from .events import track_status
+from .models import WeeklyLog, SiteVisit, ArchivedPlacement, LogbookWeek, SupervisorResultsReport
+
+
+# connected before track_file_fields so a dropped thumbnail is released with the old attachment
+@receiver(pre_save, sender=WeeklyLog)
+@receiver(pre_save, sender=SiteVisit)
+def note_new_attachment(sender, instance, raw=False, **kwargs):
+    instance._process_attachment = False
+    if raw:
+        return
+    if not instance.attachment or not instance.attachment._committed:
+        # a new file (or none): the old thumbnail no longer matches
+        instance.attachment_thumbnail = ""
+        instance._process_attachment = bool(instance.attachment)
+
+
+@receiver(post_save, sender=WeeklyLog)
+@receiver(post_save, sender=SiteVisit)
+def process_new_attachment(sender, instance, **kwargs):
+    if getattr(instance, "_process_attachment", False):
+        instance._process_attachment = False
+        attachments.process_later(instance)
+
+
+track_file_fields(WeeklyLog)
+track_file_fields(SiteVisit)
+track_file_fields(LogbookWeek)
+
+
+# statuses students move their own rows into; anything else is the reviewer's doing
+STUDENT_REQUEST_STATUSES = {"draft", "submitted", "acceptance_uploaded"}
+STUDENT_LOG_STATUSES = {"draft", "submitted"}
+
+track_status(
+    InternshipRequest,
+    period="period_id",
+    related=["student__user_id"],
+    actor=lambda req, row: row["student__user_id"] if req.status in STUDENT_REQUEST_STATUSES else req.reviewed_by_id,
+)
+track_status(
+    Placement,
+    period="request__period_id",
+)
+track_status(
+    WeeklyLog,
+    period="placement__request__period_id",
+    related=["placement__request__student__user_id"],
+    actor=lambda log, row: (
+        row["placement__request__student__user_id"] if log.status in STUDENT_LOG_STATUSES else log.company_action_by_id
+    ),
+)
+track_status(
+    SupervisorResultsReport,  # no period: a report covers the supervisor's students of any period
+    actor=lambda report, row: report.supervisor_user_id if report.status == "submitted" else None,
+)
+
+
+@register_references
+def archived_file_names():
+    # archived placements keep their files; the names live in the JSON payload
+    for payload in ArchivedPlacement.objects.values_list("payload", flat=True).iterator():
+        yield (payload.get("placement") or {}).get("placement_letter")
+        for log in payload.get("weekly_logs", []):
+            yield log.get("attachment")
+            yield log.get("attachment_thumbnail")
+        for visit in payload.get("site_visits", []):
+            yield visit.get("attachment")
+            yield visit.get("attachment_thumbnail")
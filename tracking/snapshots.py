@@ -0,0 +1,122 @@
+# tracking/snapshots.py
+#
+# End-of-period snapshots. Once a period is closed its counts and score
+# distributions are frozen into PeriodSnapshot / PeriodSnapshotGroup (a few dozen
+# rows), and history pages read those instead of re-scanning the live tables.
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from placements.models import InternshipRequest, Placement
+
+from .cohort import CohortReport, DIMENSIONS, cohort_results
+from .models import (
+    WeeklyLog,
+    IndustryEvaluation,
+    AcademicEvaluation,
+    StudentEvaluation,
+    PeriodSnapshot,
+    PeriodSnapshotGroup,
+    ArchivedPlacement,
+)
+
+# summary dict key -> PeriodSnapshotGroup field
+GROUP_FIELDS = {
+    "label": "label",
+    "students": "students",
+    "evaluated": "evaluated",
+    "below_pass": "below_pass",
+    "industry_mean": "industry_mean",
+    "academic_mean": "academic_mean",
+    "mean": "mean",
+    "median": "median",
+    "p25": "p25",
+    "p75": "p75",
+    "p90": "p90",
+    "min": "min_score",
+    "max": "max_score",
+}
+
+
+def period_counts(period):
+    requests = InternshipRequest.objects.for_period(period).aggregate(
+        requests_total=Count("id"),
+        requests_rejected=Count("id", filter=Q(status="rejected")),
+    )
+    placements = Placement.objects.for_period(period).aggregate(
+        placements_total=Count("id"),
+        placements_completed=Count("id", filter=Q(status="completed")),
+        placements_terminated=Count("id", filter=Q(status="terminated")),
+        companies_used=Count("company", distinct=True),
+    )
+    logs = WeeklyLog.objects.for_period(period).aggregate(
+        logs_total=Count("id"),
+        logs_approved=Count("id", filter=Q(status="approved_by_company")),
+    )
+    in_period = {"placement__request__period": period, "status": "submitted"}
+    return {
+        **requests,
+        **placements,
+        **logs,
+        "industry_evaluations": IndustryEvaluation.objects.filter(**in_period).count(),
+        "academic_evaluations": AcademicEvaluation.objects.filter(**in_period).count(),
+        "student_evaluations": StudentEvaluation.objects.filter(**in_period).count(),
+    }
+
+
+def _group(snapshot, dimension, summary):
+    return PeriodSnapshotGroup(
+        snapshot=snapshot,
+        dimension=dimension,
+        **{field: summary[key] for key, field in GROUP_FIELDS.items()},
+    )
+
+
+def can_snapshot(period):
+    # once placements are archived the live tables no longer hold the whole cohort
+    return not ArchivedPlacement.objects.filter(period=period).exists()
+
+
+def take_snapshot(period):
+    """(Re)build the snapshot for `period` from the live tables."""
+    counts = period_counts(period)
+    report = cohort_results(period)
+
+    with transaction.atomic():
+        PeriodSnapshot.objects.filter(period=period).delete()
+        snapshot = PeriodSnapshot.objects.create(period=period, taken_at=timezone.now(), **counts)
+
+        groups = [_group(snapshot, "overall", report.overall)]
+        for key, _, summaries in report.dimensions:
+            groups += [_group(snapshot, key, s) for s in summaries]
+        PeriodSnapshotGroup.objects.bulk_create(groups)
+
+    return snapshot
+
+
+def snapshot_report(snapshot):
+    """Rebuild a CohortReport (same shape as cohort_results) from stored groups."""
+    by_dimension = {key: [] for key, _ in DIMENSIONS}
+    overall = {}
+    for g in snapshot.groups.all():
+        summary = {key: getattr(g, field) for key, field in GROUP_FIELDS.items()}
+        if g.dimension == "overall":
+            overall = summary
+        elif g.dimension in by_dimension:
+            by_dimension[g.dimension].append(summary)
+
+    return CohortReport(
+        overall=overall,
+        dimensions=[(key, title, by_dimension[key]) for key, title in DIMENSIONS],
+    )
+
+
+def cohort_report_for(period):
+    """
+    Closed periods with a snapshot are served from it; everything else is
+    computed live. Returns (report, snapshot or None).
+    """
+    snapshot = PeriodSnapshot.objects.filter(period=period).first() if period.is_closed else None
+    if snapshot:
+        return snapshot_report(snapshot), snapshot
+    return cohort_results(period), None
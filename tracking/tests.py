@@ -1,3 +1,244 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from pypdf import PdfReader
+
+from accounts.models import IndustrySupervisorProfile, StudentProfile, User
+from companies.models import Company
+from placements.models import InternshipPeriod, InternshipRequest, Placement
+
+from . import autosave, cohort, concurrency, logbook, views
+from .models import MAX_RATING, AcademicEvaluation, IndustryEvaluation, WeeklyLog, WeeklyLogQuerySet
+
+
+def make_user(email, group=None):
+    user = User.objects.create_user(email=email, password="pw", first_name=email.split("@")[0], last_name="X")
+    if group:
+        user.groups.add(Group.objects.get_or_create(name=group)[0])
+    return user
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class TrackingTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.period = InternshipPeriod.objects.create(
+            name="P1", start_date=datetime.date(2026, 5, 1), end_date=datetime.date(2026, 8, 1), is_active=True,
+        )
+        cls.company = Company.objects.create(name="Acme", industry="Software", district="Kampala", status="approved")
+        cls.supervisor = make_user("ind@x.com", "IndustrySupervisor")
+        IndustrySupervisorProfile.objects.create(user=cls.supervisor, company=cls.company)
+
+    def setUp(self):
+        cache.clear()
+
+    def make_placement(self, i=1):
+        student = StudentProfile.objects.create(user=make_user(f"st{i}@x.com", "Student"), reg_no=f"R{i:04d}")
+        req = InternshipRequest.objects.create(
+            student=student, period=self.period, preferred_company=self.company, status="acceptance_verified",
+        )
+        return Placement.objects.create(
+            request=req, company=self.company, start_date=self.period.start_date, end_date=self.period.end_date,
+            status="active",
+        )
+
+    def make_log(self, placement, week_no=1, status="submitted"):
+        start = placement.start_date + datetime.timedelta(weeks=week_no - 1)
+        return WeeklyLog.objects.create(
+            placement=placement, week_no=week_no, from_date=start, to_date=start + datetime.timedelta(days=4),
+            activities="Worked.", status=status,
+        )
+
+
+# -------------------------------------------------------------------
+# BULK ACTIONS ON WEEKLY LOGS
+# -------------------------------------------------------------------
+class BulkLogActionTests(TrackingTestCase):
+    def test_queryset_returns_the_ids_it_moved(self):
+        submitted = self.make_log(self.make_placement(1))
+        draft = self.make_log(self.make_placement(2), status="draft")
+        moved = WeeklyLog.objects.filter(id__in=[submitted.id, draft.id], status="submitted").approve(self.supervisor)
+        self.assertEqual(moved, [submitted.id])
+        submitted.refresh_from_db()
+        self.assertEqual((submitted.status, submitted.version), ("approved_by_company", 1))
+
+    def test_only_students_whose_log_moved_are_emailed(self):
+        mine = self.make_log(self.make_placement(1))
+        returned_elsewhere = self.make_log(self.make_placement(2))
+        approve = WeeklyLogQuerySet.approve
+
+        def another_tab_first(qs, user):
+            WeeklyLog.objects.filter(pk=returned_elsewhere.pk).update(status="returned_for_edit")
+            return approve(qs, user)
+
+        self.client.force_login(self.supervisor)
+        with mock.patch.object(WeeklyLogQuerySet, "approve", another_tab_first), \
+                mock.patch.object(views, "notify_students_of_log_action") as notify:
+            self.client.post(reverse("company_bulk_action_logs"), {
+                "action": "approve", "log_ids": [mine.id, returned_elsewhere.id],
+            })
+        self.assertEqual(list(notify.call_args.args[0]), [(1, "st1@x.com", "Acme")])
+        self.assertEqual(WeeklyLog.objects.get(pk=returned_elsewhere.pk).status, "returned_for_edit")
+
+
+# -------------------------------------------------------------------
+# LOGBOOK
+# -------------------------------------------------------------------
+class LogbookCoverTests(TrackingTestCase):
+    def weeks(self, n):
+        start = datetime.date(2026, 5, 4)
+        return [
+            (SimpleNamespace(week_no=i, from_date=start, to_date=start), SimpleNamespace(page_count=2))
+            for i in range(1, n + 1)
+        ]
+
+    def first_week_page(self, pdf):
+        reader = PdfReader(io.BytesIO(pdf))
+        text = "\n".join(page.extract_text() for page in reader.pages)
+        # the contents table comes out one cell per line: week, dates, page
+        cells = [line.strip() for line in text.splitlines()]
+        header = cells.index("Page")
+        self.assertEqual(cells[header + 1], "1")
+        return len(reader.pages), int(cells[header + 3])
+
+    def test_short_contents_fit_on_the_cover(self):
+        pages, first = self.first_week_page(logbook.render_cover(self.make_placement(), self.weeks(3)))
+        self.assertEqual((pages, first), (1, 2))
+
+    def test_long_contents_push_the_weeks_back(self):
+        pages, first = self.first_week_page(logbook.render_cover(self.make_placement(), self.weeks(80)))
+        self.assertGreater(pages, 1)
+        self.assertEqual(first, pages + 1)
+
+
+# -------------------------------------------------------------------
+# OPTIMISTIC LOCKING
+# -------------------------------------------------------------------
+class SaveChangesTests(TrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.log = self.make_log(self.make_placement(), status="draft")
+
+    def test_saves_the_changed_fields_and_moves_the_version(self):
+        self.log.activities = "Wrote tests."
+        concurrency.save_changes(self.log, 0, ["activities"])
+        fresh = WeeklyLog.objects.get(pk=self.log.pk)
+        self.assertEqual((fresh.activities, fresh.version, self.log.version), ("Wrote tests.", 1, 1))
+
+    def test_edit_from_an_older_page_is_refused(self):
+        WeeklyLog.objects.get(pk=self.log.pk).submit()  # another tab
+        self.log.activities = "Overwrites?"
+        with self.assertRaises(concurrency.StaleEdit):
+            concurrency.save_changes(self.log, 0, ["activities"])
+        fresh = WeeklyLog.objects.get(pk=self.log.pk)
+        self.assertEqual((fresh.activities, fresh.status, fresh.version), ("Worked.", "submitted", 1))
+
+    def test_missing_version_is_refused(self):
+        with self.assertRaises(concurrency.StaleEdit):
+            concurrency.save_changes(self.log, None, ["activities"])
+
+    def test_other_fields_are_not_rewritten(self):
+        WeeklyLog.objects.filter(pk=self.log.pk).update(challenges="Set elsewhere")
+        self.log.activities = "Mine"
+        concurrency.save_changes(self.log, 0, ["activities"])
+        fresh = WeeklyLog.objects.get(pk=self.log.pk)
+        self.assertEqual((fresh.activities, fresh.challenges), ("Mine", "Set elsewhere"))
+
+
+# -------------------------------------------------------------------
+# AUTOSAVE
+# -------------------------------------------------------------------
+class AutosaveTests(TrackingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.placement = self.make_placement()
+        self.log = self.make_log(self.placement, status="draft")
+        self.client.force_login(self.placement.request.student.user)
+
+    def post(self, fields, version=0, **extra):
+        return self.client.post(
+            reverse("autosave_draft", args=["log", self.log.pk]),
+            json.dumps({"version": version, "fields": fields, **extra}),
+            content_type="application/json",
+        )
+
+    def test_may_write_once_per_interval_unless_flushing(self):
+        self.assertTrue(autosave.may_write(self.log))
+        self.assertFalse(autosave.may_write(self.log))
+        self.assertTrue(autosave.may_write(self.log, flush=True))
+        self.assertFalse(autosave.may_write(self.log))
+        self.assertTrue(autosave.may_write(self.make_log(self.placement, week_no=2)))
+
+    def test_saves_then_defers_within_the_interval(self):
+        response = self.post({"challenges": "Slow network"})
+        self.assertEqual(response.json()["saved"], ["challenges"])
+        self.assertEqual(response.json()["version"], 1)
+
+        response = self.post({"challenges": "Fixed"}, version=1)
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.json()["deferred"])
+        self.assertEqual(WeeklyLog.objects.get(pk=self.log.pk).challenges, "Slow network")
+
+        response = self.post({"challenges": "Fixed"}, version=1, flush=True)
+        self.assertEqual(response.json()["version"], 2)
+        self.assertEqual(WeeklyLog.objects.get(pk=self.log.pk).challenges, "Fixed")
+
+    def test_stale_version_is_refused(self):
+        response = self.post({"challenges": "Old tab"}, version=5)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(WeeklyLog.objects.get(pk=self.log.pk).challenges, "")
+
+
+# -------------------------------------------------------------------
+# COHORT RESULTS
+# -------------------------------------------------------------------
+class PercentileTests(TestCase):
+    def test_interpolates_between_ranks(self):
+        values = [10, 20, 30, 40]
+        self.assertEqual(cohort.percentile(values, 0), 10)
+        self.assertEqual(cohort.percentile(values, 100), 40)
+        self.assertEqual(cohort.percentile(values, 50), 25)
+        self.assertAlmostEqual(cohort.percentile(values, 90), 37)
+
+    def test_empty_and_single(self):
+        self.assertIsNone(cohort.percentile([], 50))
+        self.assertEqual(cohort.percentile([7], 25), 7)
+
+    def test_summary_uses_only_students_with_both_scores(self):
+        group = cohort.ScoreGroup("G")
+        group.add(80, 60, 70)
+        group.add(40, 40, 40)
+        group.add(90, None, None)
+        summary = group.summary()
+        self.assertEqual((summary["students"], summary["evaluated"]), (3, 2))
+        self.assertEqual((summary["median"], summary["min"], summary["max"]), (55, 40, 70))
+        self.assertEqual(summary["industry_mean"], 70)
+        self.assertEqual(summary["below_pass"], 1)
+
+
+class CohortResultsTests(TrackingTestCase):
+    def test_scores_are_bucketed(self):
+        evaluated = self.make_placement(1)
+        self.make_placement(2)
+        IndustryEvaluation.objects.create(
+            placement=evaluated, company=self.company, status="submitted",
+            **{f: MAX_RATING for f in IndustryEvaluation.SCORE_FIELDS},
+        )
+        AcademicEvaluation.objects.create(
+            placement=evaluated, status="submitted", **{f: 3 for f in AcademicEvaluation.SCORE_FIELDS},
+        )
+
+        report = cohort.cohort_results(self.period)
+        self.assertEqual((report.overall["students"], report.overall["evaluated"]), (2, 1))
+        self.assertEqual(report.overall["mean"], 80)
+        companies = dict((key, summaries) for key, _, summaries in report.dimensions)["company"]
+        self.assertEqual([(s["label"], s["students"]) for s in companies], [("Acme", 2)])
+        programs = dict((key, summaries) for key, _, summaries in report.dimensions)["program"]
+        self.assertEqual([s["label"] for s in programs], [cohort.UNSET])
@@ -9,12 +9,18 @@ urlpatterns = [
     path("student/logs/<int:log_id>/delete/", views.student_log_delete, name="student_log_delete"),
     path("student/evaluation/", views.student_evaluation_form, name="student_evaluation_form"),
     path("student/dashboard/", views.student_dashboard, name="student_dashboard"),
+    path("student/history/", views.student_internship_history, name="student_internship_history"),
+    path("files/logs/<int:log_id>/attachment/", views.log_attachment, name="log_attachment"),
+    path("files/placement/<int:placement_id>/logbook/", views.placement_logbook, name="placement_logbook"),
+    path("autosave/<str:kind>/<int:pk>/", views.autosave_draft, name="autosave_draft"),
+    path("live/", views.live_notifications, name="live_notifications"),
    
 
 
     # COMPANY
     path("company/pending/", views.company_pending_logs, name="company_pending_logs"),
     path("company/log/<int:log_id>/action/", views.company_action_log, name="company_action_log"),
+    path("company/logs/bulk-action/", views.company_bulk_action_logs, name="company_bulk_action_logs"),
     path("company/approved/", views.company_approved_logs, name="company_approved_logs"),
 
     # ✅ keep ONLY this one for evaluation
@@ -29,6 +35,7 @@ urlpatterns = [
     path("supervisor/students/", views.supervisor_students, name="supervisor_students"),
     path("supervisor/approved-logs/", views.supervisor_approved_logs, name="supervisor_approved_logs"),
     path("supervisor/placement/<int:placement_id>/visit/new/", views.supervisor_add_site_visit, name="supervisor_add_site_visit"),
+    path("files/site-visits/<int:visit_id>/attachment/", views.site_visit_attachment, name="site_visit_attachment"),
     path("supervisor/evaluations/submitted/", views.supervisor_submitted_evaluations, name="supervisor_submitted_evaluations"),
     # University (Academic) supervisor evaluation
     path("supervisor/placement/<int:placement_id>/academic-evaluation/", views.supervisor_evaluate_student, name="supervisor_evaluate_student"),
@@ -48,6 +55,13 @@ urlpatterns = [
     path("coordinator/results-reports/<int:report_id>/", views.coordinator_results_report_detail, name="coordinator_results_report_detail"),
     path("coordinator/results-reports/<int:report_id>/pdf/", views.coordinator_results_report_pdf, name="coordinator_results_report_pdf"),
     path("coordinator/results-reports/<int:report_id>/received/", views.coordinator_mark_report_received, name="coordinator_mark_report_received"),
+    path("coordinator/history/", views.coordinator_placement_history, name="coordinator_placement_history"),
+    path("history/archived/<int:archive_id>/", views.archived_placement_detail, name="archived_placement_detail"),
+    path("coordinator/results/cohort/", views.coordinator_cohort_results, name="coordinator_cohort_results"),
+    path("coordinator/results/cohort/<int:period_id>/snapshot/", views.coordinator_snapshot_period, name="coordinator_snapshot_period"),
+    path("coordinator/exports/results.csv", views.coordinator_export_results, name="coordinator_export_results"),
+    path("coordinator/exports/logs.csv", views.coordinator_export_logs, name="coordinator_export_logs"),
+    path("coordinator/exports/evaluations.csv", views.coordinator_export_evaluations, name="coordinator_export_evaluations"),
     path("coordinator/student-evaluations/", views.coordinator_student_evaluations, name="coordinator_student_evaluations"),
     path("coordinator/student-evaluations/<int:evaluation_id>/", views.coordinator_student_evaluation_detail, name="coordinator_student_evaluation_detail"),
     path("coordinator/dashboard/", views.coordinator_dashboard, name="coordinator_dashboard"),
@@ -2,20 +2,31 @@
 import datetime
 from io import BytesIO
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import Q, Case, When, IntegerField, Prefetch
-from django.http import HttpResponseForbidden, HttpResponse
+from django.http import FileResponse, HttpResponseForbidden, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.text import get_valid_filename
 from .models import StudentEvaluation
 from .forms import StudentEvaluationForm
+from .notifications import notify_students_of_log_action
+from . import autosave, concurrency, events, exports, live, logbook
+from .snapshots import can_snapshot, cohort_report_for, take_snapshot
+from .archive import placement_history
+from .results import draft_report, refresh_placement_row
 
 
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 
 from placements.models import Placement
+from placements import media
+from placements.periods import aactive_placement_for, active_placement_for, period_context
+from accounts.aio import arender, auser, ain_groups, astaff_profile, astudent_profile
 from .models import (
     WeeklyLog,
     WeeklyLogEntry,
@@ -23,9 +34,11 @@ from .models import (
     IndustryEvaluation,
     AcademicEvaluation,
     SupervisorResultsReport,
+    ArchivedPlacement,
 )
 from .forms import (
     WeeklyLogForm,
+    WeeklyLogEntryForm,
     WeeklyLogEntryFormSet,
     SiteVisitForm,
     IndustryEvaluationForm,
@@ -39,7 +52,7 @@ from django.http import HttpResponseForbidden
 from django.shortcuts import render
 from django.utils import timezone
 
-from placements.models import InternshipRequest, Placement
+from placements.models import InternshipRequest, InternshipPeriod, Placement
 from tracking.models import (
     WeeklyLog,
     IndustryEvaluation,
@@ -67,15 +80,8 @@ def is_coordinator(user):
 
 
 def _get_student_active_placement(user):
-    if not hasattr(user, "student_profile"):
-        return None
-    student = user.student_profile
-    return (
-        Placement.objects.filter(request__student=student, status="active")
-        .select_related("company", "request", "request__student", "request__student__user")
-        .order_by("-created_at")
-        .first()
-    )
+    # cached per student, see placements/periods.py
+    return active_placement_for(user)
 
 
 def _get_student_latest_placement(user):
@@ -95,6 +101,7 @@ def _get_latest_report(user):
     return (
         SupervisorResultsReport.objects
         .filter(supervisor_user=user)
+        .exclude(status="draft")  # the open draft is not a report yet
         .order_by("-submitted_at", "-created_at")
         .first()
     )
@@ -111,17 +118,29 @@ DAY_ORDER = Case(
     output_field=IntegerField(),
 )
 
+
+def _activities_text(entries):
+    # the legacy "activities" field, rebuilt from the day table
+    lines = []
+    for entry in entries:
+        wa = (entry.work_assignment or "").strip()
+        st = (entry.activities_steps or "").strip()
+        if wa or st:
+            lines.append(f"{entry.get_day_display()}: {wa} | {st}")
+    return "\n".join(lines)
+
 # -------------------------------------------------------------------
 # STUDENT: LOGS
 # -------------------------------------------------------------------
 @login_required
-def student_logs(request):
-    placement = _get_student_active_placement(request.user)
+async def student_logs(request):
+    user = await auser(request)
+    placement = await aactive_placement_for(user, await astudent_profile(user))
     if not placement:
-        return render(request, "tracking/no_active_placement.html")
+        return await arender(request, "tracking/no_active_placement.html")
 
-    logs = WeeklyLog.objects.filter(placement=placement).order_by("-week_no")
-    return render(request, "tracking/student_logs.html", {"placement": placement, "logs": logs})
+    logs = [log async for log in WeeklyLog.objects.filter(placement=placement).order_by("-week_no")]
+    return await arender(request, "tracking/student_logs.html", {"placement": placement, "logs": logs})
 
 
 @login_required
@@ -170,31 +189,32 @@ def student_log_edit(request, log_id):
     entries_qs = log.entries.all().order_by(DAY_ORDER)
 
     if request.method == "POST":
-        form = WeeklyLogForm(request.POST, request.FILES, instance=log)
+        form = WeeklyLogForm(request.POST, request.FILES, instance=log, uploader=request.user)
         formset = WeeklyLogEntryFormSet(request.POST, instance=log, queryset=entries_qs)
 
         if form.is_valid() and formset.is_valid():
             log = form.save(commit=False)
+            changed = form.changed_fields()
 
             # optional: rebuild "activities" legacy field from table
-            lines = []
-            for entry in entries_qs:
-                wa = (entry.work_assignment or "").strip()
-                st = (entry.activities_steps or "").strip()
-                if wa or st:
-                    lines.append(f"{entry.get_day_display()}: {wa} | {st}")
-            log.activities = "\n".join(lines)
+            concurrency.assign(log, changed, activities=_activities_text(entries_qs))
 
             action = request.POST.get("action", "save")
-            if action == "submit":
-                log.submit()  # should set status="submitted"
+            if action != "submit" and log.status != "returned_for_edit":
+                concurrency.assign(log, changed, status="draft")
+
+            # only the changed columns are written, and only if nobody saved the log since this page was opened
+            try:
+                with transaction.atomic():
+                    concurrency.save_changes(log, form.version, changed)
+                    if action == "submit":
+                        log.submit()
+                    formset.save()
+            except concurrency.StaleEdit as e:
+                form.add_error(None, str(e))
             else:
-                if log.status != "returned_for_edit":
-                    log.status = "draft"
-                log.save()
-
-            formset.save()
-            return redirect("student_logs")
+                form.finish_uploads()
+                return redirect("student_logs")
     else:
         form = WeeklyLogForm(instance=log)
         formset = WeeklyLogEntryFormSet(instance=log, queryset=entries_qs)
@@ -221,15 +241,43 @@ def student_log_delete(request, log_id):
     if log.status != "draft":
         return HttpResponseForbidden("Only draft logs can be deleted.")
 
-    attachment_name = log.attachment.name if getattr(log, "attachment", None) else None
-    log.delete()
-
-    if attachment_name and default_storage.exists(attachment_name):
-        default_storage.delete(attachment_name)
+    log.delete()  # its attachment is released on commit (placements/storage.py)
 
     return redirect("student_logs")
 
 
+@login_required
+def log_attachment(request, log_id):
+    log = get_object_or_404(
+        WeeklyLog.objects.select_related("placement__request__student"),
+        id=log_id,
+    )
+    if not media.can_view_placement_files(request.user, log.placement):
+        return HttpResponseForbidden("You cannot view this file.")
+
+    if request.GET.get("thumbnail"):
+        return media.serve_file(request, log.attachment_thumbnail)
+    return media.serve_file(request, log.attachment)
+
+
+@login_required
+def placement_logbook(request, placement_id):
+    placement = get_object_or_404(
+        Placement.objects.select_related(
+            "request__student__user", "company", "industry_supervisor", "university_supervisor__user",
+        ),
+        id=placement_id,
+    )
+    if not media.can_view_placement_files(request.user, placement):
+        return HttpResponseForbidden("You cannot view this logbook.")
+
+    return FileResponse(
+        logbook.compile_logbook(placement),
+        content_type="application/pdf",
+        filename=get_valid_filename(f"Logbook_{placement.request.student.reg_no}.pdf"),
+    )
+
+
 # -------------------------------------------------------------------
 # INDUSTRY SUPERVISOR: LOG REVIEW
 # -------------------------------------------------------------------
@@ -285,6 +333,56 @@ def company_action_log(request, log_id):
     return HttpResponseForbidden("Invalid action.")
 
 
+@login_required
+def company_bulk_action_logs(request):
+    if request.method != "POST":
+        return HttpResponseForbidden("POST only.")
+
+    if not is_industry_supervisor(request.user):
+        return HttpResponseForbidden("Industry Supervisors only.")
+
+    if not hasattr(request.user, "industry_profile") or not request.user.industry_profile.company:
+        return HttpResponseForbidden("Industry profile/company not set for this user.")
+
+    company = request.user.industry_profile.company
+
+    action = request.POST.get("action")
+    if action not in ["approve", "return"]:
+        return HttpResponseForbidden("Invalid action.")
+
+    log_ids = [int(x) for x in request.POST.getlist("log_ids") if x.isdigit()]
+    if not log_ids:
+        return redirect("company_pending_logs")
+
+    reason = request.POST.get("reason", "")
+
+    with transaction.atomic():
+        # only this company's submitted logs; the status filter is repeated on the UPDATE
+        # so a log actioned in another tab meanwhile is not overwritten
+        affected = list(
+            WeeklyLog.objects
+            .filter(id__in=log_ids, placement__company=company, status="submitted")
+            .values_list("id", "week_no", "placement__request__student__user__email")
+        )
+        logs = WeeklyLog.objects.filter(id__in=[a[0] for a in affected], status="submitted")
+
+        if action == "approve":
+            moved = set(logs.approve(request.user))
+        else:
+            moved = set(logs.return_for_edit(request.user, reason))
+
+    # only the students whose log this request actually moved
+    notify_students_of_log_action(
+        [(week_no, email, company.name) for log_id, week_no, email in affected if log_id in moved],
+        action,
+        reason,
+    )
+
+    if action == "approve":
+        return redirect("company_approved_logs")
+    return redirect("company_pending_logs")
+
+
 @login_required
 def company_approved_logs(request):
     if not is_industry_supervisor(request.user):
@@ -452,12 +550,13 @@ def supervisor_add_site_visit(request, placement_id):
     placement = get_object_or_404(Placement, id=placement_id, university_supervisor=staff)
 
     if request.method == "POST":
-        form = SiteVisitForm(request.POST, request.FILES)
+        form = SiteVisitForm(request.POST, request.FILES, uploader=request.user)
         if form.is_valid():
             sv = form.save(commit=False)
             sv.placement = placement
             sv.supervisor = staff
             sv.save()
+            form.finish_uploads()
             return redirect("supervisor_students")
     else:
         form = SiteVisitForm()
@@ -494,6 +593,20 @@ def supervisor_approved_logs(request):
     return render(request, "tracking/supervisor_approved_logs.html", {"logs": logs})
 
 
+@login_required
+def site_visit_attachment(request, visit_id):
+    visit = get_object_or_404(
+        SiteVisit.objects.select_related("placement__request__student"),
+        id=visit_id,
+    )
+    if not media.can_view_placement_files(request.user, visit.placement):
+        return HttpResponseForbidden("You cannot view this file.")
+
+    if request.GET.get("thumbnail"):
+        return media.serve_file(request, visit.attachment_thumbnail)
+    return media.serve_file(request, visit.attachment)
+
+
 # -------------------------------------------------------------------
 # COORDINATOR: MISSING LOGS
 # -------------------------------------------------------------------
@@ -511,8 +624,10 @@ def coordinator_missing_logs(request):
     today = timezone.localdate()
     wk_start, wk_end = week_bounds(today)
 
+    ctx = period_context(request)
     active_placements = (
         Placement.objects
+        .for_period(ctx["period"])
         .exclude(status__in=["completed", "terminated"])
         .select_related("company", "request", "request__student", "request__student__user")
     )
@@ -534,6 +649,7 @@ def coordinator_missing_logs(request):
         "missing": missing,
         "count_missing": len(missing),
         "count_active": active_placements.count(),
+        **ctx,
     })
 
 
@@ -586,17 +702,22 @@ def company_evaluate_student(request, placement_id):
         form = IndustryEvaluationForm(request.POST, instance=evaluation)
         if form.is_valid():
             evaluation = form.save(commit=False)
-            evaluation.company = company
-            evaluation.supervisor_user = request.user
+            changed = form.changed_fields()
+            concurrency.assign(evaluation, changed, company=company, supervisor_user=request.user)
 
             action = request.POST.get("action", "save")
-            if action == "submit":
-                evaluation.submit(user=request.user)  # your model method
-                return redirect("company_approved_evaluations")
-
-            evaluation.status = "draft"
-            evaluation.save()
-            return redirect("company_evaluate_student", placement_id=placement.id)
+            try:
+                with transaction.atomic():
+                    concurrency.save_changes(evaluation, form.version, changed)
+                    if action == "submit":
+                        evaluation.submit(user=request.user)  # your model method
+            except concurrency.StaleEdit as e:
+                form.add_error(None, str(e))
+            else:
+                if action == "submit":
+                    refresh_placement_row(placement)
+                    return redirect("company_approved_evaluations")
+                return redirect("company_evaluate_student", placement_id=placement.id)
     else:
         form = IndustryEvaluationForm(instance=evaluation)
 
@@ -715,16 +836,22 @@ def supervisor_evaluate_student(request, placement_id):
         form = AcademicEvaluationForm(request.POST, instance=evaluation)
         if form.is_valid():
             evaluation = form.save(commit=False)
-            evaluation.supervisor_user = request.user
+            changed = form.changed_fields()
+            concurrency.assign(evaluation, changed, supervisor_user=request.user)
 
             action = request.POST.get("action", "save")
-            if action == "submit":
-                evaluation.submit(user=request.user)
-                return redirect("supervisor_submitted_academic_evaluations")
-
-            evaluation.status = "draft"
-            evaluation.save()
-            return redirect("supervisor_evaluate_student", placement_id=placement.id)
+            try:
+                with transaction.atomic():
+                    concurrency.save_changes(evaluation, form.version, changed)
+                    if action == "submit":
+                        evaluation.submit(user=request.user)
+            except concurrency.StaleEdit as e:
+                form.add_error(None, str(e))
+            else:
+                if action == "submit":
+                    refresh_placement_row(placement)
+                    return redirect("supervisor_submitted_academic_evaluations")
+                return redirect("supervisor_evaluate_student", placement_id=placement.id)
     else:
         form = AcademicEvaluationForm(instance=evaluation)
 
@@ -773,41 +900,7 @@ def supervisor_results_report(request):
     if not staff:
         return HttpResponseForbidden("Staff profile not set.")
 
-    placements = (
-        Placement.objects
-        .filter(university_supervisor=staff)
-        .exclude(status__in=["completed", "terminated"])
-        .select_related("company", "request", "request__student", "request__student__user")
-        .order_by("request__student__reg_no")
-    )
-
-    ind_map = {
-        e.placement_id: e
-        for e in IndustryEvaluation.objects.filter(placement__in=placements, status="submitted")
-    }
-    ac_map = {
-        e.placement_id: e
-        for e in AcademicEvaluation.objects.filter(placement__in=placements, status="submitted", supervisor_user=request.user)
-    }
-
-    rows = []
-    for p in placements:
-        ind = ind_map.get(p.id)
-        ac = ac_map.get(p.id)
-
-        ind100 = float(ind.score_out_of_100) if ind else None
-        ac100 = float(ac.score_out_of_100) if ac else None
-        avg100 = (ind100 + ac100) / 2.0 if (ind100 is not None and ac100 is not None) else None
-
-        rows.append({
-            "placement_id": p.id,
-            "reg_no": p.request.student.reg_no,
-            "name": p.request.student.user.display_name,
-            "company": p.company.name,
-            "industry_100": ind100,
-            "academic_100": ac100,
-            "average_100": avg100,
-        })
+    rows = draft_report(request.user).rows
 
     return render(request, "tracking/supervisor_results_report.html", {
         "rows": rows,
@@ -824,22 +917,7 @@ def supervisor_results_report_pdf(request):
     if not staff:
         return HttpResponseForbidden("Staff profile not set.")
 
-    placements = (
-        Placement.objects
-        .filter(university_supervisor=staff)
-        .exclude(status__in=["completed", "terminated"])
-        .select_related("company", "request", "request__student", "request__student__user")
-        .order_by("request__student__reg_no")
-    )
-
-    ind_map = {
-        e.placement_id: e
-        for e in IndustryEvaluation.objects.filter(placement__in=placements, status="submitted")
-    }
-    ac_map = {
-        e.placement_id: e
-        for e in AcademicEvaluation.objects.filter(placement__in=placements, status="submitted", supervisor_user=request.user)
-    }
+    rows = draft_report(request.user).rows
 
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=A4)
@@ -864,20 +942,17 @@ def supervisor_results_report_pdf(request):
 
     c.setFont("Helvetica", 9)
 
-    for p in placements:
-        ind = ind_map.get(p.id)
-        ac = ac_map.get(p.id)
-
-        ind100 = round(float(ind.score_out_of_100), 0) if ind else None
-        ac100 = round(float(ac.score_out_of_100), 0) if ac else None
-        avg100 = round((ind100 + ac100) / 2.0, 0) if (ind100 is not None and ac100 is not None) else None
+    for r in rows:
+        ind100 = None if r["industry_100"] is None else round(r["industry_100"], 0)
+        ac100 = None if r["academic_100"] is None else round(r["academic_100"], 0)
+        avg100 = None if r["average_100"] is None else round(r["average_100"], 0)
 
         if y < 60:
             c.showPage()
             y = height - 50
 
-        c.drawString(50, y, str(p.request.student.reg_no))
-        c.drawString(140, y, (p.request.student.user.display_name or "")[:28])
+        c.drawString(50, y, str(r["reg_no"]))
+        c.drawString(140, y, (r["name"] or "")[:28])
         c.drawString(330, y, "-" if ind100 is None else str(int(ind100)))
         c.drawString(405, y, "-" if ac100 is None else str(int(ac100)))
         c.drawString(485, y, "-" if avg100 is None else str(int(avg100)))
@@ -905,65 +980,8 @@ def supervisor_submit_results_report(request):
     if not staff:
         return HttpResponseForbidden("Staff profile not set.")
 
-    placements = (
-        Placement.objects
-        .filter(university_supervisor=staff)
-        .exclude(status__in=["completed", "terminated"])
-        .select_related("company", "request", "request__student", "request__student__user")
-        .order_by("request__student__reg_no")
-    )
-
-    ind_map = {
-        e.placement_id: e
-        for e in IndustryEvaluation.objects.filter(placement__in=placements, status="submitted")
-    }
-    ac_map = {
-        e.placement_id: e
-        for e in AcademicEvaluation.objects.filter(
-            placement__in=placements,
-            status="submitted",
-            supervisor_user=request.user
-        )
-    }
-
-    rows = []
-    for p in placements:
-        ind = ind_map.get(p.id)
-        ac = ac_map.get(p.id)
-
-        ind100 = float(ind.score_out_of_100) if ind else None
-        ac100 = float(ac.score_out_of_100) if ac else None
-        avg100 = (ind100 + ac100) / 2.0 if (ind100 is not None and ac100 is not None) else None
-
-        rows.append({
-            "placement_id": p.id,
-            "reg_no": p.request.student.reg_no,
-            "name": p.request.student.user.display_name,
-            "company": p.company.name,
-            "industry_100": ind100,
-            "academic_100": ac100,
-            "average_100": avg100,
-        })
-
-    # ✅ Update latest draft report if exists, else create new
-    report = (
-        SupervisorResultsReport.objects
-        .filter(supervisor_user=request.user)
-        .exclude(status="submitted")  # only drafts/others
-        .order_by("-created_at")
-        .first()
-    )
-
-    if report:
-        report.rows = rows
-        report.submit()   # sets status=submitted + submitted_at
-    else:
-        report = SupervisorResultsReport.objects.create(
-            supervisor_user=request.user,
-            rows=rows,
-            status="draft",
-        )
-        report.submit()
+    # rows are already up to date (see tracking/results.py) — just flip the status
+    draft_report(request.user).submit()
 
     return redirect("supervisor_results_report")
 
@@ -971,46 +989,53 @@ def _get_latest_report(user):
     return (
         SupervisorResultsReport.objects
         .filter(supervisor_user=user)
+        .exclude(status="draft")  # the open draft is not a report yet
         .order_by("-submitted_at", "-created_at")
         .first()
     )
 
 
 @login_required
-def supervisor_dashboard(request):
-    if not is_university_supervisor(request.user):
+async def supervisor_dashboard(request):
+    user = await auser(request)
+    if not await ain_groups(user, ["UniversitySupervisor", "Admin"]):
         return HttpResponseForbidden("University Supervisors only.")
 
-    staff = getattr(request.user, "staff_profile", None)
+    staff = await astaff_profile(user)
     if not staff:
         return HttpResponseForbidden("Staff profile not set. Admin must create StaffProfile for this user.")
 
-    latest_report = _get_latest_report(request.user)
+    latest_report = await (
+        SupervisorResultsReport.objects
+        .filter(supervisor_user=user)
+        .exclude(status="draft")  # the open draft is not a report yet
+        .order_by("-submitted_at", "-created_at")
+        .afirst()
+    )
 
     # Optional quick stats (nice for dashboard badges)
-    assigned_count = Placement.objects.filter(
+    current = Placement.objects.filter(
         university_supervisor=staff
-    ).exclude(status__in=["completed", "terminated"]).count()
+    ).exclude(status__in=["completed", "terminated"])
+    assigned_count = await current.acount()
 
-    industry_submitted_count = IndustryEvaluation.objects.filter(
+    industry_submitted_count = await IndustryEvaluation.objects.filter(
         placement__university_supervisor=staff,
         status="submitted"
-    ).count()
+    ).acount()
 
-    academic_submitted_count = AcademicEvaluation.objects.filter(
+    academic_submitted_count = await AcademicEvaluation.objects.filter(
         placement__university_supervisor=staff,
-        supervisor_user=request.user,
+        supervisor_user=user,
         status="submitted"
-    ).count()
+    ).acount()
 
     # students where BOTH evals are submitted (ready for average)
-    ready_for_average_count = Placement.objects.filter(
-        university_supervisor=staff
-    ).exclude(status__in=["completed", "terminated"]).filter(
+    ready_for_average_count = await current.filter(
         industry_evaluation__status="submitted",
         academic_evaluation__status="submitted",
-        academic_evaluation__supervisor_user=request.user,
-    ).distinct().count()
+        academic_evaluation__supervisor_user=user,
+    ).distinct().acount()
 
     # ✅ NEW: submitted Student Evaluation Forms (from students)
     student_eval_qs = (
@@ -1025,10 +1050,10 @@ def supervisor_dashboard(request):
         )
         .order_by("-submitted_at")
     )
-    student_eval_count = student_eval_qs.count()
-    latest_student_evals = list(student_eval_qs[:5])
+    student_eval_count = await student_eval_qs.acount()
+    latest_student_evals = [e async for e in student_eval_qs[:5]]
 
-    return render(request, "dashboards/supervisor_dashboard.html", {
+    return await arender(request, "dashboards/supervisor_dashboard.html", {
         "latest_report": latest_report,
         "assigned_count": assigned_count,
         "industry_submitted_count": industry_submitted_count,
@@ -1070,6 +1095,10 @@ def coordinator_results_reports(request):
         SupervisorResultsReport.objects
         .filter(status__in=["submitted", "received"])
         .select_related("supervisor_user")
+        .annotate(
+            student_count=Count("result_rows"),
+            below_pass_count=Count("result_rows", filter=Q(result_rows__average_100__lt=50)),
+        )
         .order_by("-submitted_at", "-created_at")
     )
 
@@ -1180,6 +1209,91 @@ def coordinator_mark_report_received(request, report_id):
     return redirect("coordinator_results_reports")
 
 
+# -------------------------------------------------------------------
+# COORDINATOR: consolidated cohort results (one period, all supervisors)
+# -------------------------------------------------------------------
+@login_required
+def coordinator_cohort_results(request):
+    if not is_coordinator(request.user):
+        return HttpResponseForbidden("Coordinators only.")
+
+    ctx = period_context(request, allow_all=False)
+    period = ctx["period"]
+    report, snapshot = cohort_report_for(period) if period else (None, None)
+
+    return render(request, "tracking/coordinator_cohort_results.html", {
+        "report": report,
+        "snapshot": snapshot,
+        "can_snapshot": period is not None and period.is_closed and can_snapshot(period),
+        **ctx,
+    })
+
+
+@login_required
+def coordinator_snapshot_period(request, period_id):
+    if request.method != "POST":
+        return HttpResponseForbidden("POST only.")
+    if not is_coordinator(request.user):
+        return HttpResponseForbidden("Coordinators only.")
+
+    period = get_object_or_404(InternshipPeriod, id=period_id)
+    if not period.is_closed:
+        return HttpResponseForbidden("Only closed periods can be snapshotted.")
+    if not can_snapshot(period):
+        return HttpResponseForbidden("This period is archived; its snapshot is final.")
+
+    take_snapshot(period)
+    return redirect(f"{reverse('coordinator_cohort_results')}?period={period.id}")
+
+
+# -------------------------------------------------------------------
+# COORDINATOR: streaming CSV exports (optional ?period=<id>)
+# -------------------------------------------------------------------
+def _export_period(request):
+    period_id = request.GET.get("period")
+    if period_id and period_id.isdigit():
+        return get_object_or_404(InternshipPeriod, id=period_id)
+    return None
+
+
+def _export_filename(prefix, period):
+    stamp = timezone.localdate().strftime("%Y%m%d")
+    return f"{prefix}_period{period.id}_{stamp}.csv" if period else f"{prefix}_{stamp}.csv"
+
+
+@login_required
+def coordinator_export_results(request):
+    if not is_coordinator(request.user):
+        return HttpResponseForbidden("Coordinators only.")
+
+    period = _export_period(request)
+    return exports.stream_csv(
+        request, _export_filename("results", period), exports.RESULTS_HEADER, exports.results_rows(period)
+    )
+
+
+@login_required
+def coordinator_export_logs(request):
+    if not is_coordinator(request.user):
+        return HttpResponseForbidden("Coordinators only.")
+
+    period = _export_period(request)
+    return exports.stream_csv(
+        request, _export_filename("weekly_logs", period), exports.LOGS_HEADER, exports.log_rows(period)
+    )
+
+
+@login_required
+def coordinator_export_evaluations(request):
+    if not is_coordinator(request.user):
+        return HttpResponseForbidden("Coordinators only.")
+
+    period = _export_period(request)
+    return exports.stream_csv(
+        request, _export_filename("evaluations", period), exports.evaluations_header(), exports.evaluation_rows(period)
+    )
+
+
 @login_required
 def coordinator_dashboard(request):
     if not is_coordinator(request.user):
@@ -1226,17 +1340,18 @@ def student_evaluation_form(request):
         form = StudentEvaluationForm(request.POST, instance=evaluation)
         if form.is_valid():
             evaluation = form.save(commit=False)
-            evaluation.student_user = request.user
-            evaluation.placement = placement
+            changed = form.changed_fields()
+            concurrency.assign(evaluation, changed, student_user=request.user)
 
             action = request.POST.get("action", "save")
-            if action == "submit":
-                evaluation.save()
-                evaluation.submit()
-                return redirect("student_evaluation_form")
+            try:
+                with transaction.atomic():
+                    concurrency.save_changes(evaluation, form.version, changed)
+                    if action == "submit":
+                        evaluation.submit()
+            except concurrency.StaleEdit as e:
+                form.add_error(None, str(e))
             else:
-                evaluation.status = "draft"
-                evaluation.save()
                 return redirect("student_evaluation_form")
     else:
         form = StudentEvaluationForm(instance=evaluation)
@@ -1247,6 +1362,112 @@ def student_evaluation_form(request):
         "form": form,
     })
 
+
+# -------------------------------------------------------------------
+# AUTOSAVE (drafts of the long forms, see tracking/autosave.py)
+# -------------------------------------------------------------------
+def _autosave_target(user, kind, pk):
+    """(instance, form class, values set on every save), or None if `user` may not edit it."""
+    if kind == "log":
+        placement = _get_student_active_placement(user)
+        log = WeeklyLog.objects.filter(id=pk, placement=placement).first() if placement else None
+        if log and log.status in ("draft", "returned_for_edit"):
+            return log, WeeklyLogForm, {}
+
+    elif kind == "company_evaluation":
+        company = getattr(getattr(user, "industry_profile", None), "company", None)
+        if is_industry_supervisor(user) and company:
+            evaluation = IndustryEvaluation.objects.filter(id=pk, placement__company=company, status="draft").first()
+            if evaluation:
+                return evaluation, IndustryEvaluationForm, {"company": company, "supervisor_user": user}
+
+    elif kind == "academic_evaluation":
+        staff = getattr(user, "staff_profile", None)
+        if is_university_supervisor(user) and staff:
+            evaluation = AcademicEvaluation.objects.filter(
+                id=pk, placement__university_supervisor=staff, status="draft"
+            ).first()
+            if evaluation:
+                return evaluation, AcademicEvaluationForm, {"supervisor_user": user}
+
+    elif kind == "student_evaluation":
+        evaluation = StudentEvaluation.objects.filter(id=pk, student_user=user, status="draft").first()
+        if evaluation:
+            return evaluation, StudentEvaluationForm, {}
+
+    return None
+
+
+@login_required
+def autosave_draft(request, kind, pk):
+    if request.method != "POST":
+        return HttpResponseForbidden("POST only.")
+
+    target = _autosave_target(request.user, kind, pk)
+    if target is None:
+        return JsonResponse({"error": "This form can't be edited any more."}, status=403)
+    instance, form_class, always = target
+
+    try:
+        version, fields, flush = autosave.parse(request.body)
+    except autosave.AutosaveError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if not autosave.may_write(instance, flush):
+        return JsonResponse({"deferred": True, "retry_in": settings.AUTOSAVE_MIN_INTERVAL}, status=202)
+
+    names = list(fields)
+    rows, derive = [], None
+    if kind == "log":
+        prefix = WeeklyLogEntryFormSet.get_default_prefix()
+        fields, row_fields = autosave.split_rows(fields, prefix)
+        values, errors = autosave.clean_fields(form_class(instance=instance), fields, skip=("week_no",))
+        entries = list(instance.entries.all().order_by(DAY_ORDER))
+        for i, raw in row_fields.items():
+            if i >= len(entries):
+                errors.update({f"{prefix}-{i}-{name}": ["Unknown row."] for name in raw})
+                continue
+            row_values, row_errors = autosave.clean_fields(WeeklyLogEntryForm(instance=entries[i]), raw, skip=("day",))
+            rows.append((entries[i], row_values))
+            errors.update({f"{prefix}-{i}-{name}": e for name, e in row_errors.items()})
+
+        def derive():
+            return {"activities": _activities_text(entries)}
+    else:
+        values, errors = autosave.clean_fields(form_class(instance=instance), fields)
+
+    try:
+        autosave.save(instance, version, {**values, **always}, rows, derive)
+    except concurrency.StaleEdit as e:
+        return JsonResponse({"error": str(e)}, status=409)
+
+    return JsonResponse({
+        "saved": [name for name in names if name not in errors],
+        "errors": errors,
+        "version": instance.version,
+        "saved_at": timezone.localtime().strftime("%H:%M"),
+    })
+
+
+# -------------------------------------------------------------------
+# LIVE NOTIFICATIONS (server-sent events, see tracking/live.py)
+# -------------------------------------------------------------------
+@login_required
+async def live_notifications(request):
+    if not live.enabled(request):
+        # 204 tells EventSource not to reconnect; a WSGI worker is never held open
+        return HttpResponse(status=204)
+
+    user = await auser(request)
+    response = StreamingHttpResponse(
+        live.stream(user.pk, request.headers.get("Last-Event-ID")),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: pass events through as they come
+    return response
+
+
 @login_required
 def supervisor_student_evaluations(request):
     if not is_university_supervisor(request.user):
@@ -1344,11 +1565,13 @@ def coordinator_dashboard(request):
         return HttpResponseForbidden("Coordinators only.")
 
     today = timezone.localdate()
+    ctx = period_context(request)
+    period = ctx["period"]
 
     # ----------------------------
     # PLACEMENTS / INTERNSHIP STATUS
     # ----------------------------
-    placements = Placement.objects.select_related(
+    placements = Placement.objects.for_period(period).select_related(
         "company", "request", "request__student", "request__student__user", "university_supervisor", "university_supervisor__user"
     )
 
@@ -1411,7 +1634,7 @@ def coordinator_dashboard(request):
     # ----------------------------
     # REQUEST PIPELINE
     # ----------------------------
-    reqs = InternshipRequest.objects.select_related("student", "student__user", "preferred_company", "period")
+    reqs = InternshipRequest.objects.for_period(period).select_related("student", "student__user", "preferred_company", "period")
 
     total_requests = reqs.count()
     draft_requests = reqs.filter(status="draft").count()
@@ -1428,29 +1651,52 @@ def coordinator_dashboard(request):
     # ----------------------------
     # WEEKLY LOGS OVERVIEW
     # ----------------------------
-    logs_draft = WeeklyLog.objects.filter(status="draft").count()
-    logs_submitted = WeeklyLog.objects.filter(status="submitted").count()
-    logs_returned = WeeklyLog.objects.filter(status="returned_for_edit").count()
-    logs_approved = WeeklyLog.objects.filter(status="approved_by_company").count()
+    logs = WeeklyLog.objects.for_period(period)
+    logs_draft = logs.filter(status="draft").count()
+    logs_submitted = logs.filter(status="submitted").count()
+    logs_returned = logs.filter(status="returned_for_edit").count()
+    logs_approved = logs.filter(status="approved_by_company").count()
 
     # ----------------------------
     # EVALUATIONS & REPORTS
     # ----------------------------
-    industry_eval_submitted = IndustryEvaluation.objects.filter(status="submitted").count()
-    academic_eval_submitted = AcademicEvaluation.objects.filter(status="submitted").count()
-    student_eval_submitted = StudentEvaluation.objects.filter(status="submitted").count()
+    period_filter = {"placement__request__period": period} if period else {}
+    industry_eval_submitted = IndustryEvaluation.objects.filter(status="submitted", **period_filter).count()
+    academic_eval_submitted = AcademicEvaluation.objects.filter(status="submitted", **period_filter).count()
+    student_eval_submitted = StudentEvaluation.objects.filter(status="submitted", **period_filter).count()
 
     supervisor_reports_submitted = SupervisorResultsReport.objects.filter(status="submitted").count()
     latest_report = SupervisorResultsReport.objects.filter(status="submitted").order_by("-submitted_at").first()
 
-    ready_for_average = Placement.objects.filter(
+    ready_for_average = placements.filter(
         status__in=["active", "completed"],
         industry_evaluation__status="submitted",
         academic_evaluation__status="submitted",
     ).distinct().count()
 
+    # ----------------------------
+    # TURNAROUND (from the workflow event table, see tracking/events.py)
+    # ----------------------------
+    def timing(model, from_status, to_status):
+        t = events.average_duration(model, from_status, to_status, period)
+        return {"hours": t["avg"].total_seconds() / 3600 if t["avg"] else None, "n": t["n"]}
+
+    turnaround = [
+        {"label": "Request review (submitted → recommended)", **timing(InternshipRequest, "submitted", "recommended")},
+        {"label": "Acceptance check (uploaded → verified)", **timing(InternshipRequest, "acceptance_uploaded", "acceptance_verified")},
+        {"label": "Log approval (submitted → approved)", **timing(WeeklyLog, "submitted", "approved_by_company")},
+    ]
+    recommended_7d = events.throughput(InternshipRequest, "recommended", 7, period)
+    logs_approved_7d = events.throughput(WeeklyLog, "approved_by_company", 7, period)
+
     context = {
         "today": today,
+        **ctx,
+
+        # turnaround
+        "turnaround": turnaround,
+        "recommended_7d": recommended_7d,
+        "logs_approved_7d": logs_approved_7d,
 
         # placements
         "students_on_internship": students_on_internship,
@@ -1505,19 +1751,66 @@ def coordinator_dashboard(request):
 
 
 @login_required
-def student_dashboard(request):
-    if not hasattr(request.user, "student_profile"):
+async def student_dashboard(request):
+    user = await auser(request)
+    student = await astudent_profile(user)
+    if not student:
         return HttpResponseForbidden("Students only.")
 
-    placement = _get_student_active_placement(request.user)
+    placement = await aactive_placement_for(user, student)
     # (optional) fallback to latest placement if you want:
     # placement = _get_student_active_placement(request.user) or _get_student_latest_placement(request.user)
 
-    return render(request, "dashboards/student_dashboard.html", {
+    return await arender(request, "dashboards/student_dashboard.html", {
         "placement": placement,
     })
 
 
+# -------------------------------------------------------------------
+# INTERNSHIP HISTORY (live + archived placements, see tracking/archive.py)
+# -------------------------------------------------------------------
+@login_required
+def student_internship_history(request):
+    if not hasattr(request.user, "student_profile"):
+        return HttpResponseForbidden("Students only.")
+
+    return render(request, "tracking/internship_history.html", {
+        "records": placement_history(student=request.user.student_profile),
+    })
+
+
+@login_required
+def coordinator_placement_history(request):
+    if not is_coordinator(request.user):
+        return HttpResponseForbidden("Coordinators only.")
+
+    reg_no = request.GET.get("reg_no", "").strip()
+    return render(request, "tracking/internship_history.html", {
+        "records": placement_history(reg_no=reg_no),
+        "reg_no": reg_no,
+        "is_coordinator_view": True,
+    })
+
+
+@login_required
+def archived_placement_detail(request, archive_id):
+    archive = get_object_or_404(ArchivedPlacement.objects.select_related("period"), id=archive_id)
+
+    student = getattr(request.user, "student_profile", None)
+    if not is_coordinator(request.user) and not (student and archive.student_id == student.id):
+        return HttpResponseForbidden("Not allowed.")
+
+    payload = archive.payload or {}
+    return render(request, "tracking/archived_placement_detail.html", {
+        "archive": archive,
+        "weekly_logs": payload.get("weekly_logs", []),
+        "site_visits": payload.get("site_visits", []),
+        "industry_evaluation": payload.get("industry_evaluation"),
+        "academic_evaluation": payload.get("academic_evaluation"),
+        "student_evaluation": payload.get("student_evaluation"),
+    })
+
+
 @login_required
 def industry_dashboard(request):
     return render(request, "dashboards/industry_dashboard.html")